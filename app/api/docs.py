@@ -0,0 +1,160 @@
+"""
+OpenAPI hujjatlari (JSON/YAML) va Swagger UI
+
+Schema birinchi so'rovda bir marta render qilinadi va bayt ko'rinishida
+keshlanadi: ETag, gzip (va brotli o'rnatilgan bo'lsa br) variantlari ham
+oldindan tayyorlanadi. If-None-Match mos kelsa 304 qaytadi.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+import orjson
+from fastapi import APIRouter, Request
+from fastapi.openapi.docs import (
+    get_redoc_html, get_swagger_ui_html, get_swagger_ui_oauth2_redirect_html,
+)
+from fastapi.responses import Response
+
+from ..core.responses import choose_encoding
+
+try:
+    import brotli
+except ImportError:  # brotli ixtiyoriy
+    brotli = None
+
+router = APIRouter(include_in_schema=False)
+
+OPENAPI_URL = "/openapi.json"
+OAUTH2_REDIRECT_URL = "/docs/oauth2-redirect"
+
+
+@dataclass
+class CachedDocument:
+    media_type: str
+    etag: str
+    variants: Dict[str, bytes] = field(default_factory=dict)  # encoding -> body
+
+
+def _render_json(schema: dict) -> bytes:
+    return orjson.dumps(schema)
+
+
+def _render_yaml(schema: dict) -> bytes:
+    import yaml
+    return yaml.dump(schema, default_flow_style=False, allow_unicode=True).encode()
+
+
+RENDERERS: Dict[str, tuple] = {
+    "json": ("application/json", _render_json),
+    "yaml": ("application/x-yaml", _render_yaml),
+}
+
+
+class OpenAPIDocuments:
+    """Render qilingan schema hujjatlari keshi"""
+
+    def __init__(self):
+        self._documents: Dict[str, CachedDocument] = {}
+        self._lock = threading.Lock()
+
+    def _build(self, schema_factory: Callable[[], dict], fmt: str) -> CachedDocument:
+        with self._lock:
+            if fmt in self._documents:
+                return self._documents[fmt]
+            media_type, render = RENDERERS[fmt]
+            body = render(schema_factory())
+            document = CachedDocument(
+                media_type=media_type,
+                etag=f'W/"{hashlib.sha256(body).hexdigest()[:32]}"',
+                variants={"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)},
+            )
+            if brotli is not None:
+                document.variants["br"] = brotli.compress(body, quality=11)
+            self._documents[fmt] = document
+            return document
+
+    async def get(self, schema_factory: Callable[[], dict], fmt: str) -> CachedDocument:
+        document = self._documents.get(fmt)
+        if document is None:
+            # Birinchi render event loopni bloklamasligi uchun thread'da
+            document = await asyncio.to_thread(self._build, schema_factory, fmt)
+        return document
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+
+
+documents = OpenAPIDocuments()
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match (weak taqqoslash)"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+async def serve_document(request: Request, fmt: str, filename: Optional[str] = None) -> Response:
+    document = await documents.get(request.app.openapi, fmt)
+    headers = {
+        "ETag": document.etag,
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "public, max-age=0, must-revalidate",
+    }
+    if filename:
+        headers["Content-Disposition"] = f"attachment; filename={filename}"
+
+    if _etag_matches(request.headers.get("if-none-match"), document.etag):
+        return Response(status_code=304, headers=headers)
+
+    available = tuple(encoding for encoding in ("br", "gzip") if encoding in document.variants)
+    encoding = choose_encoding(request.headers.get("accept-encoding") or "", available)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=document.variants[encoding], media_type=document.media_type, headers=headers)
+
+
+# OpenAPI JSON ni olish
+@router.get(OPENAPI_URL)
+async def get_openapi_json(request: Request):
+    return await serve_document(request, "json")
+
+
+# OpenAPI YAML ni olish
+@router.get("/openapi.yaml")
+async def get_openapi_yaml(request: Request):
+    return await serve_document(request, "yaml", "openapi.yaml")
+
+
+# Swagger UI dan foydalanuvchilar uchun
+@router.get("/docs/yaml")
+async def download_yaml(request: Request):
+    return await serve_document(request, "yaml", "api_documentation.yaml")
+
+
+@router.get("/docs")
+async def swagger_ui(request: Request):
+    return get_swagger_ui_html(
+        openapi_url=OPENAPI_URL,
+        title=f"{request.app.title} - Swagger UI",
+        oauth2_redirect_url=OAUTH2_REDIRECT_URL,
+    )
+
+
+@router.get(OAUTH2_REDIRECT_URL)
+async def swagger_ui_redirect():
+    return get_swagger_ui_oauth2_redirect_html()
+
+
+@router.get("/redoc")
+async def redoc(request: Request):
+    return get_redoc_html(openapi_url=OPENAPI_URL, title=f"{request.app.title} - ReDoc")
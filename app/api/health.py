@@ -0,0 +1,116 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, Response
+
+from ..core.health import HealthMonitor
+from ..core.metrics import pool_stats
+from ..core.settings import settings
+from ..core.throttling import throttle
+from ..database import get_engine
+from ..nlp_parser import parse as nlp_parse
+from ..websocket.routers import broker, manager, ws_service
+from .v1.fake_parse import parse_flight
+
+router = APIRouter(tags=["Health"], include_in_schema=False)
+
+monitor = HealthMonitor(
+    interval=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+    timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+)
+
+HEALTHZ_BODY = b'{"status":"ok"}'
+
+
+async def probe_database():
+    """Pooldan bitta ulanishni olib qaytarish"""
+    def checkout():
+        with get_engine().connect():
+            pass
+    await asyncio.to_thread(checkout)
+
+
+async def probe_broker():
+    """Kanal ochiq (kerak bo'lsa bir marta ulanadi, keyin faqat holat tekshiriladi)"""
+    await broker.ensure_channel()
+    if not broker.is_channel_open():
+        raise ConnectionError("broker channel is closed")
+
+
+_parser_load: Optional[asyncio.Task] = None
+
+
+async def probe_nlp():
+    """
+    NLP modeli yuklangan va oxirgi yuklash xatosiz. Parser hali yaratilmagan
+    bo'lsa yuklash fonda boshlanadi (aks holda not-ready worker'ga trafik
+    kelmaydi va parser hech qachon yuklanmaydi).
+    """
+    global _parser_load
+    parser = nlp_parse._parser
+    if parser is None:
+        if _parser_load is None or _parser_load.done():
+            if _parser_load is not None and not _parser_load.cancelled() and _parser_load.exception():
+                error = _parser_load.exception()
+                _parser_load = None  # keyingi probe qayta urinadi
+                raise RuntimeError(f"parser failed to load: {error}")
+            _parser_load = asyncio.create_task(asyncio.to_thread(nlp_parse.get_parser))
+        raise RuntimeError("parser is loading")
+
+    stats = parser.registry.stats()
+    if stats["version"] is None:
+        raise RuntimeError(f"no model loaded (loading: {stats['loading']})")
+    if stats["last_error"]:
+        raise RuntimeError(f"last model load failed: {stats['last_error']}")
+
+
+monitor.register("database", probe_database)
+monitor.register("broker", probe_broker)
+if settings.HEALTH_REQUIRE_NLP:
+    monitor.register("nlp", probe_nlp)
+
+
+@router.get("/healthz")
+async def healthz():
+    """Process tirik (dependency'lar tekshirilmaydi)"""
+    return Response(content=HEALTHZ_BODY, media_type="application/json")
+
+
+@router.get("/readyz")
+async def readyz():
+    """Keshlangan probe natijalari bo'yicha tayyorlik"""
+    ready = monitor.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "probes": monitor.snapshot()},
+    )
+
+
+@router.get("/statusz")
+async def statusz():
+    """Pool, socket, navbat va kesh holati"""
+    pipelines = [p.stats() for p in list(ws_service.pipelines.values())]
+    inbox = {
+        key: sum(p[key] for p in pipelines)
+        for key in ("depth", "accepted", "coalesced", "dropped", "rejected")
+    }
+    sessions = [d.stats() for d in list(ws_service.drafts.values())]
+    drafts = {key: sum(d[key] for d in sessions) for key in ("offered", "cancelled", "delivered", "reused")}
+    return {
+        "uptime_seconds": round(monitor.uptime(), 1),
+        "ready": monitor.is_ready(),
+        "probes": monitor.snapshot(),
+        "db_pool": pool_stats(get_engine()),
+        "websocket": {
+            "connections": manager.get_connection_count(),
+            "send_queue_depth": sum(q.qsize() for q in list(manager.send_queues.values())),
+            "inbox": inbox,
+            "drafts": drafts,
+        },
+        "broker": broker.stats(),
+        "confirmations": broker.confirmations.stats(),
+        "event_writer": broker.event_writer.stats(),
+        "admission": throttle.stats(),
+        "singleflight": {parse_flight.name: parse_flight.stats()},
+    }
@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from ...core.responses import ModelResponse
 from ...dependencies import db_dependency, jwt_dependency
 from ...schemas.users_schemas import UserIn, UserOut, AccessRefreshOut, RefreshIn, Me, ProfilUpdateIn, ProfilUpdateOut
 from ...repository.user.user_repo import UserRepository
@@ -14,7 +15,7 @@ def register(user_in: UserIn, db:db_dependency):
     repo = UserRepository(db)
     service = UserService(repo)
     
-    return service.register(user_in)
+    return ModelResponse(service.register(user_in))
 
 
 @router.post("/login/", response_model=AccessRefreshOut)
@@ -22,7 +23,7 @@ def login(user_in: UserIn, db:db_dependency):
     repo = UserRepository(db)
     service = UserService(repo)
     
-    return service.login(user_in)
+    return ModelResponse(service.login(user_in))
 
 @router.post("/refresh/")
 def refresh(refresh_token: RefreshIn, db:db_dependency) -> dict:
@@ -44,13 +45,13 @@ def me(db: db_dependency, access_token: jwt_dependency):
     repo = UserRepository(db)
     service = UserService(repo)
     
-    return service.me(access_token=access_token)
+    return ModelResponse(service.me(access_token=access_token))
 
 @router.post("/update/", response_model=ProfilUpdateOut)
 def update(db:db_dependency, access_token: jwt_dependency, user_in: ProfilUpdateIn):
     repo = UserRepository(db)
     service = UserService(repo)
     
-    return service.update(access_token=access_token, user_in=user_in)
+    return ModelResponse(service.update(access_token=access_token, user_in=user_in))
     
     
\ No newline at end of file
@@ -1,17 +1,26 @@
+import asyncio
+
 from fastapi import APIRouter, HTTPException
 from typing import Optional
 from uuid import UUID
 
+from app.core.settings import settings
+from app.core.singleflight import SingleFlight, parse_key
 from app.utils.fake_nlp import (
     FakeEventParser, FakeParseRequest, 
     FakeParseResponse, FakeLanguage
 )
 
+FAKE_MODEL_VERSION = FakeParseResponse.model_fields["model_version"].default
+
 router = APIRouter(prefix="/fake-parse", tags=["Fake NLP Parser"])
 
 # Global fake parser instance
 _fake_parser = None
 
+# Bir xil parallel so'rovlar bitta parse'ni kutadi
+parse_flight = SingleFlight("fake_parse")
+
 def get_fake_parser():
     """Fake parser instance olish"""
     global _fake_parser
@@ -55,7 +64,11 @@ async def fake_parse(
             user_id=user_id
         )
         
-        response = parser.parse(request)
+        if settings.SINGLEFLIGHT_ENABLED:
+            key = parse_key(prompt, fake_locale, user_timezone, FAKE_MODEL_VERSION)
+            response = await parse_flight.do(key, lambda: asyncio.to_thread(parser.parse, request))
+        else:
+            response = parser.parse(request)
         
         if not response.success:
             raise HTTPException(status_code=400, detail=response.error)
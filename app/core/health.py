@@ -0,0 +1,110 @@
+"""
+Health/readiness probelari
+
+Dependency tekshiruvlari (DB, broker, NLP model) so'rov vaqtida emas, fon
+task'ida `interval` sekundda bir marta bajariladi. /readyz faqat keshlangan
+natijani o'qiydi, shuning uchun orchestrator qanchalik tez-tez so'rasa ham
+Postgres yoki RabbitMQ'ga qo'shimcha yuk tushmaydi.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+Probe = Callable[[], Awaitable[None]]
+
+
+@dataclass
+class ProbeResult:
+    ok: bool = False
+    error: Optional[str] = None
+    checked_at: float = 0.0  # time.monotonic()
+    duration: float = 0.0
+
+
+class HealthMonitor:
+    """
+    Probelarni fon rejimida yangilab turuvchi kesh
+
+    Args:
+        interval: probelar orasidagi vaqt (sekund)
+        timeout: bitta probe uchun vaqt chegarasi
+        stale_after: natija shuncha sekunddan eski bo'lsa "not ready"
+    """
+
+    def __init__(self, interval: float = 5.0, timeout: float = 2.0, stale_after: Optional[float] = None):
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after or interval * 3
+        self.probes: Dict[str, Probe] = {}
+        self.results: Dict[str, ProbeResult] = {}
+        self.started_at = time.monotonic()
+        self.worker: Optional[asyncio.Task] = None
+
+    def register(self, name: str, probe: Probe):
+        """Probe qo'shish (xato bo'lsa exception ko'taradi)"""
+        self.probes[name] = probe
+        self.results[name] = ProbeResult()
+
+    async def _check(self, name: str, probe: Probe):
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(probe(), self.timeout)
+            result = ProbeResult(ok=True)
+        except Exception as e:
+            result = ProbeResult(ok=False, error=f"{type(e).__name__}: {e}")
+        result.checked_at = time.monotonic()
+        result.duration = result.checked_at - start
+
+        previous = self.results.get(name)
+        if previous and previous.ok != result.ok and previous.checked_at:
+            logger.warning("Probe %s changed: ok=%s %s", name, result.ok, result.error or "")
+        self.results[name] = result
+
+    async def refresh(self):
+        await asyncio.gather(*(self._check(name, probe) for name, probe in self.probes.items()))
+
+    async def _run(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.worker is None or self.worker.done():
+            self.worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+
+    def is_ready(self) -> bool:
+        now = time.monotonic()
+        return all(
+            r.ok and now - r.checked_at <= self.stale_after
+            for r in self.results.values()
+        )
+
+    def snapshot(self) -> Dict[str, Dict]:
+        now = time.monotonic()
+        return {
+            name: {
+                "ok": r.ok,
+                "error": r.error,
+                "duration": round(r.duration, 4),
+                "age": round(now - r.checked_at, 3) if r.checked_at else None,
+            }
+            for name, r in self.results.items()
+        }
+
+    def uptime(self) -> float:
+        return time.monotonic() - self.started_at
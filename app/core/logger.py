@@ -0,0 +1,163 @@
+"""
+Strukturali logging
+
+- Yozish QueueHandler orqali fon thread'da (QueueListener) bajariladi, event
+  loop stdout'ga sinxron yozmaydi.
+- `logger.debug("... %s", x)` o'chirilgan darajada yoki sampling'da tashlangan
+  bo'lsa argumentlar umuman formatlanmaydi. O'tgan recordning `msg % args`
+  qismi chaqiruv joyida bajariladi (keyin o'zgaradigan dict/list argumentlar
+  yozilgan paytdagi holatida chiqadi); vaqt, JSON va yozish listener
+  thread'da.
+- Har bir xabar uchun yoziladigan DEBUG loglar (`extra=SAMPLED` bilan
+  belgilangan) `LOG_DEBUG_SAMPLE_RATE` bo'yicha sampling qilinadi; boshqa
+  DEBUG loglar to'liq o'tadi.
+- client_id va message_id contextvars orqali har bir recordga qo'shiladi.
+"""
+
+import atexit
+import contextvars
+import logging
+import queue
+import random
+import sys
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+import orjson
+
+
+client_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("client_id", default=None)
+message_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("message_id", default=None)
+
+_listener: Optional[QueueListener] = None
+
+# Har bir xabar uchun chaqiriladigan debug loglar: logger.debug(..., extra=SAMPLED)
+SAMPLED = {"sampled": True}
+
+
+@contextmanager
+def log_context(client_id: Optional[str] = None, message_id: Optional[str] = None):
+    """Blok ichidagi barcha loglarga client_id / message_id biriktirish"""
+    tokens = []
+    if client_id is not None:
+        tokens.append((client_id_var, client_id_var.set(client_id)))
+    if message_id is not None:
+        tokens.append((message_id_var, message_id_var.set(message_id)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def bind_client(client_id: str):
+    """Joriy task (va undan yaratilgan tasklar) uchun client_id o'rnatish"""
+    client_id_var.set(client_id)
+
+
+class ContextFilter(logging.Filter):
+    """Recordga contextvars qiymatlarini qo'shadi"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.client_id = client_id_var.get()
+        record.message_id = message_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """`SAMPLED` bilan belgilangan DEBUG recordlarning faqat `rate` qismini o'tkazadi"""
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0 or not getattr(record, "sampled", False):
+            return True
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Bir qatorli JSON log"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        client_id = getattr(record, "client_id", None)
+        if client_id:
+            payload["client_id"] = client_id
+        message_id = getattr(record, "message_id", None)
+        if message_id:
+            payload["message_id"] = message_id
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return orjson.dumps(payload).decode()
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s [%(levelname)s] %(name)s %(context)s%(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        parts = []
+        if getattr(record, "client_id", None):
+            parts.append(f"client_id={record.client_id}")
+        if getattr(record, "message_id", None):
+            parts.append(f"message_id={record.message_id}")
+        record.context = f"[{' '.join(parts)}] " if parts else ""
+        return super().format(record)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Standart QueueHandler butun recordni (vaqt, traceback) chaqirilgan
+    thread'da formatlaydi. Bu yerda faqat `msg % args` bajariladi - `prepare`
+    daraja va filtrlardan o'tgan recordlar uchungina chaqiriladi, argumentlar
+    esa event loop ularni o'zgartirishidan oldin qotiriladi. Formatter ishi
+    (timestamp, JSON, exc_info) listener thread'da qoladi.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging(level: str = "INFO", json: bool = True, debug_sample_rate: float = 1.0):
+    """Root loggerga navbatli handler o'rnatish (bir marta)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if json else TextFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(debug_sample_rate))
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Navbatdagi loglarni yozib, listenerni to'xtatish"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
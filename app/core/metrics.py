@@ -0,0 +1,201 @@
+"""
+Prometheus metrikalari
+
+Hot path'da faqat oldindan yaratilgan counter/histogram child'lari ishlatiladi.
+Navbat chuqurligi, aktiv socketlar va DB pool kabi holat ko'rsatkichlari esa
+har bir so'rovda emas, faqat scrape vaqtida collector'lar orqali o'qiladi.
+"""
+
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# HTTP
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP so'rovlar soni", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP so'rov davomiyligi", ["method", "route"]
+)
+
+# Rate limit va admission control
+THROTTLED = Counter(
+    "throttled_requests_total", "Rad etilgan so'rovlar/xabarlar", ["route_class", "reason"]
+)
+ADMISSION_INFLIGHT = Gauge(
+    "admission_inflight_requests", "Admission control orqali bajarilayotgan so'rovlar", ["route_class"]
+)
+
+# Single-flight (bir xil parallel so'rovlarni birlashtirish)
+SINGLEFLIGHT = Counter(
+    "singleflight_calls_total", "Single-flight chaqiruvlari (leader/coalesced/abandoned)", ["name", "result"]
+)
+
+# WebSocket
+WS_CONNECTS = Counter("ws_connects_total", "WebSocket ulanishlar soni")
+WS_MESSAGES = Counter("ws_messages_total", "WebSocket xabarlar soni", ["direction"])
+WS_MESSAGES_IN = WS_MESSAGES.labels("in")
+WS_MESSAGES_OUT = WS_MESSAGES.labels("out")
+WS_INBOX_EVENTS = Counter(
+    "ws_inbox_events_total", "Inbox backpressure hodisalari", ["event"]
+)
+WS_INBOX_COALESCED = WS_INBOX_EVENTS.labels("coalesced")
+WS_INBOX_DROPPED = WS_INBOX_EVENTS.labels("dropped")
+WS_INBOX_REJECTED = WS_INBOX_EVENTS.labels("rejected")
+WS_DRAFTS = Counter(
+    "ws_drafts_total", "Draft (preview) parse'lari: offered/cancelled/delivered/reused/throttled", ["result"]
+)
+
+# Broker
+BROKER_PUBLISH_LATENCY = Histogram(
+    "broker_publish_duration_seconds", "RabbitMQ publish davomiyligi"
+)
+BROKER_CONSUME_LATENCY = Histogram(
+    "broker_consume_duration_seconds", "Broker xabarini qayta ishlash davomiyligi"
+)
+BROKER_INFLIGHT = Gauge(
+    "broker_inflight_messages", "Qayta ishlanayotgan (ack qilinmagan) xabarlar"
+)
+
+# Parser
+PARSER_STAGE_LATENCY = Histogram(
+    "parser_stage_duration_seconds",
+    "Parser bosqichlari davomiyligi",
+    ["parser", "stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+PARSER_TIER = Counter(
+    "parser_tier_total", "Parser kaskadining qaysi tieri javob bergani", ["tier"]
+)
+PARSER_SHADOW_COMPARE = Counter(
+    "parser_shadow_compare_total", "Qoidalar va model natijalarini solishtirish", ["field", "result"]
+)
+SEMANTIC_CACHE = Counter(
+    "parser_semantic_cache_total", "Semantic cache natijalari (hit, miss, rejected, evicted)", ["result"]
+)
+
+# Model versiyalari (hot swap)
+MODEL_RELOADS = Counter(
+    "nlp_model_reloads_total", "Model versiyasini yuklash urinishlari", ["result"]
+)
+MODEL_ACTIVE = Gauge(
+    "nlp_model_active", "Hozir javob berayotgan model versiyasi (qiymati 1)", ["version"]
+)
+
+
+@contextmanager
+def observe_stage(parser: str, stage: str):
+    """Parser bosqichi davomiyligini o'lchash"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PARSER_STAGE_LATENCY.labels(parser, stage).observe(time.perf_counter() - start)
+
+
+class WebSocketCollector:
+    """Scrape vaqtida socket va navbat holatini o'qiydi"""
+
+    def __init__(self, manager, ws_service):
+        self.manager = manager
+        self.ws_service = ws_service
+
+    def collect(self):
+        yield GaugeMetricFamily(
+            "ws_active_connections", "Aktiv WebSocket ulanishlar",
+            value=self.manager.get_connection_count(),
+        )
+        yield GaugeMetricFamily(
+            "ws_inbox_depth", "Barcha inboxlardagi xabarlar",
+            value=sum(p.depth() for p in list(self.ws_service.pipelines.values())),
+        )
+        yield GaugeMetricFamily(
+            "ws_send_queue_depth", "Barcha yuborish navbatlaridagi xabarlar",
+            value=sum(q.qsize() for q in list(self.manager.send_queues.values())),
+        )
+        confirmations = self.ws_service.broker.confirmations
+        yield GaugeMetricFamily(
+            "ws_pending_confirmations", "Tasdiq kutayotgan takliflar",
+            value=len(confirmations),
+        )
+        yield GaugeMetricFamily(
+            "event_writer_queue_depth", "Yozilishini kutayotgan eventlar",
+            value=self.ws_service.broker.event_writer.queue.qsize(),
+        )
+
+
+class DBPoolCollector:
+    """SQLAlchemy connection pool holati (engine scrape paytida olinadi)"""
+
+    def __init__(self, engine_factory):
+        self.engine_factory = engine_factory
+
+    def describe(self):
+        # register() paytida collect() chaqirilib engine yaratilmasligi uchun
+        return [GaugeMetricFamily("db_pool_connections", "DB pool holati", labels=["state"])]
+
+    def collect(self):
+        gauge = GaugeMetricFamily("db_pool_connections", "DB pool holati", labels=["state"])
+        for state, value in pool_stats(self.engine_factory()).items():
+            gauge.add_metric([state], value)
+        yield gauge
+
+
+def pool_stats(engine) -> dict:
+    """SQLAlchemy pool ko'rsatkichlari (pool turida bo'lmaganlari tashlab ketiladi)"""
+    pool = engine.pool
+    stats = {}
+    for state in ("size", "checkedin", "checkedout", "overflow"):
+        getter = getattr(pool, state, None)
+        if getter is not None:
+            stats[state] = getter()
+    return stats
+
+
+class PrometheusMiddleware:
+    """
+    Sof ASGI middleware (BaseHTTPMiddleware'dan arzon).
+    Route label sifatida path shabloni olinadi (`/events/{id}`), shuning uchun
+    kardinallik oshib ketmaydi.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_LATENCY.labels(method, route_path).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, route_path, str(status_code)).inc()
+
+
+def register_collector(collector):
+    REGISTRY.register(collector)
+
+
+def render_latest() -> bytes:
+    return generate_latest(REGISTRY)
+
@@ -0,0 +1,121 @@
+"""
+Javob serializatsiyasi va siqish
+
+- `ModelResponse` servis allaqachon validatsiya qilib qaytargan pydantic
+  obyektlarini to'g'ridan-to'g'ri pydantic-core serializer bilan JSON'ga
+  yozadi. FastAPI Response obyektini qayta validatsiya qilmaydi, shuning
+  uchun `response_model` faqat OpenAPI hujjati uchun qoladi.
+- `CompressionMiddleware` Starlette GZipMiddleware ustiga brotli qo'shadi
+  (brotli o'rnatilgan va client `br` qabul qilsa). Kodlash Accept-Encoding
+  q-qiymatlari bo'yicha tanlanadi (`br;q=0` yoki `gzip;q=0` - rad etilgan).
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence
+
+import orjson
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli ixtiyoriy
+    brotli = None
+
+__all__ = ["ORJSONResponse", "ModelResponse", "CompressionMiddleware"]
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+class ModelResponse(Response):
+    """Validatsiya qilingan model (yoki modellar ro'yxati) uchun JSON javob"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        if isinstance(content, list) and content and isinstance(content[0], BaseModel):
+            return _list_adapter(type(content[0])).dump_json(content)
+        return orjson.dumps(content)
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """Accept-Encoding -> {kodlash: q} ("gzip;q=0.5, br" -> {"gzip": 0.5, "br": 1.0})"""
+    encodings: Dict[str, float] = {}
+    for item in header.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        encodings[coding.lower()] = q
+    return encodings
+
+
+def choose_encoding(header: str, available: Sequence[str]) -> str:
+    """
+    `available` (afzallik tartibida) ichidan q-qiymati eng yuqori kodlash;
+    hech biri qabul qilinmasa "identity". `*` nomi aytilmagan kodlashlarga tegishli.
+    """
+    encodings = accepted_encodings(header)
+    wildcard = encodings.get("*", 0.0)
+    best, best_q = "identity", 0.0
+    for coding in available:
+        q = encodings.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int):
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        data = self.compressor.process(body)
+        return data + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    `minimum_size` baytdan katta javoblarni br yoki gzip bilan siqish.
+    Content-Encoding allaqachon qo'yilgan javoblar (masalan keshlangan
+    OpenAPI variantlari) o'zgarmaydi.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 4):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=gzip_level)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        available = ["br", "gzip"] if brotli is not None else ["gzip"]
+        encoding = choose_encoding(Headers(scope=scope).get("Accept-Encoding", ""), available)
+        responder: ASGIApp
+        if encoding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif encoding == "gzip":
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
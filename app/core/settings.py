@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import PostgresDsn
 from pydantic_settings import BaseSettings
 
@@ -25,7 +27,69 @@ class Settings(BaseSettings):
     CELERY_RESULT_BACKEND: str
     
     RABBITMQ_DEFAULT_USER: str
-    
+
+    # Health probelari (fon rejimida yangilanadi)
+    HEALTH_PROBE_INTERVAL_SECONDS: float = 5.0
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 2.0
+    # NLP modeli yuklanmaguncha /readyz 503 (model ishlatilmaydigan deploylarda false)
+    HEALTH_REQUIRE_NLP: bool = True
+
+    # HTTP javoblarini siqish
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Rate limit (token bucket, user yoki IP bo'yicha)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_REDIS_URL: str | None = None
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_PARSE_PER_SECOND: float = 5.0
+    RATE_LIMIT_PARSE_BURST: int = 20
+    RATE_LIMIT_AUTH_PER_SECOND: float = 0.5
+    RATE_LIMIT_AUTH_BURST: int = 10
+    RATE_LIMIT_WS_PER_SECOND: float = 5.0
+    RATE_LIMIT_WS_BURST: int = 20
+    RATE_LIMIT_WS_DRAFT_PER_SECOND: float = 4.0  # debounce'dan keyin ~6/s dan oshmaydi
+    RATE_LIMIT_WS_DRAFT_BURST: int = 10
+
+    # Admission control (route klassi bo'yicha bir vaqtdagi so'rovlar)
+    ADMISSION_PARSE_MAX_CONCURRENCY: int = 32
+    ADMISSION_AUTH_MAX_CONCURRENCY: int = 8
+    ADMISSION_MAX_WAITING: int = 64
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 0.1
+
+    # Bir xil parallel parse so'rovlari bitta hisoblashga birlashtiriladi
+    SINGLEFLIGHT_ENABLED: bool = True
+
+    # DB connection pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_DEBUG_SAMPLE_RATE: float = 0.01
+
+    # WebSocket pipeline (backpressure)
+    WS_INBOX_MAXSIZE: int = 32
+    WS_INBOX_POLICY: Literal["drop", "reject", "block"] = "drop"
+    WS_COALESCE_WINDOW_SECONDS: float = 1.0
+    WS_SEND_QUEUE_MAXSIZE: int = 64
+    WS_BROKER_PREFETCH: int = 16
+    WS_DEFAULT_PROTOCOL: str = "compat"  # json | msgpack | compat
+    WS_DRAFTS_ENABLED: bool = True
+    WS_DRAFT_DEBOUNCE_SECONDS: float = 0.15
+
+    # Tasdiq kutayotgan parse natijalari
+    CONFIRMATION_TTL_SECONDS: int = 900
+    CONFIRMATION_MAX_ENTRIES: int = 10000
+    CONFIRMATION_REDIS_URL: str | None = None
+
+    # Tasdiqlangan eventlarni batch qilib yozish
+    EVENT_WRITER_BATCH_SIZE: int = 50
+    EVENT_WRITER_FLUSH_INTERVAL_SECONDS: float = 0.05
+    EVENT_WRITER_QUEUE_SIZE: int = 1000
+    EVENT_WRITER_SHUTDOWN_TIMEOUT_SECONDS: float = 10.0
     
 
     model_config = {
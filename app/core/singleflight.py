@@ -0,0 +1,102 @@
+"""
+Single-flight: bir xil kalitli parallel chaqiruvlarni bitta hisoblashga birlashtirish
+
+Client retry qilganda yoki ko'p foydalanuvchi bir xil shablon matnni
+yuborganda bir xil prompt bir vaqtda bir necha marta parse qilinadi.
+`SingleFlight.do(key, fn)` kalit bo'yicha faqat birinchi chaqiruvda `fn()`
+ni ishga tushiradi, qolganlari o'sha natijani kutadi. Natija keshlanmaydi:
+hisoblash tugashi bilan kalit o'chiriladi.
+
+Hisoblash alohida task'da bajariladi va har bir chaqiruvchi uni `shield`
+orqali kutadi. Shuning uchun birinchi chaqiruvchi uzilib qolsa (client
+disconnect, timeout) ham boshqalar natijani oladi. Kutayotganlarning hammasi
+bekor bo'lsagina task ham bekor qilinadi.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call:
+    task: asyncio.Future
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Bitta event loop ichida ishlaydi (lock kerak emas)"""
+
+    def __init__(self, name: str, metrics: bool = True):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+        self._leader_counter = self._coalesced_counter = self._abandoned_counter = None
+        if metrics:
+            from .metrics import SINGLEFLIGHT
+            self._leader_counter = SINGLEFLIGHT.labels(name, "leader")
+            self._coalesced_counter = SINGLEFLIGHT.labels(name, "coalesced")
+            self._abandoned_counter = SINGLEFLIGHT.labels(name, "abandoned")
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Args:
+            key: hisoblashni aniqlaydigan kalit (hashable)
+            fn: natijani hisoblaydigan coroutine funksiya (argumentsiz)
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _, key=key, call=call: self._forget(key, call))
+            self.leaders += 1
+            if self._leader_counter is not None:
+                self._leader_counter.inc()
+        else:
+            self.coalesced += 1
+            if self._coalesced_counter is not None:
+                self._coalesced_counter.inc()
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Hech kim kutmayapti: natija kerak emas
+                call.task.cancel()
+                self._forget(key, call)
+                self.abandoned += 1
+                if self._abandoned_counter is not None:
+                    self._abandoned_counter.inc()
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+            "coalesced_ratio": self.coalesced / total if total else 0.0,
+        }
+
+
+def parse_key(prompt: str, locale: Optional[Any], user_timezone: str,
+              model_version: Optional[str], *extra: Hashable) -> tuple:
+    """
+    Parse so'rovi kaliti. Prompt faqat chetlaridagi bo'shliqdan tozalanadi
+    (parser ham shunday qiladi): slot offsetlari asl matnga bog'liq, shuning
+    uchun ichki bo'shliq yoki registr bo'yicha birlashtirish noto'g'ri
+    natija beradi.
+    """
+    locale = getattr(locale, "value", locale)
+    return (prompt.strip(), locale, user_timezone, model_version, *extra)
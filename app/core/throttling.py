@@ -0,0 +1,344 @@
+"""
+Rate limiting va admission control
+
+- `MemoryRateLimiter` - har bir kalit (user yoki IP) uchun token bucket,
+  hajmi chegaralangan LRU'da saqlanadi (bitta process).
+- `RedisRateLimiter` - xuddi shu bucket Redis'da Lua skript bilan atomik
+  yangilanadi, shuning uchun limit barcha node'lar uchun umumiy. Redis
+  ishlamay qolsa lokal limiterga qaytadi.
+- `AdmissionController` - route klassi bo'yicha bir vaqtdagi so'rovlar
+  chegarasi. Limit to'lganda so'rov qisqa vaqt kutadi, keyin 503 bilan
+  rad etiladi: navbat uzayib latency oshib ketishidan oldin yuk tashlanadi.
+- `ThrottleMiddleware` - yuqoridagilarni HTTP route klasslariga qo'llaydi
+  (429 - rate limit, 503 - overload).
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+import orjson
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .logger import get_logger
+from .metrics import ADMISSION_INFLIGHT, THROTTLED
+from .settings import settings
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # redis ixtiyoriy
+    aioredis = None
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Sekundiga `rate` token, bucket sig'imi `burst`"""
+    rate: float
+    burst: int
+
+
+@dataclass
+class RateDecision:
+    allowed: bool
+    remaining: float
+    retry_after: float = 0.0
+
+
+class MemoryRateLimiter:
+    """Process ichidagi token bucket'lar (kalit -> (tokenlar, oxirgi yangilanish))"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def acquire(self, key: str, limit: RateLimit, cost: float = 1.0) -> RateDecision:
+        return self.acquire_nowait(key, limit, cost)
+
+    def acquire_nowait(self, key: str, limit: RateLimit, cost: float = 1.0) -> RateDecision:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (limit.burst, now))
+        tokens = min(limit.burst, tokens + (now - updated_at) * limit.rate)
+
+        if tokens >= cost:
+            decision = RateDecision(True, tokens - cost)
+            tokens -= cost
+        else:
+            decision = RateDecision(False, tokens, (cost - tokens) / limit.rate)
+
+        self._buckets[key] = (tokens, now)
+        # Eng uzoq ishlatilmagan kalitlar boshida turadi
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return decision
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# KEYS[1] - bucket, ARGV - rate, burst, cost. Vaqt Redis serveridan olinadi,
+# shuning uchun node'lar soatidagi farq limitga ta'sir qilmaydi.
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+
+class RedisRateLimiter:
+    """Bir nechta node uchun umumiy token bucket'lar"""
+
+    def __init__(self, redis_url: str, key_prefix: str = "ratelimit:",
+                 fallback: Optional[MemoryRateLimiter] = None):
+        if aioredis is None:
+            raise RuntimeError("redis o'rnatilmagan")
+        self.redis = aioredis.from_url(redis_url)
+        self.key_prefix = key_prefix
+        self.script = self.redis.register_script(TOKEN_BUCKET_LUA)
+        self.fallback = fallback or MemoryRateLimiter()
+
+    async def acquire(self, key: str, limit: RateLimit, cost: float = 1.0) -> RateDecision:
+        try:
+            allowed, remaining, retry_after = await self.script(
+                keys=[self.key_prefix + key], args=[limit.rate, limit.burst, cost],
+            )
+        except Exception as e:
+            logger.warning("Redis rate limit failed for %s: %s", key, e)
+            return self.fallback.acquire_nowait(key, limit, cost)
+        return RateDecision(bool(allowed), float(remaining), float(retry_after))
+
+
+class AdmissionController:
+    """
+    Route klassi uchun concurrency limiti.
+
+    `max_concurrency` ta so'rov bir vaqtda bajariladi; qolganlari ko'pi bilan
+    `max_waiting` ta bo'lib `queue_timeout` soniya kutadi, keyin rad etiladi.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_waiting: int = 0,
+                 queue_timeout: float = 0.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_waiting = max_waiting
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._gauge = ADMISSION_INFLIGHT.labels(name)
+        self.inflight = 0
+        self.waiting = 0
+
+        # Statistika
+        self.admitted = 0
+        self.shed = 0
+
+    async def try_acquire(self) -> bool:
+        if self.inflight < self.max_concurrency and not self.waiting:
+            await self._semaphore.acquire()
+        elif self.waiting < self.max_waiting and self.queue_timeout > 0:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.shed += 1
+                return False
+            finally:
+                self.waiting -= 1
+        else:
+            self.shed += 1
+            return False
+
+        self.inflight += 1
+        self.admitted += 1
+        self._gauge.inc()
+        return True
+
+    def release(self):
+        self.inflight -= 1
+        self._gauge.dec()
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "inflight": self.inflight,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+
+@dataclass
+class RouteClass:
+    """Bir xil limitlar qo'llanadigan route'lar guruhi"""
+    name: str
+    limit: Optional[RateLimit] = None
+    admission: Optional[AdmissionController] = None
+
+
+class Throttle:
+    """Route klasslari va ularning limiterlari"""
+
+    def __init__(self, limiter, classes: Iterable[RouteClass], enabled: bool = True):
+        self.limiter = limiter
+        self.classes = {route_class.name: route_class for route_class in classes}
+        self.enabled = enabled
+
+    @classmethod
+    def from_settings(cls, settings) -> "Throttle":
+        limiter = MemoryRateLimiter(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+        if settings.RATE_LIMIT_REDIS_URL:
+            try:
+                limiter = RedisRateLimiter(settings.RATE_LIMIT_REDIS_URL, fallback=limiter)
+            except RuntimeError as e:
+                logger.warning("Redis rate limiter disabled: %s", e)
+
+        def admission(name: str, max_concurrency: int) -> AdmissionController:
+            return AdmissionController(
+                name, max_concurrency,
+                max_waiting=settings.ADMISSION_MAX_WAITING,
+                queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            )
+
+        return cls(limiter, [
+            RouteClass(
+                "parse",
+                RateLimit(settings.RATE_LIMIT_PARSE_PER_SECOND, settings.RATE_LIMIT_PARSE_BURST),
+                admission("parse", settings.ADMISSION_PARSE_MAX_CONCURRENCY),
+            ),
+            RouteClass(
+                "auth",
+                RateLimit(settings.RATE_LIMIT_AUTH_PER_SECOND, settings.RATE_LIMIT_AUTH_BURST),
+                admission("auth", settings.ADMISSION_AUTH_MAX_CONCURRENCY),
+            ),
+            RouteClass(
+                "ws",
+                RateLimit(settings.RATE_LIMIT_WS_PER_SECOND, settings.RATE_LIMIT_WS_BURST),
+            ),
+            RouteClass(
+                "ws_draft",
+                RateLimit(settings.RATE_LIMIT_WS_DRAFT_PER_SECOND, settings.RATE_LIMIT_WS_DRAFT_BURST),
+            ),
+        ], enabled=settings.RATE_LIMIT_ENABLED)
+
+    async def check_rate(self, route_class: RouteClass, key: str) -> RateDecision:
+        if not self.enabled or route_class.limit is None:
+            return RateDecision(True, float("inf"))
+        decision = await self.limiter.acquire(f"{route_class.name}:{key}", route_class.limit)
+        if not decision.allowed:
+            THROTTLED.labels(route_class.name, "rate_limited").inc()
+        return decision
+
+    async def allow_message(self, client_id: str) -> RateDecision:
+        """WebSocket orqali kelgan bitta xabar uchun rate limit"""
+        return await self.check_rate(self.classes["ws"], client_id)
+
+    async def allow_draft(self, client_id: str) -> RateDecision:
+        """WebSocket draft (preview) uchun alohida limit: yozish tezligida keladi"""
+        return await self.check_rate(self.classes["ws_draft"], client_id)
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            name: route_class.admission.stats()
+            for name, route_class in self.classes.items()
+            if route_class.admission is not None
+        }
+
+
+def _client_key(scope: Scope, headers: Headers, decode_token) -> str:
+    """Token to'g'ri bo'lsa user id, aks holda IP"""
+    authorization = headers.get("authorization", "")
+    if decode_token is not None and authorization.lower().startswith("bearer "):
+        try:
+            sub = decode_token(authorization[7:].strip()).get("sub")
+        except Exception:
+            sub = None
+        if sub:
+            return f"user:{sub}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+def _reject_response(status: int, detail: str, retry_after: float) -> Tuple[dict, bytes]:
+    body = orjson.dumps({"detail": detail})
+    start = {
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, int(retry_after + 0.999))).encode()),
+        ],
+    }
+    return start, body
+
+
+class ThrottleMiddleware:
+    """
+    `routes` - path -> route klassi nomi. Middleware routingdan oldin
+    ishlaydi, shuning uchun faqat aniq path'lar solishtiriladi.
+    """
+
+    def __init__(self, app: ASGIApp, throttle: Throttle, routes: Dict[str, str],
+                 decode_token=None):
+        self.app = app
+        self.throttle = throttle
+        self.routes = {path: throttle.classes[name] for path, name in routes.items()}
+        self.decode_token = decode_token
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        route_class = self.routes.get(scope["path"]) if scope["type"] == "http" else None
+        if route_class is None or not self.throttle.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        key = _client_key(scope, Headers(scope=scope), self.decode_token)
+        decision = await self.throttle.check_rate(route_class, key)
+        if not decision.allowed:
+            await self._reject(send, 429, "Too many requests", decision.retry_after)
+            return
+
+        admission = route_class.admission
+        if admission is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await admission.try_acquire():
+            THROTTLED.labels(route_class.name, "overloaded").inc()
+            await self._reject(send, 503, "Server is overloaded", 1.0)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.release()
+
+    async def _reject(self, send: Send, status: int, detail: str, retry_after: float):
+        start, body = _reject_response(status, detail, retry_after)
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
+
+
+throttle = Throttle.from_settings(settings)
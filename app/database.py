@@ -1,16 +1,44 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase, declarative_base
+from functools import lru_cache
+
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
 
 from app.core.settings import settings
 
 DATABASE_URL = settings.SQLALCHEMY_DATABASE_URI
 
 
-if not DATABASE_URL:
-    raise ValueError("SQLALCHEMY_DATABASE_URI is not set!")
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """
+    Engine birinchi murojaatda yaratiladi: DB driver (psycopg2) importi va
+    pool sozlamalari app importidan keyinga, birinchi so'rovga suriladi
+    """
+    if not DATABASE_URL:
+        raise ValueError("SQLALCHEMY_DATABASE_URI is not set!")
+    return create_engine(
+        str(DATABASE_URL),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+
+
+@lru_cache(maxsize=None)
+def _session_factory() -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+
+
+def SessionLocal(**kwargs) -> Session:
+    """`sessionmaker` bilan bir xil chaqiriladi, engine kerak bo'lganda ulanadi"""
+    return _session_factory()(**kwargs)
+
+
+def __getattr__(name: str):
+    # Eski `from app.database import engine` importlari uchun
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-engine = create_engine(str(DATABASE_URL))
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 class Base(DeclarativeBase):
     pass
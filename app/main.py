@@ -1,13 +1,46 @@
-import yaml
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from .core.settings import settings
+from .core.logger import setup_logging
+from .core.responses import CompressionMiddleware, ORJSONResponse
+from .core.throttling import ThrottleMiddleware, throttle
+from .core.metrics import (
+    CONTENT_TYPE_LATEST, DBPoolCollector, PrometheusMiddleware,
+    register_collector, render_latest,
+)
+from .database import get_engine
+from .utils.jwt import decode_token
 from .api.v1.auth import router as v1_auth_router
 from .api.v1.fake_parse import router as v1_parse_router
 from .api.v1.event import router as v1_event_router
+from .nlp_parser.parse import (
+    router as nlp_parse_router, start_model_watch, stop_model_watch,
+)
+from .api.health import router as health_router, monitor as health_monitor
+from .api.docs import router as docs_router
+
+from .websocket.routers import broker as ws_broker, router as ws_router
+
 
-from .websocket.routers import router as ws_router
+setup_logging(
+    level=settings.LOG_LEVEL,
+    json=settings.LOG_JSON,
+    debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE,
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Dependency probelari fon rejimida yangilanadi
+    health_monitor.start()
+    # NLP model hot swap: CURRENT faylini kuzatish (sozlangan bo'lsa)
+    await start_model_watch()
+    yield
+    # Tasdiqlangan, lekin hali yozilmagan takliflar yo'qolmasligi uchun
+    await ws_broker.event_writer.stop(settings.EVENT_WRITER_SHUTDOWN_TIMEOUT_SECONDS)
+    stop_model_watch()
+    await health_monitor.stop()
 
 
 app = FastAPI(
@@ -18,9 +51,28 @@ app = FastAPI(
         "name": "Jamshidbek Shodibekov",
         "email": "W3E5S@example.com",
     },
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+    # Schema hujjatlari va Swagger UI keshlangan holda docs_router orqali beriladi
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None,
 )
 
 
+# rate limit va admission control (429/503 javoblar ham CORS headerlari bilan)
+app.add_middleware(
+    ThrottleMiddleware,
+    throttle=throttle,
+    routes={
+        f"{settings.API_V1_STR}/fake-parse/": "parse",
+        f"{settings.API_V1_STR}/parse/": "parse",
+        f"{settings.API_V1_STR}/auth/login/": "auth",
+        f"{settings.API_V1_STR}/auth/register/": "auth",
+    },
+    decode_token=decode_token,
+)
+
 # cors middleware
 
 app.add_middleware(
@@ -31,6 +83,18 @@ app.add_middleware(
     allow_headers=["*"],    
 )
 
+# compression middleware
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+# metrics middleware
+app.add_middleware(PrometheusMiddleware)
+register_collector(DBPoolCollector(get_engine))
+
 # include routers
 
 # auth router
@@ -39,45 +103,25 @@ app.include_router(v1_auth_router, prefix=settings.API_V1_STR)
 # parse router
 app.include_router(v1_parse_router, prefix=settings.API_V1_STR)
 
+# NLP parser router (/parse, model admin endpointlari)
+app.include_router(nlp_parse_router, prefix=settings.API_V1_STR)
+
 # event router
 app.include_router(v1_event_router, prefix=settings.API_V1_STR)
 
 # websocket router
 app.include_router(ws_router, prefix=settings.API_V1_STR)
 
+# health router (/healthz, /readyz, /statusz)
+app.include_router(health_router)
+
+# OpenAPI JSON/YAML va Swagger UI
+app.include_router(docs_router)
 
 
 
-# OpenAPI JSON ni olish
-@app.get("/openapi.json", include_in_schema=False)
-async def get_openapi_json():
-    return app.openapi()
-
-# OpenAPI YAML ni olish
-@app.get("/openapi.yaml", include_in_schema=False)
-async def get_openapi_yaml():
-    openapi_json = app.openapi()
-    yaml_str = yaml.dump(openapi_json, default_flow_style=False, allow_unicode=True)
-    
-    return Response(
-        content=yaml_str,
-        media_type="application/x-yaml",
-        headers={
-            "Content-Disposition": "attachment; filename=openapi.yaml"
-        }
-    )
-
-# Swagger UI dan foydalanuvchilar uchun
-@app.get("/docs/yaml", include_in_schema=False)
-async def download_yaml():
-    openapi_json = app.openapi()
-    yaml_str = yaml.dump(openapi_json, default_flow_style=False, allow_unicode=True)
-    
-    return Response(
-        content=yaml_str,
-        media_type="application/x-yaml",
-        headers={
-            "Content-Disposition": "attachment; filename=api_documentation.yaml"
-        }
-    )
 
+# Prometheus metrikalari
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=render_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -3,11 +3,30 @@ NLP Parser for Calendar Events
 Multilingual (UZ/RU/EN) intent classification and slot filling using BERT-style models
 """
 
-from .parser import EventParser
 from .models import ParsedEvent, Intent, Slot
 from .language_detector import LanguageDetector
-from .normalizers import DateTimeNormalizer, RepeatNormalizer, DurationNormalizer
 from .exceptions import ParseError, NormalizationError
+from .instrumentation import Instrumentation, SpanHook, NoopHook, OpenTelemetryHook
+from .slot_decoder import BIODecoder
+from .registry import ModelRegistry, ModelHandle
+from .semantic_cache import SemanticCache
+
+# torch/transformers va dateutil/pytz'ga bog'liq modullar faqat kerak
+# bo'lganda yuklanadi (language_detector, corpus kabi yengil qismlar ularsiz ishlaydi)
+_LAZY = {
+    "EventParser": ".parser",
+    "DateTimeNormalizer": ".normalizers",
+    "RepeatNormalizer": ".normalizers",
+    "DurationNormalizer": ".normalizers",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        return getattr(importlib.import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __version__ = "1.0.0"
 __all__ = [
@@ -20,5 +39,13 @@ __all__ = [
     "RepeatNormalizer",
     "DurationNormalizer",
     "ParseError",
-    "NormalizationError"
+    "NormalizationError",
+    "Instrumentation",
+    "SpanHook",
+    "NoopHook",
+    "OpenTelemetryHook",
+    "BIODecoder",
+    "ModelRegistry",
+    "ModelHandle",
+    "SemanticCache"
 ]
\ No newline at end of file
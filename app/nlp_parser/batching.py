@@ -0,0 +1,79 @@
+"""
+Uzunlik bo'yicha bucketlash (dynamic padding)
+
+Batchdagi har bir matn o'z uzunligiga mos bucketga tushadi va bucket faqat
+o'zining eng uzun matnigacha pad qilinadi. Shunda bitta uzun izoh qolgan
+qisqa "ertaga 10 da" promptlarini `max_length`gacha cho'zmaydi. Natijalar
+keyin kirish tartibiga qaytariladi.
+"""
+
+from typing import Callable, List, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+
+def plan_buckets(lengths: Sequence[int], boundaries: Sequence[int],
+                 max_batch_size: int) -> List[List[int]]:
+    """
+    Indekslarni uzunlik bo'yicha guruhlash
+
+    Args:
+        lengths: har bir matnning token soni
+        boundaries: bucket yuqori chegaralari (o'sish tartibida), masalan [16, 32, 64, 128]
+        max_batch_size: bitta bucketdagi eng ko'p matn
+
+    Returns:
+        Bucketlar (har biri asl indekslar ro'yxati, uzunlik bo'yicha saralangan)
+    """
+    lengths = np.asarray(lengths)
+    if lengths.size == 0:
+        return []
+    order = np.argsort(lengths, kind="stable")
+    # Chegaradan uzunlari oxirgi bucketga tushadi (tokenizer baribir kesadi)
+    bucket_ids = np.minimum(np.searchsorted(boundaries, lengths[order]), len(boundaries) - 1)
+
+    buckets: List[List[int]] = []
+    for bucket_id in np.unique(bucket_ids):
+        members = order[bucket_ids == bucket_id].tolist()
+        for start in range(0, len(members), max_batch_size):
+            buckets.append(members[start:start + max_batch_size])
+    return buckets
+
+
+def pad_bucket(sequences: Sequence[Sequence[int]], pad_value: int = 0,
+               dtype=np.int64) -> Tuple[np.ndarray, np.ndarray]:
+    """Ketma-ketliklarni bucketning eng uzun elementigacha pad qilish -> (qiymatlar, mask)"""
+    width = max(len(sequence) for sequence in sequences)
+    values = np.full((len(sequences), width), pad_value, dtype=dtype)
+    mask = np.zeros((len(sequences), width), dtype=np.int64)
+    for row, sequence in enumerate(sequences):
+        values[row, :len(sequence)] = sequence
+        mask[row, :len(sequence)] = 1
+    return values, mask
+
+
+def run_bucketed(buckets: List[List[int]], run: Callable[[List[int]], List[T]],
+                 size: int, executor=None) -> List[T]:
+    """
+    `run(indices)` ni har bir bucket uchun chaqirib natijalarni asl tartibda yig'ish.
+    `executor` berilsa bucketlar parallel bajariladi.
+    """
+    results: List[T] = [None] * size
+    if executor is None:
+        outputs = map(run, buckets)
+    else:
+        outputs = executor.map(run, buckets)
+    for indices, output in zip(buckets, outputs):
+        for index, item in zip(indices, output):
+            results[index] = item
+    return results
+
+
+def padding_stats(lengths: Sequence[int], buckets: List[List[int]]) -> dict:
+    """Haqiqiy va pad qilingan tokenlar soni (benchmark uchun)"""
+    lengths = np.asarray(lengths)
+    real = int(lengths.sum())
+    padded = sum(len(bucket) * int(lengths[bucket].max()) for bucket in buckets)
+    return {"real_tokens": real, "padded_tokens": padded, "efficiency": real / padded if padded else 1.0}
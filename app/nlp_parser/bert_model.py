@@ -1,12 +1,54 @@
 import torch
 import torch.nn as nn
-from transformers import AutoTokenizer, AutoModelForTokenClassification, AutoModelForSequenceClassification
-from typing import List, Dict, Tuple, Optional
+from transformers import (
+    AutoTokenizer, AutoModelForTokenClassification, AutoModelForSequenceClassification,
+    DistilBertConfig, DistilBertForSequenceClassification, DistilBertForTokenClassification,
+    PreTrainedTokenizerFast,
+)
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Dict, Tuple, Optional
 import numpy as np
 from pathlib import Path
 
 from .config import settings
 from .models import Intent, Language
+from .instrumentation import RequestTrace, span
+from .batching import pad_bucket, plan_buckets, run_bucketed
+from .slot_decoder import BIODecoder
+from .mmap_weights import has_mmap_weights, load_pretrained as load_mmap_pretrained
+from . import runtime
+
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+
+
+def build_wordpiece_tokenizer(texts: Iterable[str], vocab_size: int = 2000) -> PreTrainedTokenizerFast:
+    """
+    Berilgan matnlardan kichik WordPiece tokenizer o'qitish (offline).
+    Fast tokenizer bo'lgani uchun offset_mapping ham ishlaydi.
+    """
+    from tokenizers import Tokenizer, decoders, models, normalizers, pre_tokenizers, processors, trainers
+
+    tokenizer = Tokenizer(models.WordPiece(unk_token="[UNK]"))
+    tokenizer.normalizer = normalizers.BertNormalizer(lowercase=False)
+    tokenizer.pre_tokenizer = pre_tokenizers.BertPreTokenizer()
+    tokenizer.decoder = decoders.WordPiece()
+    tokenizer.train_from_iterator(
+        texts, trainers.WordPieceTrainer(vocab_size=vocab_size, special_tokens=SPECIAL_TOKENS)
+    )
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]",
+        special_tokens=[
+            ("[CLS]", tokenizer.token_to_id("[CLS]")),
+            ("[SEP]", tokenizer.token_to_id("[SEP]")),
+        ],
+    )
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        unk_token="[UNK]", pad_token="[PAD]", cls_token="[CLS]",
+        sep_token="[SEP]", mask_token="[MASK]",
+        model_input_names=["input_ids", "attention_mask"],
+    )
+
 
 class BERTNLPModel:
     """BERT-style NLP model for intent classification and NER"""
@@ -14,8 +56,10 @@ class BERTNLPModel:
     def __init__(self, model_dir: str = None):
         self.model_dir = Path(model_dir or settings.model_dir)
         self.model_dir.mkdir(parents=True, exist_ok=True)
+        runtime.configure()
         
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.slot_decoder = BIODecoder(settings.slot_types)
         
         # Load or initialize models
         self.tokenizer = None
@@ -23,21 +67,68 @@ class BERTNLPModel:
         self.ner_model = None
         self.load_models()
     
+    @classmethod
+    def from_components(cls, tokenizer, intent_model, ner_model, model_dir: str = None) -> "BERTNLPModel":
+        """Tayyor tokenizer va modellardan (diskdan yuklamasdan) yaratish"""
+        instance = cls.__new__(cls)
+        runtime.configure()
+        instance.model_dir = Path(model_dir or settings.model_dir)
+        instance.device = next(intent_model.parameters()).device
+        instance.slot_decoder = BIODecoder(settings.slot_types)
+        instance.tokenizer = tokenizer
+        instance.intent_model = intent_model.eval()
+        instance.ner_model = ner_model.eval()
+        return instance
+    
+    @classmethod
+    def tiny_random(cls, texts: Iterable[str], dim: int = 32, layers: int = 1,
+                    heads: int = 2, vocab_size: int = 2000, seed: int = 0) -> "BERTNLPModel":
+        """
+        Tasodifiy vaznli kichik DistilBERT (benchmark va testlar uchun).
+        Natijalar ma'nosiz, lekin hisoblash yo'li haqiqiy model bilan bir xil.
+        """
+        tokenizer = build_wordpiece_tokenizer(texts, vocab_size)
+        
+        def config(num_labels: int) -> DistilBertConfig:
+            return DistilBertConfig(
+                vocab_size=len(tokenizer),
+                dim=dim,
+                n_layers=layers,
+                n_heads=heads,
+                hidden_dim=dim * 4,
+                max_position_embeddings=settings.max_length,
+                pad_token_id=tokenizer.pad_token_id,
+                num_labels=num_labels,
+            )
+        
+        torch.manual_seed(seed)
+        intent_model = DistilBertForSequenceClassification(config(len(settings.intents)))
+        ner_model = DistilBertForTokenClassification(config(len(settings.slot_types)))
+        return cls.from_components(tokenizer, intent_model, ner_model)
+    
     def load_models(self):
         """Modellarni yuklash yoki yaratish"""
         try:
-            # Load pretrained tokenizer
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                settings.bert_model_name,
-                cache_dir=self.model_dir / "cache"
-            )
+            if settings.model_variant == "student" and not (self.model_dir / "tokenizer").exists():
+                # Student faqat distill.py natijasidan yuklanadi (pretrained yuklab olinmaydi)
+                raise FileNotFoundError(
+                    f"No distilled student in {self.model_dir}; run python -m app.nlp_parser.distill"
+                )
+            
+            # Load tokenizer (versiya katalogida saqlangan bo'lsa o'sha, aks holda pretrained)
+            tokenizer_path = self.model_dir / "tokenizer"
+            if tokenizer_path.exists():
+                self.tokenizer = AutoTokenizer.from_pretrained(str(tokenizer_path))
+            else:
+                self.tokenizer = AutoTokenizer.from_pretrained(
+                    settings.bert_model_name,
+                    cache_dir=self.model_dir / "cache"
+                )
             
             # Load intent classification model
             intent_path = self.model_dir / settings.intent_model_path
             if intent_path.exists():
-                self.intent_model = AutoModelForSequenceClassification.from_pretrained(
-                    str(intent_path)
-                ).to(self.device)
+                self.intent_model = self._load_pretrained(AutoModelForSequenceClassification, intent_path)
             else:
                 # Create new model
                 self.intent_model = AutoModelForSequenceClassification.from_pretrained(
@@ -48,9 +139,7 @@ class BERTNLPModel:
             # Load NER model
             ner_path = self.model_dir / settings.ner_model_path
             if ner_path.exists():
-                self.ner_model = AutoModelForTokenClassification.from_pretrained(
-                    str(ner_path)
-                ).to(self.device)
+                self.ner_model = self._load_pretrained(AutoModelForTokenClassification, ner_path)
             else:
                 # Create new model
                 self.ner_model = AutoModelForTokenClassification.from_pretrained(
@@ -65,129 +154,161 @@ class BERTNLPModel:
         except Exception as e:
             raise Exception(f"Failed to load models: {e}")
     
-    def predict_intent(self, text: str) -> Tuple[Intent, float]:
+    def _load_pretrained(self, model_cls, path: Path):
+        """
+        CPU'da safetensors bo'lsa vaznlar memory-map qilinadi (workerlar bitta
+        page cache nusxasini bo'lishadi), aks holda oddiy from_pretrained
+        """
+        if settings.mmap_weights and self.device.type == "cpu" and has_mmap_weights(path):
+            return load_mmap_pretrained(model_cls, path)
+        return model_cls.from_pretrained(str(path)).to(self.device)
+    
+    def predict_intent(self, text: str, trace: Optional[RequestTrace] = None,
+                       return_embedding: bool = False) -> Tuple[Intent, float]:
         """
         Intentni aniqlash
         
         Args:
             text: Kiruvchi matn
+            trace: bosqichlarni o'lchash uchun (ixtiyoriy)
+            return_embedding: encoder chiqishining o'rtachasini ham qaytarish
             
         Returns:
-            Tuple: (intent, confidence)
+            Tuple: (intent, confidence) yoki (intent, confidence, embedding)
+        """
+        return self.predict_intent_batch([text], trace, return_embedding)[0]
+    
+    def predict_intent_batch(self, texts: List[str], trace: Optional[RequestTrace] = None,
+                             return_embeddings: bool = False) -> List[Tuple[Intent, float]]:
+        """
+        Bir nechta matn uchun intentlar (uzunlik bo'yicha bucketlangan)
+        
+        Args:
+            return_embeddings: oxirgi hidden state'ning attention mask bo'yicha
+                o'rtachasi (semantic cache uchun, qo'shimcha forward'siz)
+        
+        Returns:
+            List: har bir matn uchun (intent, confidence) yoki
+            (intent, confidence, embedding), kirish tartibida
         """
         if not self.tokenizer or not self.intent_model:
             raise Exception("Model not loaded")
         
-        # Tokenize
-        inputs = self.tokenizer(
-            text,
-            return_tensors="pt",
-            max_length=settings.max_length,
-            truncation=True,
-            padding=True
-        ).to(self.device)
+        # Tokenize (padding'siz - har bir bucket alohida pad qilinadi)
+        with span(trace, "intent.tokenize"):
+            encoded = self.tokenizer(texts, max_length=settings.max_length, truncation=True)
         
-        # Predict
-        with torch.no_grad():
-            outputs = self.intent_model(**inputs)
-            predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-            
-        # Get highest probability
-        probs = predictions.cpu().numpy()[0]
-        intent_idx = np.argmax(probs)
-        confidence = float(probs[intent_idx])
+        def run(indices: List[int]) -> List[Tuple[Intent, float]]:
+            inputs = self._pad_inputs([encoded["input_ids"][i] for i in indices])
+            with torch.no_grad():
+                outputs = self.intent_model(**inputs, output_hidden_states=return_embeddings)
+                probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
+                if return_embeddings:
+                    mask = inputs["attention_mask"].unsqueeze(-1).to(outputs.hidden_states[-1].dtype)
+                    pooled = (outputs.hidden_states[-1] * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+                    embeddings = pooled.float().cpu().numpy()
+            probs = probs.cpu().numpy()
+            best = probs.argmax(axis=-1)
+            results = [
+                (Intent(settings.intents[idx]), float(row[idx]))
+                for row, idx in zip(probs, best)
+            ]
+            if return_embeddings:
+                results = [result + (embedding,) for result, embedding in zip(results, embeddings)]
+            return results
         
-        intent_name = settings.intents[intent_idx]
-        return Intent(intent_name), confidence
+        # Predict
+        with span(trace, "intent.forward"):
+            return self._run_bucketed(encoded["input_ids"], run)
     
-    def extract_slots(self, text: str) -> List[Dict[str, any]]:
+    def extract_slots(self, text: str, trace: Optional[RequestTrace] = None) -> List[Dict[str, any]]:
         """
         Slotlarni ajratib olish (NER)
         
         Args:
             text: Kiruvchi matn
+            trace: bosqichlarni o'lchash uchun (ixtiyoriy)
             
         Returns:
             List: Slotlar ro'yxati
         """
+        return self.extract_slots_batch([text], trace)[0]
+    
+    def extract_slots_batch(self, texts: List[str],
+                            trace: Optional[RequestTrace] = None) -> List[List[Dict[str, any]]]:
+        """
+        Bir nechta matn uchun slotlar (uzunlik bo'yicha bucketlangan)
+        
+        Returns:
+            List: har bir matn uchun slotlar ro'yxati (kirish tartibida)
+        """
         if not self.tokenizer or not self.ner_model:
             raise Exception("Model not loaded")
         
-        # Tokenize
-        inputs = self.tokenizer(
-            text,
-            return_tensors="pt",
-            max_length=settings.max_length,
-            truncation=True,
-            padding=True,
-            return_offsets_mapping=True
-        ).to(self.device)
-        
-        # Predict
-        with torch.no_grad():
-            outputs = self.ner_model(**inputs)
-            predictions = torch.argmax(outputs.logits, dim=-1)
-        
-        # Convert to human readable format
-        tokens = self.tokenizer.convert_ids_to_tokens(inputs["input_ids"][0])
-        offsets = inputs["offset_mapping"][0].cpu().numpy()
-        predictions = predictions[0].cpu().numpy()
-        
-        slots = []
-        current_slot = None
-        
-        for i, (token, offset, pred) in enumerate(zip(tokens, offsets, predictions)):
-            # Skip special tokens
-            if token in [self.tokenizer.cls_token, self.tokenizer.sep_token, self.tokenizer.pad_token]:
-                continue
-            
-            slot_type = settings.slot_types[pred]
-            
-            # Check if we have a slot
-            if slot_type.startswith('B-'):
-                # Start new slot
-                if current_slot:
-                    slots.append(current_slot)
-                
-                slot_name = slot_type[2:]
-                current_slot = {
-                    'type': slot_name,
-                    'value': token,
-                    'start': int(offset[0]),
-                    'end': int(offset[1]),
-                    'confidence': 0.8  # Placeholder
-                }
-            elif slot_type.startswith('I-') and current_slot:
-                # Continue current slot
-                slot_name = slot_type[2:]
-                if slot_name == current_slot['type']:
-                    current_slot['value'] += ' ' + token
-                    current_slot['end'] = int(offset[1])
-            else:
-                # Outside or slot changed
-                if current_slot:
-                    slots.append(current_slot)
-                    current_slot = None
-        
-        # Add last slot if exists
-        if current_slot:
-            slots.append(current_slot)
+        # Tokenize (padding'siz - har bir bucket alohida pad qilinadi)
+        with span(trace, "slots.tokenize"):
+            encoded = self.tokenizer(
+                texts,
+                max_length=settings.max_length,
+                truncation=True,
+                return_offsets_mapping=True
+            )
         
-        # Clean up slot values
-        for slot in slots:
-            slot['value'] = slot['value'].replace(' ##', '')
+        def run(indices: List[int]) -> List[List[Dict[str, any]]]:
+            inputs = self._pad_inputs([encoded["input_ids"][i] for i in indices])
+            with torch.no_grad():
+                logits = self.ner_model(**inputs).logits.cpu().numpy()
+            width = logits.shape[1]
+            # offset_mapping modelga kirmaydi, faqat dekodlash uchun
+            offsets = np.zeros((len(indices), width, 2), dtype=np.int64)
+            for row, i in enumerate(indices):
+                offsets[row, :len(encoded["offset_mapping"][i])] = encoded["offset_mapping"][i]
+            return self.slot_decoder.decode_batch(
+                [texts[i] for i in indices], logits, offsets, inputs["attention_mask"].cpu().numpy(),
+            )
         
-        return slots
+        # Predict + decode
+        with span(trace, "slots.forward"):
+            return self._run_bucketed(encoded["input_ids"], run)
+    
+    def _pad_inputs(self, input_ids: List[List[int]]) -> Dict[str, torch.Tensor]:
+        """Bucketni o'zining eng uzun elementigacha pad qilish"""
+        ids, mask = pad_bucket(input_ids, self.tokenizer.pad_token_id)
+        return {
+            "input_ids": torch.from_numpy(ids).to(self.device),
+            "attention_mask": torch.from_numpy(mask).to(self.device),
+        }
+    
+    def _run_bucketed(self, input_ids: List[List[int]], run):
+        """Bucketlar bo'yicha forward, natijalar kirish tartibida"""
+        buckets = plan_buckets(
+            [len(ids) for ids in input_ids], settings.length_buckets, settings.batch_size,
+        )
+        executor = self._bucket_executor() if len(buckets) > 1 else None
+        return run_bucketed(buckets, run, len(input_ids), executor)
+    
+    def _bucket_executor(self) -> Optional[ThreadPoolExecutor]:
+        """
+        bucket_workers > 1 bo'lsa kichik bucketlar parallel bajariladi
+        (torch forward paytida GIL'ni bo'shatadi, intra-op threadlar bo'linadi)
+        """
+        if settings.bucket_workers <= 1:
+            return None
+        if getattr(self, "_executor", None) is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.bucket_workers, thread_name_prefix="nlp-bucket",
+            )
+        return self._executor
     
     def save_models(self):
         """Modellarni saqlash"""
         if self.intent_model:
             intent_path = self.model_dir / settings.intent_model_path
-            self.intent_model.save_pretrained(str(intent_path))
+            self.intent_model.save_pretrained(str(intent_path), safe_serialization=True)
         
         if self.ner_model:
             ner_path = self.model_dir / settings.ner_model_path
-            self.ner_model.save_pretrained(str(ner_path))
+            self.ner_model.save_pretrained(str(ner_path), safe_serialization=True)
         
         if self.tokenizer:
             self.tokenizer.save_pretrained(str(self.model_dir / "tokenizer"))
\ No newline at end of file
@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from pydantic_settings import BaseSettings
 
 class NLPSettings(BaseSettings):
@@ -11,11 +11,44 @@ class NLPSettings(BaseSettings):
     intent_model_path: str = "intent_model"
     ner_model_path: str = "ner_model"
     language_model_path: str = "language_model"
+    # Versiyalangan modellar: model_dir/versions/<versiya>/, faol versiya nomi model_dir/CURRENT da
+    model_version: Optional[str] = None  # berilsa CURRENT o'rniga shu versiya
+    model_watch_interval_seconds: float = 0.0  # > 0 bo'lsa CURRENT o'zgarishi kuzatiladi
+    model_warmup_prompts: List[str] = [
+        "ertaga soat 10 da uchrashuv",
+        "встреча завтра в 15:00",
+        "meeting tomorrow at 3pm",
+    ]
+    # safetensors vaznlari mmap qilinadi: bir nodedagi workerlar bitta nusxani bo'lishadi
+    mmap_weights: bool = True
+    admin_token: Optional[str] = None  # model boshqaruv endpointlari uchun (None - o'chiq)
+    # "base" - model_dir dagi asosiy model, "student" - distill.py o'qitgan kichik model
+    # (model_dir/<student_model_path>/versions/... , faqat diskdan, yuklab olinmaydi)
+    model_variant: str = "base"
+    student_model_path: str = "student"
     
     # BERT model konfiguratsiyasi
     bert_model_name: str = "distilbert-base-multilingual-cased"
     max_length: int = 128
     batch_size: int = 32
+    # Dynamic padding: har bir bucket faqat o'z ichidagi eng uzun matngacha pad qilinadi
+    length_buckets: List[int] = [16, 32, 64, 128]
+    bucket_workers: int = 1  # > 1 bo'lsa bucketlar parallel bajariladi
+    
+    # CPU thread topologiyasi (har bir inference process uchun, runtime.py)
+    inference_workers: int = 0  # bir nodedagi inference processlari (0 - WEB_CONCURRENCY yoki 1)
+    intra_op_threads: int = 0  # 0 - CPU soni / inference_workers
+    inter_op_threads: int = 1
+    cpu_affinity: str = "none"  # "none", "auto" (slot bo'yicha yadrolar) yoki "0-3,8"
+    runtime_dir: str = "/tmp/nlp-runtime"  # "auto" slot lock fayllari
+    
+    # Distillash (distill.py): student arxitekturasi va o'qitish
+    student_layers: int = 2
+    student_dim: int = 256
+    student_heads: int = 4
+    distill_corpus_size: int = 20000
+    distill_temperature: float = 2.0
+    distill_alpha: float = 0.5  # teacher soft label ulushi (qolgani korpusdagi oltin labellar)
     
     # Intentlar ro'yxati
     intents: List[str] = [
@@ -57,6 +90,23 @@ class NLPSettings(BaseSettings):
     default_duration_hours: int = 1
     default_alert_minutes: int = 10
     
+    # Cascade: ishonchli promptlar qoidalar bilan, qolganlari BERT bilan
+    cascade_enabled: bool = False
+    cascade_threshold: float = 0.85
+    cascade_shadow_rate: float = 0.0  # qoidalar natijalarining model bilan solishtiriladigan ulushi
+    
+    # Semantic cache: ma'nosi yaqin promptlar uchun NER forward o'tkazib yuboriladi
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.95  # cosine o'xshashlik chegarasi
+    semantic_cache_capacity: int = 2048  # har bir til uchun yozuvlar soni
+    
+    # Instrumentatsiya: "prometheus", "opentelemetry", "noop"
+    span_hooks: List[str] = ["prometheus"]
+    profile_threshold_ms: Optional[float] = None  # None - profiling o'chiq
+    profile_sample_rate: float = 0.01
+    profiler: str = "cprofile"  # yoki "pyinstrument"
+    profile_dir: str = "profiles"
+    
     class Config:
         env_prefix = "NLP_"
         case_sensitive = False
@@ -0,0 +1,135 @@
+"""
+Sintetik UZ/RU/EN prompt korpusi
+
+Benchmarklar va kichik modellarni offline o'qitish uchun. Har bir namuna
+shablon bo'laklaridan yig'iladi, shuning uchun slotlarning aniq joyi
+(belgi oralig'i) ma'lum bo'ladi.
+"""
+
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .models import Language
+
+
+@dataclass
+class CorpusSample:
+    """Bitta prompt va uning slotlari"""
+    prompt: str
+    language: Language
+    intent: str
+    slots: List[Tuple[str, int, int]] = field(default_factory=list)  # (tur, start, end)
+
+    def slot_texts(self, slot_type: str) -> List[str]:
+        return [self.prompt[start:end] for kind, start, end in self.slots if kind == slot_type]
+
+
+FRAGMENTS: Dict[Language, Dict[str, List[str]]] = {
+    Language.UZBEK: {
+        "TITLE": ["'Design sync'", "'Loyiha bahosi'", "'Sprint reja'", "'Mijoz bilan uchrashuv'", "'Byudjet muhokamasi'"],
+        "DATETIME": ["ertaga soat 15:00 da", "bugun 10:00 da", "ertaga ertalab", "keyingi hafta", "bugun kechqurun", "ertaga 09:30 da"],
+        "DURATION": ["1 soat", "30 daqiqa", "2 soat", "1 soat 30 daqiqa", "butun kun"],
+        "REPEAT": ["har hafta", "har kun", "har dushanba", "har oy", "har juma"],
+        "ALERT": ["10 daqiqa oldin eslat", "30 daqiqa oldin eslat", "1 soat oldin eslat"],
+        "INVITE": ["ali@example.com ni taklif qil", "dilnoza@example.uz ni taklif qil"],
+        "URL": ["https://meet.example.com/abc", "https://zoom.example.uz/42"],
+        "NOTE": ["izoh: slaydlarni tayyorlash", "izoh: hisobotni olib kelish"],
+    },
+    Language.RUSSIAN: {
+        "TITLE": ["'Демо'", "'Планирование спринта'", "'Встреча с клиентом'", "'Ревью бюджета'", "'Синк команды'"],
+        "DATETIME": ["завтра в 15:30", "сегодня в 10:00", "завтра утро", "на следующей неделе", "сегодня вечер", "послезавтра в 11:00"],
+        "DURATION": ["1 час", "30 минут", "2 час", "1 час 30 минут", "весь день"],
+        "REPEAT": ["каждую неделю", "каждый день", "каждый понедельник", "каждый месяц", "каждую пятницу"],
+        "ALERT": ["напомни 10 минут до", "напомни 30 минут до", "напомни 1 час до"],
+        "INVITE": ["пригласи ivan@example.com", "пригласи olga@example.ru"],
+        "URL": ["https://meet.example.com/xyz", "https://zoom.example.ru/7"],
+        "NOTE": ["заметка: подготовить слайды", "заметка: взять отчет"],
+    },
+    Language.ENGLISH: {
+        "TITLE": ["'Budget review'", "'Design sync'", "'Client call'", "'Sprint planning'", "'Team standup'"],
+        "DATETIME": ["tomorrow at 3pm", "today at 10:00", "tomorrow morning", "next week", "today evening", "day after tomorrow at 11:00"],
+        "DURATION": ["1 hour", "30 minutes", "2 hours", "1 hour 30 minutes", "all day"],
+        "REPEAT": ["every week", "every day", "every monday", "every month", "every friday"],
+        "ALERT": ["remind me 10 minutes before", "remind me 30 minutes before", "remind me 1 hour before"],
+        "INVITE": ["invite john@example.com", "invite sara@example.org"],
+        "URL": ["https://meet.example.com/qwe", "https://zoom.example.com/9"],
+        "NOTE": ["note: bring the slides", "note: prepare the report"],
+    },
+}
+
+# "Butun kun" ifodalari DURATION bo'laklari orasida turadi, lekin ALLDAY slot sifatida belgilanadi
+ALLDAY_FRAGMENTS = {"butun kun", "весь день", "all day"}
+
+# Intent uchun bosh so'z va slotlar orasidagi bog'lovchi
+LEADS: Dict[Language, Dict[str, List[str]]] = {
+    Language.UZBEK: {
+        "create": ["Yig'ilish yarat", "Tadbir qo'sh", "Uchrashuv belgila"],
+        "delete": ["Yig'ilishni o'chir", "Tadbirni bekor qil"],
+        "show": ["Tadbirlarni ko'rsat", "Rejamni ko'rsat"],
+        "update": ["Yig'ilishni ko'chir", "Tadbirni o'zgartir"],
+    },
+    Language.RUSSIAN: {
+        "create": ["Создай встречу", "Добавь событие", "Запланируй встречу"],
+        "delete": ["Удали встречу", "Отмени событие"],
+        "show": ["Покажи события", "Покажи расписание"],
+        "update": ["Перенеси встречу", "Измени событие"],
+    },
+    Language.ENGLISH: {
+        "create": ["Create meeting", "Add event", "Schedule a meeting"],
+        "delete": ["Delete meeting", "Cancel the event"],
+        "show": ["Show my events", "Show my schedule"],
+        "update": ["Move the meeting", "Reschedule the event"],
+    },
+}
+
+# Har bir intent uchun qaysi slotlar qatnashishi mumkin
+INTENT_SLOTS: Dict[str, List[str]] = {
+    "create": ["TITLE", "DATETIME", "DURATION", "REPEAT", "ALERT", "INVITE", "URL", "NOTE"],
+    "update": ["TITLE", "DATETIME", "DURATION"],
+    "delete": ["TITLE", "DATETIME"],
+    "show": ["DATETIME"],
+}
+
+INTENT_WEIGHTS = {"create": 0.7, "update": 0.1, "delete": 0.1, "show": 0.1}
+
+
+def _sample(rng: random.Random, language: Language, intent: str) -> CorpusSample:
+    fragments = FRAGMENTS[language]
+    prompt = rng.choice(LEADS[language][intent])
+    slots: List[Tuple[str, int, int]] = []
+
+    candidates = INTENT_SLOTS[intent]
+    # DATETIME deyarli har doim bor, qolganlari tasodifiy
+    chosen = [kind for kind in candidates if kind == "DATETIME" or rng.random() < 0.45]
+    for kind in chosen:
+        text = rng.choice(fragments[kind])
+        prompt += ", " if kind != "TITLE" else " "
+        start = len(prompt)
+        prompt += text
+        slots.append(("ALLDAY" if text in ALLDAY_FRAGMENTS else kind, start, len(prompt)))
+
+    return CorpusSample(prompt=prompt, language=language, intent=intent, slots=slots)
+
+
+def generate_corpus(
+    size: int,
+    seed: int = 0,
+    languages: Optional[List[Language]] = None,
+) -> List[CorpusSample]:
+    """
+    Deterministik korpus yaratish (bir xil seed - bir xil korpus)
+
+    Args:
+        size: namunalar soni
+        seed: random seed
+        languages: tillar (default: uchalasi teng taqsimlanadi)
+    """
+    rng = random.Random(seed)
+    languages = languages or list(Language)
+    intents = list(INTENT_WEIGHTS)
+    weights = list(INTENT_WEIGHTS.values())
+    return [
+        _sample(rng, languages[i % len(languages)], rng.choices(intents, weights)[0])
+        for i in range(size)
+    ]
@@ -0,0 +1,486 @@
+"""
+Kichik student modelni distillash (CPU, offline)
+
+`distilbert-base-multilingual-cased` har bir tugma bosilishida parse qilish
+uchun CPU'da og'ir. Bu yerda joriy (o'qitilgan) intent va NER modellari
+teacher sifatida ishlatiladi va ulardan ancha kichik student o'qitiladi:
+
+1. Sintetik UZ/RU/EN korpus (`corpus.generate_corpus`) yaratiladi, slotlar
+   va intent oltin label sifatida ma'lum.
+2. Lug'at qisqartiriladi: teacher WordPiece lug'atidan faqat korpusda
+   uchragan tokenlar, maxsus tokenlar va lotin/kirill/raqam/tinish belgilari
+   (yakka belgi, `##` bilan ham) qoladi. Korpus tokenlari to'liq saqlangani
+   uchun student korpusni teacher bilan aynan bir xil tokenlaydi va teacher'ning
+   har bir token logitlari studentga to'g'ridan-to'g'ri mos keladi; notanish
+   so'zlar belgi darajasida bo'linadi ([UNK] bo'lmaydi).
+3. Student (kam qatlam, kichik `dim`) intent va NER vazifalarida birgalikda
+   o'qitiladi: ikkala bosh bitta encoder'ni bo'lishadi. Loss - teacher soft
+   labellari bilan KL (temperature) va oltin labellar bilan cross entropy
+   aralashmasi (`alpha`). Embeddinglar teacher embeddinglarining PCA
+   proyeksiyasi bilan boshlanadi.
+4. Student oddiy intent/NER model juftligi sifatida saqlanadi
+   (`model_dir/student/versions/<vaqt>/`), shuning uchun registry, hot swap
+   va mmap o'zgarishsiz ishlaydi. `NLP_MODEL_VARIANT=student` bilan tanlanadi.
+5. Alohida korpusda teacher va student uchun aniqlik (intent accuracy, slot
+   P/R/F1) va latency (bitta prompt p50/p99, batch throughput) hisoboti
+   `distill_report.json` ga yoziladi.
+
+    python -m app.nlp_parser.distill --teacher models/nlp --epochs 3
+"""
+
+import argparse
+import copy
+import json
+import random
+import string
+import sys
+import time
+import unicodedata
+from dataclasses import asdict, dataclass, field
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from transformers import (
+    DistilBertConfig, DistilBertForSequenceClassification, DistilBertForTokenClassification,
+    PreTrainedTokenizerFast,
+)
+
+from .batching import pad_bucket
+from .bert_model import BERTNLPModel
+from .config import settings
+from .corpus import CorpusSample, generate_corpus
+from .registry import VERSIONS_DIR, ModelRegistry, variant_dir
+
+IGNORE_INDEX = -100
+EXTRA_CHARS = set("ʻʼ‘’`«»—–")
+
+
+@dataclass
+class DistillConfig:
+    """Student arxitekturasi va o'qitish parametrlari"""
+    layers: int = 2
+    dim: int = 256
+    heads: int = 4
+    corpus_size: int = 20000
+    eval_size: int = 2000
+    epochs: int = 3
+    batch_size: int = 32
+    learning_rate: float = 5e-4
+    temperature: float = 2.0
+    alpha: float = 0.5
+    seed: int = 0
+
+    @classmethod
+    def from_settings(cls, **overrides) -> "DistillConfig":
+        values = dict(
+            layers=settings.student_layers,
+            dim=settings.student_dim,
+            heads=settings.student_heads,
+            corpus_size=settings.distill_corpus_size,
+            temperature=settings.distill_temperature,
+            alpha=settings.distill_alpha,
+        )
+        values.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(**values)
+
+
+@dataclass
+class DistillSet:
+    """Student tokenlari, oltin labellar va teacher logitlari"""
+    ids: List[List[int]]
+    offsets: List[List[Tuple[int, int]]]
+    intent_labels: np.ndarray
+    slot_labels: List[List[int]]
+    teacher_intent: np.ndarray
+    teacher_slots: List[Optional[np.ndarray]] = field(default_factory=list)  # tokenlash mos kelmasa None
+
+
+# Lug'at
+
+def _kept_char(char: str) -> bool:
+    if char.isdigit() or char in string.punctuation or char in EXTRA_CHARS:
+        return True
+    name = unicodedata.name(char, "")
+    return name.startswith("LATIN") or name.startswith("CYRILLIC")
+
+
+def _remap_post_processor(node: Optional[Dict[str, Any]], remap: Dict[int, int]):
+    """Post-processor ichidagi maxsus token id'larini yangi lug'atga o'tkazish"""
+    if not node:
+        return
+    kind = node.get("type")
+    if kind == "Sequence":
+        for child in node["processors"]:
+            _remap_post_processor(child, remap)
+    elif kind == "TemplateProcessing":
+        for special in node["special_tokens"].values():
+            special["ids"] = [remap[i] for i in special["ids"]]
+    elif kind in ("BertProcessing", "RobertaProcessing"):
+        for key in ("sep", "cls"):
+            token, index = node[key]
+            node[key] = [token, remap[index]]
+
+
+def prune_vocab(tokenizer: PreTrainedTokenizerFast,
+                texts: Sequence[str]) -> Tuple[PreTrainedTokenizerFast, List[int]]:
+    """
+    Teacher WordPiece lug'atini korpus tokenlari va UZ/RU/EN belgilarigacha qisqartirish
+
+    Returns:
+        (student tokenizer, saqlangan teacher id'lari - yangi id tartibida)
+    """
+    state = json.loads(tokenizer.backend_tokenizer.to_str())
+    model = state["model"]
+    if model.get("type") != "WordPiece":
+        raise ValueError(f"Only WordPiece vocabularies can be pruned, got {model.get('type')}")
+    vocab: Dict[str, int] = model["vocab"]
+    prefix = model.get("continuing_subword_prefix") or "##"
+
+    kept = set(tokenizer.all_special_ids)
+    kept.update(added["id"] for added in state.get("added_tokens", []))
+    for ids in tokenizer(list(texts), max_length=settings.max_length, truncation=True,
+                         add_special_tokens=False)["input_ids"]:
+        kept.update(ids)
+    # Yakka belgilar: korpusda bo'lmagan so'zlar ham [UNK]siz tokenlanadi
+    for token, index in vocab.items():
+        piece = token[len(prefix):] if token.startswith(prefix) else token
+        if len(piece) == 1 and _kept_char(piece):
+            kept.add(index)
+
+    kept_ids = sorted(kept)
+    remap = {old: new for new, old in enumerate(kept_ids)}
+    id_to_token = {index: token for token, index in vocab.items()}
+    model["vocab"] = {id_to_token[old]: new for new, old in enumerate(kept_ids)}
+    for added in state.get("added_tokens", []):
+        added["id"] = remap[added["id"]]
+    _remap_post_processor(state.get("post_processor"), remap)
+    # Padding/truncation'ni transformers o'zi boshqaradi
+    state["padding"] = None
+    state["truncation"] = None
+
+    from tokenizers import Tokenizer
+    student = PreTrainedTokenizerFast(
+        tokenizer_object=Tokenizer.from_str(json.dumps(state)),
+        model_input_names=["input_ids", "attention_mask"],
+        model_max_length=settings.max_length,
+        **tokenizer.special_tokens_map,
+    )
+    return student, kept_ids
+
+
+# Ma'lumotlar
+
+def bio_labels(sample: CorpusSample, offsets: Sequence[Tuple[int, int]]) -> List[int]:
+    """Korpus slot oraliqlaridan token darajasidagi BIO label id'lari"""
+    label_ids = {label: index for index, label in enumerate(settings.slot_types)}
+    labels = []
+    opened = set()
+    for start, end in offsets:
+        if end <= start:  # [CLS]/[SEP]
+            labels.append(IGNORE_INDEX)
+            continue
+        label = "O"
+        for kind, slot_start, slot_end in sample.slots:
+            if start >= slot_start and end <= slot_end:
+                label = f"{'I' if (slot_start, slot_end) in opened else 'B'}-{kind}"
+                opened.add((slot_start, slot_end))
+                break
+        labels.append(label_ids.get(label, label_ids["O"]))
+    return labels
+
+
+def teacher_logits(teacher: BERTNLPModel, prompts: Sequence[str],
+                   batch_size: int) -> Tuple[np.ndarray, List[np.ndarray], List[List[int]]]:
+    """Teacher intent logitlari `[N, intents]`, har bir prompt uchun NER logitlari va token id'lari"""
+    encoded = teacher.tokenizer(list(prompts), max_length=settings.max_length, truncation=True)
+    intents: List[np.ndarray] = []
+    slots: List[np.ndarray] = []
+    for start in range(0, len(prompts), batch_size):
+        batch = encoded["input_ids"][start:start + batch_size]
+        ids, mask = pad_bucket(batch, teacher.tokenizer.pad_token_id)
+        inputs = {
+            "input_ids": torch.from_numpy(ids).to(teacher.device),
+            "attention_mask": torch.from_numpy(mask).to(teacher.device),
+        }
+        with torch.no_grad():
+            intents.append(teacher.intent_model(**inputs).logits.float().cpu().numpy())
+            ner = teacher.ner_model(**inputs).logits.float().cpu().numpy()
+        slots.extend(ner[row, :len(sequence)] for row, sequence in enumerate(batch))
+    return np.concatenate(intents), slots, encoded["input_ids"]
+
+
+def prepare(teacher: BERTNLPModel, tokenizer: PreTrainedTokenizerFast, kept_ids: List[int],
+            samples: Sequence[CorpusSample], batch_size: int) -> DistillSet:
+    prompts = [sample.prompt for sample in samples]
+    intent_logits, slot_logits, teacher_ids = teacher_logits(teacher, prompts, batch_size)
+    encoded = tokenizer(prompts, max_length=settings.max_length, truncation=True,
+                        return_offsets_mapping=True)
+
+    remap = {old: new for new, old in enumerate(kept_ids)}
+    teacher_slots: List[Optional[np.ndarray]] = []
+    for ids, original, logits in zip(encoded["input_ids"], teacher_ids, slot_logits):
+        # Qisqartirilgan lug'at korpusni aynan bir xil tokenlashi kerak
+        same = [remap.get(index, -1) for index in original] == ids
+        teacher_slots.append(logits if same else None)
+
+    return DistillSet(
+        ids=encoded["input_ids"],
+        offsets=encoded["offset_mapping"],
+        intent_labels=np.asarray([settings.intents.index(sample.intent) for sample in samples]),
+        slot_labels=[bio_labels(sample, offsets) for sample, offsets in zip(samples, encoded["offset_mapping"])],
+        teacher_intent=intent_logits,
+        teacher_slots=teacher_slots,
+    )
+
+
+# Student
+
+def build_student(tokenizer: PreTrainedTokenizerFast, config: DistillConfig,
+                  teacher: Optional[BERTNLPModel] = None, kept_ids: Optional[List[int]] = None):
+    """Umumiy encoder'li intent va NER student (o'qitish uchun)"""
+    def model_config(num_labels: int) -> DistilBertConfig:
+        return DistilBertConfig(
+            vocab_size=len(tokenizer),
+            dim=config.dim,
+            n_layers=config.layers,
+            n_heads=config.heads,
+            hidden_dim=config.dim * 4,
+            max_position_embeddings=settings.max_length,
+            pad_token_id=tokenizer.pad_token_id,
+            num_labels=num_labels,
+        )
+
+    torch.manual_seed(config.seed)
+    intent_model = DistilBertForSequenceClassification(model_config(len(settings.intents)))
+    ner_model = DistilBertForTokenClassification(model_config(len(settings.slot_types)))
+    ner_model.distilbert = intent_model.distilbert
+
+    if teacher is not None and kept_ids is not None:
+        weights = teacher.intent_model.get_input_embeddings().weight.detach().float().cpu()[kept_ids]
+        if weights.shape[1] > config.dim and weights.shape[0] >= config.dim:
+            # Teacher embeddinglarining asosiy komponentlari, teacher masshtabida
+            centered = weights - weights.mean(dim=0)
+            _, _, components = torch.pca_lowrank(centered, q=config.dim, center=False)
+            projected = centered @ components[:, :config.dim]
+            weights = projected * (weights.std() / projected.std())
+        if weights.shape[1] == config.dim:
+            intent_model.get_input_embeddings().weight.data.copy_(weights)
+    return intent_model, ner_model
+
+
+def distill_loss(student: torch.Tensor, teacher: Optional[torch.Tensor], labels: torch.Tensor,
+                 temperature: float, alpha: float, soft_mask: Optional[torch.Tensor] = None) -> torch.Tensor:
+    """alpha * T^2 * KL(teacher || student) + (1 - alpha) * CE(oltin label)"""
+    classes = student.shape[-1]
+    hard = F.cross_entropy(student.reshape(-1, classes), labels.reshape(-1), ignore_index=IGNORE_INDEX)
+    if teacher is None or alpha <= 0:
+        return hard
+    soft = F.kl_div(
+        F.log_softmax(student / temperature, dim=-1),
+        F.softmax(teacher / temperature, dim=-1),
+        reduction="none",
+    ).sum(dim=-1)
+    if soft_mask is not None:
+        soft = soft[soft_mask]
+    soft = soft.mean() if soft.numel() else soft.sum()
+    return alpha * temperature ** 2 * soft + (1 - alpha) * hard
+
+
+def train(intent_model, ner_model, data: DistillSet, config: DistillConfig, pad_id: int, log=print):
+    params = list({id(param): param for param in chain(intent_model.parameters(), ner_model.parameters())}.values())
+    optimizer = torch.optim.AdamW(params, lr=config.learning_rate, weight_decay=0.01)
+    steps_per_epoch = (len(data.ids) + config.batch_size - 1) // config.batch_size
+    total = max(1, steps_per_epoch * config.epochs)
+    warmup = max(1, total // 20)
+    scheduler = torch.optim.lr_scheduler.LambdaLR(
+        optimizer, lambda step: min((step + 1) / warmup, max(0.0, (total - step) / (total - warmup or 1))),
+    )
+    rng = random.Random(config.seed)
+    labels_count = len(settings.slot_types)
+
+    intent_model.train()
+    ner_model.train()
+    for epoch in range(config.epochs):
+        order = list(range(len(data.ids)))
+        rng.shuffle(order)
+        running = 0.0
+        for start in range(0, len(order), config.batch_size):
+            indices = order[start:start + config.batch_size]
+            ids, mask = pad_bucket([data.ids[i] for i in indices], pad_id)
+            slot_labels, _ = pad_bucket([data.slot_labels[i] for i in indices], IGNORE_INDEX)
+            width = ids.shape[1]
+            teacher_slots = np.zeros((len(indices), width, labels_count), dtype=np.float32)
+            soft_mask = np.zeros((len(indices), width), dtype=bool)
+            for row, i in enumerate(indices):
+                logits = data.teacher_slots[i]
+                if logits is not None:
+                    teacher_slots[row, :len(logits)] = logits
+                    soft_mask[row, :len(logits)] = True
+            soft_mask &= slot_labels != IGNORE_INDEX
+
+            inputs = {"input_ids": torch.from_numpy(ids), "attention_mask": torch.from_numpy(mask)}
+            intent_loss = distill_loss(
+                intent_model(**inputs).logits,
+                torch.from_numpy(data.teacher_intent[indices]),
+                torch.from_numpy(data.intent_labels[indices]),
+                config.temperature, config.alpha,
+            )
+            slot_loss = distill_loss(
+                ner_model(**inputs).logits,
+                torch.from_numpy(teacher_slots),
+                torch.from_numpy(slot_labels),
+                config.temperature, config.alpha,
+                torch.from_numpy(soft_mask),
+            )
+            loss = intent_loss + slot_loss
+            optimizer.zero_grad()
+            loss.backward()
+            torch.nn.utils.clip_grad_norm_(params, 1.0)
+            optimizer.step()
+            scheduler.step()
+            running += loss.item()
+        log(f"epoch {epoch + 1}/{config.epochs}: loss {running / steps_per_epoch:.4f}")
+
+    intent_model.eval()
+    ner_model.eval()
+
+
+# Hisobot
+
+def parameter_count(model: BERTNLPModel) -> int:
+    params = {id(param): param for param in chain(model.intent_model.parameters(), model.ner_model.parameters())}
+    return sum(param.numel() for param in params.values())
+
+
+def evaluate(model: BERTNLPModel, samples: Sequence[CorpusSample], latency_samples: int = 200) -> Dict[str, float]:
+    """Intent accuracy, slot P/R/F1 (aniq oraliq mosligi) va CPU latency"""
+    prompts = [sample.prompt for sample in samples]
+    started = time.perf_counter()
+    intents = model.predict_intent_batch(prompts)
+    slots = model.extract_slots_batch(prompts)
+    batch_seconds = time.perf_counter() - started
+
+    correct = sum(intent.value == sample.intent for (intent, _), sample in zip(intents, samples))
+    true_positive = predicted = expected = 0
+    for sample, found in zip(samples, slots):
+        gold = {(kind, start, end) for kind, start, end in sample.slots}
+        guess = {(slot["type"], slot["start"], slot["end"]) for slot in found}
+        true_positive += len(gold & guess)
+        predicted += len(guess)
+        expected += len(gold)
+    precision = true_positive / predicted if predicted else 0.0
+    recall = true_positive / expected if expected else 0.0
+
+    latencies = []
+    for prompt in prompts[:latency_samples]:
+        start = time.perf_counter()
+        model.predict_intent(prompt)
+        model.extract_slots(prompt)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "parameters": parameter_count(model),
+        "vocab_size": len(model.tokenizer),
+        "intent_accuracy": correct / len(samples) if samples else 0.0,
+        "slot_precision": precision,
+        "slot_recall": recall,
+        "slot_f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000 if latencies else 0.0,
+        "p99_ms": float(np.percentile(latencies, 99)) * 1000 if latencies else 0.0,
+        "batch_prompts_per_sec": len(prompts) / batch_seconds if batch_seconds > 0 else 0.0,
+    }
+
+
+def distill(teacher: BERTNLPModel, output_dir: Path, config: DistillConfig, log=print) -> Dict[str, Any]:
+    """To'liq pipeline: korpus -> lug'at -> teacher logitlari -> o'qitish -> saqlash -> hisobot"""
+    corpus = generate_corpus(config.corpus_size, seed=config.seed)
+    # Baholash faqat o'qitishda uchramagan promptlarda
+    seen = {sample.prompt for sample in corpus}
+    holdout = [sample for sample in generate_corpus(config.eval_size, seed=config.seed + 1)
+               if sample.prompt not in seen]
+    log(f"corpus: {len(corpus)} train, {len(holdout)} held-out prompts")
+
+    tokenizer, kept_ids = prune_vocab(teacher.tokenizer, [sample.prompt for sample in corpus])
+    log(f"vocabulary: {len(teacher.tokenizer)} -> {len(tokenizer)} tokens")
+    data = prepare(teacher, tokenizer, kept_ids, corpus, config.batch_size)
+    mismatched = sum(logits is None for logits in data.teacher_slots)
+    if mismatched:
+        log(f"warning: {mismatched} prompts tokenized differently, trained on gold slot labels only")
+
+    intent_model, ner_model = build_student(tokenizer, config, teacher, kept_ids)
+    train(intent_model, ner_model, data, config, tokenizer.pad_token_id, log)
+    # Servingda har bir model o'z encoder nusxasi bilan saqlanadi va yuklanadi
+    ner_model.distilbert = copy.deepcopy(intent_model.distilbert)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    student = BERTNLPModel.from_components(tokenizer, intent_model, ner_model, model_dir=str(output_dir))
+    student.save_models()
+
+    report = {
+        "config": asdict(config),
+        "teacher": evaluate(teacher, holdout),
+        "student": evaluate(student, holdout),
+    }
+    (output_dir / "distill_report.json").write_text(json.dumps(report, indent=2))
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n{'model':<8} {'params M':>9} {'vocab':>7} {'intent acc':>10} {'slot F1':>8} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'batch/s':>9}")
+    for name in ("teacher", "student"):
+        row = report[name]
+        print(f"{name:<8} {row['parameters'] / 1e6:>9.2f} {row['vocab_size']:>7} {row['intent_accuracy']:>10.1%} "
+              f"{row['slot_f1']:>8.1%} {row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f} "
+              f"{row['batch_prompts_per_sec']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teacher", default=None,
+                        help="o'qitilgan teacher katalogi (default: asosiy variantning faol versiyasi)")
+    parser.add_argument("--output", default=None,
+                        help="default: model_dir/student/versions/<vaqt>")
+    parser.add_argument("--layers", type=int, default=None)
+    parser.add_argument("--dim", type=int, default=None)
+    parser.add_argument("--heads", type=int, default=None)
+    parser.add_argument("--corpus", type=int, default=None, dest="corpus_size")
+    parser.add_argument("--eval", type=int, default=None, dest="eval_size")
+    parser.add_argument("--epochs", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--lr", type=float, default=None, dest="learning_rate")
+    parser.add_argument("--temperature", type=float, default=None)
+    parser.add_argument("--alpha", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.teacher:
+        teacher_dir = Path(args.teacher)
+    else:
+        registry = ModelRegistry(model_dir=str(variant_dir("base")))
+        teacher_dir = registry.version_path(registry.resolve())
+    # Pretrained'ni yuklab olmaslik uchun teacher to'liq diskda bo'lishi kerak
+    missing = [name for name in ("tokenizer", settings.intent_model_path, settings.ner_model_path)
+               if not (teacher_dir / name).exists()]
+    if missing:
+        sys.exit(f"teacher in {teacher_dir} is incomplete (missing: {', '.join(missing)})")
+
+    overrides = {key: value for key, value in vars(args).items() if key not in ("teacher", "output")}
+    config = DistillConfig.from_settings(**overrides)
+    output_dir = Path(args.output) if args.output else (
+        variant_dir("student") / VERSIONS_DIR / time.strftime("%Y%m%d-%H%M%S")
+    )
+
+    torch.manual_seed(config.seed)
+    teacher = BERTNLPModel(str(teacher_dir))
+    report = distill(teacher, output_dir, config)
+    print_report(report)
+    print(f"\nsaved to {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+EventParser uchun instrumentatsiya
+
+Har bir bosqich (til, tokenizatsiya, BERT o'tishlari, normalizatsiya,
+validatsiya) `RequestTrace.stage()` orqali o'lchanadi va ulangan hook'larga
+uzatiladi. Hook ulanmagan bo'lsa `NoopHook` ishlaydi.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import ExitStack, contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Python 3.12+ da bir vaqtda faqat bitta profiler yoqilishi mumkin
+_profiler_lock = threading.Lock()
+
+
+class SpanHook:
+    """Hook interfeysi - kerakli metodlarni override qiling"""
+
+    def span(self, name: str):
+        """Bosqich (yoki butun so'rov) davomida ochiq turadigan context (default - yo'q)"""
+        return nullcontext()
+
+    def on_stage(self, name: str, start: float, end: float):
+        pass
+
+    def on_request(self, stages: Dict[str, float], total: float, start: float, end: float):
+        pass
+
+
+class NoopHook(SpanHook):
+    """Hech narsa qilmaydigan default hook"""
+
+
+class PrometheusHook(SpanHook):
+    """Bosqich davomiyligini parser_stage_duration_seconds histogramiga yozadi"""
+
+    def __init__(self, parser: str = "bert"):
+        from app.core.metrics import PARSER_STAGE_LATENCY
+        self.histogram = PARSER_STAGE_LATENCY
+        self.parser = parser
+
+    def on_stage(self, name: str, start: float, end: float):
+        self.histogram.labels(self.parser, name).observe(end - start)
+
+
+class OpenTelemetryHook(SpanHook):
+    """
+    Har bir so'rov uchun `event_parser.parse` span va uning ichida har bir
+    bosqich uchun child span (opentelemetry-api o'rnatilgan bo'lishi kerak).
+    Spanlar bosqich boshlanganda ochilib tugaganda yopiladi, shuning uchun
+    bosqichlar orasidagi vaqt va ichma-ich bosqichlar haqiqiy ko'rinadi.
+    """
+
+    def __init__(self, tracer_name: str = "app.nlp_parser"):
+        from opentelemetry import trace
+        self.trace = trace
+        self.tracer = trace.get_tracer(tracer_name)
+
+    def span(self, name: str):
+        return self.tracer.start_as_current_span(name)
+
+    def on_request(self, stages: Dict[str, float], total: float, start: float, end: float):
+        # request() ichida chaqiriladi: joriy span - event_parser.parse
+        self.trace.get_current_span().set_attribute("parser.total_seconds", total)
+
+
+class RequestTrace:
+    """Bitta parse so'rovining bosqichlari"""
+
+    def __init__(self, hooks: List[SpanHook]):
+        self.hooks = hooks
+        # Faqat span ochadigan hook'lar (NoopHook/PrometheusHook uchun ortiqcha ish yo'q)
+        self.span_hooks = [hook for hook in hooks if type(hook).span is not SpanHook.span]
+        self.stages: Dict[str, float] = {}
+        self.total = 0.0
+
+    def spans(self, name: str):
+        if not self.span_hooks:
+            return nullcontext()
+        stack = ExitStack()
+        for hook in self.span_hooks:
+            stack.enter_context(hook.span(name))
+        return stack
+
+    @contextmanager
+    def stage(self, name: str):
+        with self.spans(name):
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                end = time.perf_counter()
+                self.stages[name] = self.stages.get(name, 0.0) + (end - start)
+                for hook in self.hooks:
+                    hook.on_stage(name, start, end)
+
+
+def span(trace: Optional[RequestTrace], name: str):
+    """trace bo'lmasa bo'sh context qaytaradi"""
+    return trace.stage(name) if trace is not None else nullcontext()
+
+
+class Instrumentation:
+    """
+    Hook'lar va sekin so'rovlarni profiling qilish
+
+    Args:
+        hooks: SpanHook ro'yxati (bo'sh bo'lsa NoopHook)
+        profile_threshold_ms: shu chegaradan sekin so'rovlar profili saqlanadi
+        profile_sample_rate: profiler yoqiladigan so'rovlar ulushi
+        profiler: "cprofile" yoki "pyinstrument"
+        profile_dir: profil fayllari papkasi
+    """
+
+    def __init__(
+        self,
+        hooks: Optional[List[SpanHook]] = None,
+        profile_threshold_ms: Optional[float] = None,
+        profile_sample_rate: float = 0.0,
+        profiler: str = "cprofile",
+        profile_dir: str = "profiles",
+    ):
+        self.hooks = hooks or [NoopHook()]
+        self.profile_threshold_ms = profile_threshold_ms
+        self.profile_sample_rate = profile_sample_rate
+        self.profiler = profiler
+        self.profile_dir = profile_dir
+        self.captured_profiles = 0
+
+    @classmethod
+    def from_settings(cls) -> "Instrumentation":
+        factories = {
+            "prometheus": PrometheusHook,
+            "opentelemetry": OpenTelemetryHook,
+            "noop": NoopHook,
+        }
+        hooks = [factories[name]() for name in settings.span_hooks]
+        return cls(
+            hooks=hooks,
+            profile_threshold_ms=settings.profile_threshold_ms,
+            profile_sample_rate=settings.profile_sample_rate,
+            profiler=settings.profiler,
+            profile_dir=settings.profile_dir,
+        )
+
+    def _should_profile(self) -> bool:
+        return (
+            self.profile_threshold_ms is not None
+            and self.profile_sample_rate > 0
+            and random.random() < self.profile_sample_rate
+        )
+
+    @contextmanager
+    def request(self):
+        """
+        So'rovni kuzatish. Sampling bo'yicha profiler yoqiladi, natija esa
+        faqat so'rov `profile_threshold_ms` dan sekin bo'lsa saqlanadi.
+        """
+        trace = RequestTrace(self.hooks)
+        profiler = self._start_profiler() if self._should_profile() else None
+        with trace.spans("event_parser.parse"):
+            start = time.perf_counter()
+            try:
+                yield trace
+            finally:
+                end = time.perf_counter()
+                total = trace.total = end - start
+                for hook in self.hooks:
+                    hook.on_request(trace.stages, total, start, end)
+                if profiler is not None:
+                    self._finish_profiler(profiler, total)
+
+    def _start_profiler(self):
+        """Profiler band bo'lsa (boshqa so'rov profiling qilinmoqda) yoki xato bersa None"""
+        if not _profiler_lock.acquire(blocking=False):
+            return None
+        try:
+            if self.profiler == "pyinstrument":
+                from pyinstrument import Profiler
+                profiler = Profiler()
+                profiler.start()
+            else:
+                import cProfile
+                profiler = cProfile.Profile()
+                profiler.enable()
+        except Exception as e:
+            _profiler_lock.release()
+            logger.warning("Profiler not started: %s", e)
+            return None
+        return profiler
+
+    def _finish_profiler(self, profiler, total: float):
+        """Profiler xatosi so'rovga ta'sir qilmaydi"""
+        try:
+            profiler.stop() if hasattr(profiler, "stop") else profiler.disable()
+            if total * 1000 >= self.profile_threshold_ms:
+                self._save_profile(profiler, total)
+        except Exception as e:
+            logger.warning("Profile not saved: %s", e)
+        finally:
+            _profiler_lock.release()
+
+    def _save_profile(self, profiler, total: float):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stamp = f"{int(time.time() * 1000)}_{int(total * 1000)}ms"
+        if self.profiler == "pyinstrument":
+            path = os.path.join(self.profile_dir, f"parse_{stamp}.html")
+            with open(path, "w") as f:
+                f.write(profiler.output_html())
+        else:
+            path = os.path.join(self.profile_dir, f"parse_{stamp}.prof")
+            profiler.dump_stats(path)
+        self.captured_profiles += 1
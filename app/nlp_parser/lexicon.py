@@ -0,0 +1,78 @@
+"""
+Qoidalar va normalizerlar bo'lishadigan lug'atlar
+
+Og'ir dependency'larsiz (dateutil, torch) import qilinadi, shuning uchun
+rule engine ularni yuklamasdan ishlaydi.
+"""
+
+from typing import Any, Dict, List
+
+from .models import Intent, Language
+
+# Relative vaqt lug'atlari (DateTimeNormalizer ham shu jadvaldan foydalanadi)
+RELATIVE_TERMS: Dict[Language, Dict[str, Any]] = {
+    Language.UZBEK: {
+        'bugun': 0,
+        'ertaga': 1,
+        'undan keyingi kun': 2,
+        'kecha': -1,
+        'shu hafta': 'this_week',
+        'keyingi hafta': 'next_week',
+        'hafta oxiri': 'weekend',
+        'ertalab': 'morning',
+        'tush': 'afternoon',
+        'kechqurun': 'evening',
+        'tun': 'night'
+    },
+    Language.RUSSIAN: {
+        'сегодня': 0,
+        'завтра': 1,
+        'послезавтра': 2,
+        'вчера': -1,
+        'на этой неделе': 'this_week',
+        'на следующей неделе': 'next_week',
+        'выходные': 'weekend',
+        'утро': 'morning',
+        'день': 'afternoon',
+        'вечер': 'evening',
+        'ночь': 'night'
+    },
+    Language.ENGLISH: {
+        'today': 0,
+        'tomorrow': 1,
+        'day after tomorrow': 2,
+        'yesterday': -1,
+        'this week': 'this_week',
+        'next week': 'next_week',
+        'weekend': 'weekend',
+        'morning': 'morning',
+        'afternoon': 'afternoon',
+        'evening': 'evening',
+        'night': 'night'
+    }
+}
+
+# Intent kalit so'zlari (FakeEventParser.intent_patterns bilan bir xil,
+# korpusdagi "belgila", "перенеси", "reschedule" kabi shakllar qo'shilgan)
+INTENT_KEYWORDS: Dict[Intent, List[str]] = {
+    Intent.CREATE: [
+        "yarat", "qo'sh", "planla", "tayinla", "belgila",
+        "создай", "добавь", "запланируй", "назначь",
+        "create", "add", "schedule", "appoint",
+    ],
+    Intent.UPDATE: [
+        "o'zgartir", "ko'chir", "yangila", "tahrir",
+        "измени", "передвинь", "перенеси", "обнови", "редактируй",
+        "change", "move", "update", "edit", "reschedule",
+    ],
+    Intent.DELETE: [
+        "o'chir", "bekor qil", "olib tashla",
+        "удали", "отмени", "убери",
+        "delete", "cancel", "remove",
+    ],
+    Intent.SHOW: [
+        "ko'rsat", "ro'yxat", "qidir",
+        "покажи", "список", "найди",
+        "show", "list", "find",
+    ],
+}
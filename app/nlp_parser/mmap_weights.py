@@ -0,0 +1,116 @@
+"""
+safetensors vaznlarini memory-map orqali yuklash
+
+`from_pretrained` vaznlarni har bir process'ning o'z xotirasiga nusxalaydi.
+Shuning uchun N ta worker N ta nusxa saqlaydi. Bu yerda `model.safetensors`
+fayli `MAP_PRIVATE` bilan map qilinadi va parametrlar to'g'ridan-to'g'ri shu
+xotiraga qaraydigan tensorlar bo'ladi (`load_state_dict(assign=True)`).
+Inference vaznlarga yozmaydi, shuning uchun barcha processlar page cache'dagi
+bir xil fizik sahifalarni bo'lishadi. RSS har bir processda to'liq
+ko'rinadi, PSS esa processlar soniga bo'linadi.
+
+Fayl formati: 8 bayt (little-endian uzunlik) + JSON header + ma'lumotlar.
+Header'da har bir tensor uchun `dtype`, `shape`, `data_offsets` beriladi.
+safetensors kutubxonasi yuklash uchun kerak emas, faqat saqlash uchun
+(`save_pretrained(safe_serialization=True)`).
+"""
+
+import json
+import struct
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+WEIGHTS_NAME = "model.safetensors"
+
+# safetensors dtype -> (torch dtype nomi, bayt)
+DTYPES = {
+    "F64": ("float64", 8),
+    "F32": ("float32", 4),
+    "F16": ("float16", 2),
+    "BF16": ("bfloat16", 2),
+    "I64": ("int64", 8),
+    "I32": ("int32", 4),
+    "I16": ("int16", 2),
+    "I8": ("int8", 1),
+    "U8": ("uint8", 1),
+    "BOOL": ("bool", 1),
+}
+
+
+def read_header(path: Path) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+    """
+    Header'ni o'qish
+
+    Returns:
+        (ma'lumotlar boshlanadigan bayt, tensor nomi -> {"dtype", "shape", "data_offsets"})
+    """
+    with open(path, "rb") as f:
+        (size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(size))
+    header.pop("__metadata__", None)
+    return 8 + size, header
+
+
+def has_mmap_weights(model_path: Path) -> bool:
+    """Bitta (shard qilinmagan) safetensors fayli bor"""
+    return (Path(model_path) / WEIGHTS_NAME).is_file()
+
+
+def load_state_dict(path: Path) -> Dict[str, Any]:
+    """
+    Faylni map qilib, har bir tensorni shu xotiraga view sifatida qaytarish.
+    Offset element o'lchamiga karrali bo'lmasa o'sha tensor nusxalanadi.
+    """
+    import torch
+
+    path = Path(path)
+    data_start, header = read_header(path)
+    storage = torch.UntypedStorage.from_file(str(path), shared=False, nbytes=path.stat().st_size)
+
+    state: Dict[str, Any] = {}
+    for name, info in header.items():
+        dtype_name, itemsize = DTYPES[info["dtype"]]
+        dtype = getattr(torch, dtype_name)
+        begin, end = info["data_offsets"]
+        offset = data_start + begin
+        shape = info["shape"]
+        if offset % itemsize == 0:
+            tensor = torch.empty(0, dtype=dtype)
+            tensor.set_(storage, offset // itemsize, shape)
+        else:
+            raw = torch.empty(0, dtype=torch.uint8).set_(storage, offset, (end - begin,))
+            tensor = raw.clone().view(dtype).reshape(shape)
+        state[name] = tensor
+    return state
+
+
+def load_pretrained(model_cls, model_path: Path):
+    """
+    `from_pretrained` o'rniga: config'dan model yaratiladi, keyin
+    parametrlar map qilingan tensorlar bilan almashtiriladi.
+
+    Args:
+        model_cls: AutoModelForSequenceClassification / AutoModelForTokenClassification
+        model_path: config.json va model.safetensors joylashgan katalog
+    """
+    from transformers import AutoConfig
+
+    model_path = Path(model_path)
+    config = AutoConfig.from_pretrained(str(model_path))
+    model = model_cls.from_config(config)
+    state = load_state_dict(model_path / WEIGHTS_NAME)
+
+    # Prefikssiz saqlangan bazaviy model vaznlari (masalan "distilbert." siz)
+    prefix = getattr(model, "base_model_prefix", "")
+    expected = model.state_dict().keys()
+    if prefix and not any(key in expected for key in state):
+        state = {f"{prefix}.{key}": value for key, value in state.items()}
+
+    result = model.load_state_dict(state, strict=False, assign=True)
+    # Fayldan tushirib qoldirilgan bog'langan (tied) vaznlar qayta bog'lanadi
+    model.tie_weights()
+    tied = set(getattr(model, "_tied_weights_keys", None) or [])
+    missing = [key for key in result.missing_keys if key not in tied]
+    if missing:
+        raise ValueError(f"{model_path}: missing weights {missing[:5]}")
+    return model.eval()
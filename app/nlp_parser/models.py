@@ -84,6 +84,7 @@ class ParseRequest(BaseModel):
     locale: Optional[Language] = None
     user_timezone: str = "Asia/Tashkent"
     user_id: Optional[UUID] = None
+    include_timings: bool = False  # javobga bosqichlar davomiyligini qo'shish
 
 class ParseResponse(BaseModel):
     """Parser javobi"""
@@ -91,4 +92,6 @@ class ParseResponse(BaseModel):
     data: Optional[ParsedEvent] = None
     error: Optional[str] = None
     processing_time: float
-    model_version: str = "1.0.0"
\ No newline at end of file
+    stage_timings: Optional[Dict[str, float]] = None  # bosqich -> sekund
+    tier: Optional[str] = None  # "rules", "semantic" yoki "model" (cascade)
+    model_version: Optional[str] = None  # javob bergan model versiyasi (rules tier'da None)
\ No newline at end of file
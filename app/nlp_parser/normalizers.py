@@ -8,6 +8,7 @@ from iso8601 import parse_duration
 
 from .config import settings
 from .models import Language
+from .lexicon import RELATIVE_TERMS
 from .exceptions import NormalizationError
 
 class DateTimeNormalizer:
@@ -18,47 +19,7 @@ class DateTimeNormalizer:
         self.now = datetime.now(self.timezone)
         
         # Relative vaqt lug'atlari
-        self.relative_terms = {
-            Language.UZBEK: {
-                'bugun': 0,
-                'ertaga': 1,
-                'undan keyingi kun': 2,
-                'kecha': -1,
-                'shu hafta': 'this_week',
-                'keyingi hafta': 'next_week',
-                'hafta oxiri': 'weekend',
-                'ertalab': 'morning',
-                'tush': 'afternoon',
-                'kechqurun': 'evening',
-                'tun': 'night'
-            },
-            Language.RUSSIAN: {
-                'сегодня': 0,
-                'завтра': 1,
-                'послезавтра': 2,
-                'вчера': -1,
-                'на этой неделе': 'this_week',
-                'на следующей неделе': 'next_week',
-                'выходные': 'weekend',
-                'утро': 'morning',
-                'день': 'afternoon',
-                'вечер': 'evening',
-                'ночь': 'night'
-            },
-            Language.ENGLISH: {
-                'today': 0,
-                'tomorrow': 1,
-                'day after tomorrow': 2,
-                'yesterday': -1,
-                'this week': 'this_week',
-                'next week': 'next_week',
-                'weekend': 'weekend',
-                'morning': 'morning',
-                'afternoon': 'afternoon',
-                'evening': 'evening',
-                'night': 'night'
-            }
-        }
+        self.relative_terms = RELATIVE_TERMS
         
         # Vaqt formatlari
         self.time_formats = [
@@ -1,25 +1,66 @@
-from fastapi import APIRouter, HTTPException, Depends
-from nlp_parser.parser import EventParser
-from nlp_parser.models import ParseRequest, ParseResponse
+import asyncio
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Header
+from app.nlp_parser.models import ParseRequest, ParseResponse
+from app.nlp_parser.config import settings
+from app.core.logger import get_logger
+from app.core.settings import settings as app_settings
+from app.core.singleflight import SingleFlight, parse_key
 from app.dependencies import get_db
 from app.models import AuditLog
 
+logger = get_logger(__name__)
+
 router = APIRouter(prefix="/parse", tags=["parser"])
 
 # Global parser instance
 _parser = None
 
+# Bir xil parallel so'rovlar bitta parse'ni kutadi (audit log har biri uchun alohida)
+parse_flight = SingleFlight("parse")
+
 def get_parser():
-    """Parser instance olish"""
+    """Parser instance olish (torch birinchi so'rovda yuklanadi)"""
     global _parser
     if _parser is None:
+        from app.nlp_parser.parser import EventParser
         _parser = EventParser()
     return _parser
 
+
+async def start_model_watch():
+    """
+    App lifespan'da: watch yoqilgan bo'lsa parser oldindan yuklanadi va
+    boshqa worker CURRENT'ni o'zgartirsa shu worker ham almashtiradi
+    """
+    if settings.model_watch_interval_seconds <= 0:
+        return
+    try:
+        parser = await asyncio.to_thread(get_parser)
+    except Exception as e:
+        logger.error("Model watch not started, parser failed to load: %s", e)
+        return
+    parser.registry.watch(settings.model_watch_interval_seconds)
+
+
+def stop_model_watch():
+    if _parser is not None:
+        _parser.registry.stop()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """NLP_ADMIN_TOKEN sozlanmagan bo'lsa endpointlar yopiq (404)"""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
 @router.post("/", response_model=ParseResponse)
 async def parse_prompt(
     request: ParseRequest,
-    parser: EventParser = Depends(get_parser),
+    parser = Depends(get_parser),
     db = Depends(get_db)
 ):
     """
@@ -34,7 +75,14 @@ async def parse_prompt(
         Parsed event ma'lumotlari
     """
     try:
-        response = parser.parse(request)
+        if app_settings.SINGLEFLIGHT_ENABLED:
+            key = parse_key(
+                request.prompt, request.locale, request.user_timezone,
+                parser.registry.version, request.include_timings,
+            )
+            response = await parse_flight.do(key, lambda: asyncio.to_thread(parser.parse, request))
+        else:
+            response = parser.parse(request)
         
         # Audit log yozish
         if request.user_id:
@@ -58,4 +106,31 @@ async def parse_prompt(
         return response
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/admin/models", dependencies=[Depends(require_admin)])
+async def model_status(parser = Depends(get_parser)):
+    """
+    Faol versiya, mavjud versiyalar, oxirgi yuklash holati, semantic cache va
+    kaskad (tier ulushlari, shadow taqqoslash va oxirgi nomuvofiqliklar)
+    """
+    return {
+        **parser.registry.stats(),
+        "available": parser.registry.versions(),
+        "semantic_cache": parser.semantic_cache.stats(),
+        "cascade": parser.cascade.stats(),
+    }
+
+
+@router.post("/admin/models/{version}/activate", status_code=202, dependencies=[Depends(require_admin)])
+async def activate_model(version: str, parser = Depends(get_parser)):
+    """
+    Versiyani fon rejimida yuklash va tayyor bo'lgach almashtirish.
+    Joriy so'rovlar eski versiyada tugaydi; CURRENT fayli yangilanadi.
+    """
+    try:
+        parser.registry.activate(version)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return parser.registry.stats()
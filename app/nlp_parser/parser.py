@@ -2,9 +2,10 @@ import re
 import json
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
-import time
 from uuid import UUID
 
+import pytz
+
 from .models import (
     ParseRequest, ParseResponse, ParsedEvent, Intent, Language, Slot
 )
@@ -13,14 +14,32 @@ from .normalizers import DateTimeNormalizer, DurationNormalizer, RepeatNormalize
 from .bert_model import BERTNLPModel
 from .config import settings
 from .exceptions import ParseError
+from .instrumentation import Instrumentation, RequestTrace
+from .rules import Cascade
+from .registry import ModelRegistry
+from .semantic_cache import SemanticCache
 
 class EventParser:
     """Asosiy event parser"""
     
-    def __init__(self, model_dir: str = None):
+    def __init__(self, model_dir: str = None, instrumentation: Optional[Instrumentation] = None,
+                 bert_model: Optional[BERTNLPModel] = None, cascade: Optional[Cascade] = None,
+                 registry: Optional[ModelRegistry] = None,
+                 semantic_cache: Optional[SemanticCache] = None):
         self.language_detector = LanguageDetector()
-        self.bert_model = BERTNLPModel(model_dir)
+        self.instrumentation = instrumentation or Instrumentation.from_settings()
+        if registry is None:
+            registry = ModelRegistry.fixed(bert_model) if bert_model else ModelRegistry.from_settings(model_dir)
+        self.registry = registry
+        self.registry.current()  # birinchi versiyani oldindan yuklash
+        self.cascade = cascade or Cascade.from_settings()
+        self.semantic_cache = semantic_cache or SemanticCache.from_settings()
         self.timezone = pytz.timezone(settings.default_timezone)
+    
+    @property
+    def bert_model(self) -> BERTNLPModel:
+        """Hozirgi faol model (hot swap'dan keyin yangisi)"""
+        return self.registry.current().model
         
     def parse(self, request: ParseRequest) -> ParseResponse:
         """
@@ -32,35 +51,86 @@ class EventParser:
         Returns:
             ParseResponse: Tahlil natijasi
         """
-        start_time = time.time()
+        with self.instrumentation.request() as trace:
+            try:
+                response = self._parse(request, trace)
+            except Exception as e:
+                response = ParseResponse(success=False, error=str(e), processing_time=0.0)
         
-        try:
-            prompt = request.prompt.strip()
-            if not prompt:
-                raise ParseError("Prompt cannot be empty")
-            
-            # 1. Tilni aniqlash
+        response.processing_time = trace.total
+        if request.include_timings:
+            response.stage_timings = dict(trace.stages)
+        return response
+    
+    def _parse(self, request: ParseRequest, trace: RequestTrace) -> ParseResponse:
+        """parse() ning bosqichlari (har biri trace'ga yoziladi)"""
+        prompt = request.prompt.strip()
+        if not prompt:
+            raise ParseError("Prompt cannot be empty")
+        
+        # 1. Tilni aniqlash
+        with trace.stage("language"):
             if request.locale:
                 language = request.locale
                 lang_confidence = 1.0
             else:
                 language, lang_confidence = self.language_detector.detect(prompt)
-            
-            # 2. Intentni aniqlash
-            intent, intent_confidence = self.bert_model.predict_intent(prompt)
-            
-            # 3. Slotlarni ajratib olish
-            raw_slots = self.bert_model.extract_slots(prompt)
-            
-            # 4. Slotlarni normalizatsiya qilish
+        
+        # 2-3. Intent va slotlar: avval qoidalar, ishonch yetmasa BERT
+        rule_result = None
+        if self.cascade.enabled:
+            with trace.stage("rules"):
+                rule_result = self.cascade.route(prompt)
+        
+        model_version = None
+        if rule_result is not None:
+            tier = "rules"
+            intent, intent_confidence = rule_result.intent, rule_result.intent_confidence
+            raw_slots = rule_result.slots
+            self.cascade.maybe_shadow(prompt, rule_result, self._model_predict)
+        else:
+            tier = "model"
+            # Handle bir marta olinadi: swap bo'lsa ham so'rov shu versiyada tugaydi
+            handle = self.registry.current()
+            model_version = handle.version
+            if self.semantic_cache.enabled:
+                # Embedding intent forward'ining o'zidan olinadi
+                with trace.stage("intent"):
+                    intent, intent_confidence, embedding = handle.model.predict_intent(prompt, trace, True)
+                cache_language = getattr(language, "value", language)
+                with trace.stage("semantic_cache"):
+                    raw_slots = self.semantic_cache.lookup(
+                        model_version, cache_language, embedding, prompt, intent
+                    )
+                if raw_slots is not None:
+                    tier = "semantic"
+                else:
+                    with trace.stage("slots"):
+                        raw_slots = handle.model.extract_slots(prompt, trace)
+                    self.semantic_cache.store(
+                        model_version, cache_language, embedding, prompt, intent, raw_slots
+                    )
+            else:
+                # "intent"/"slots" - parser_stage_* metrikalaridagi bosqichlar,
+                # ichidagi tokenize/forward alohida bosqich sifatida ham yoziladi
+                with trace.stage("intent"):
+                    intent, intent_confidence = handle.model.predict_intent(prompt, trace)
+                with trace.stage("slots"):
+                    raw_slots = handle.model.extract_slots(prompt, trace)
+        self.cascade.record(tier)
+        
+        # 4. Slotlarni normalizatsiya qilish
+        with trace.stage("normalize"):
             normalized_event = self._normalize_slots(
                 prompt, raw_slots, language, request.user_timezone
             )
-            
-            # 5. Warninglarni tekshirish
+        
+        # 5. Warninglarni tekshirish
+        with trace.stage("validate"):
             warnings = self._validate_event(normalized_event)
-            
-            # 6. ParsedEvent yaratish
+        
+        # 6. ParsedEvent yaratish (pydantic validatsiya)
+        with trace.stage("build"):
             parsed_event = ParsedEvent(
                 intent=intent,
                 language=language,
@@ -78,22 +148,20 @@ class EventParser:
                 normalized_text=self._reconstruct_text(prompt, raw_slots),
                 warnings=warnings
             )
-            
-            processing_time = time.time() - start_time
-            
-            return ParseResponse(
-                success=True,
-                data=parsed_event,
-                processing_time=processing_time
-            )
-            
-        except Exception as e:
-            processing_time = time.time() - start_time
-            return ParseResponse(
-                success=False,
-                error=str(e),
-                processing_time=processing_time
-            )
+        
+        return ParseResponse(
+            success=True,
+            data=parsed_event,
+            processing_time=0.0,
+            tier=tier,
+            model_version=model_version
+        )
+    
+    def _model_predict(self, prompt: str) -> Tuple[Intent, List[Dict]]:
+        """Shadow taqqoslash uchun model natijasi"""
+        model = self.bert_model
+        intent, _ = model.predict_intent(prompt)
+        return intent, model.extract_slots(prompt)
     
     def _normalize_slots(self, text: str, slots: List[Dict], 
                          language: Language, user_timezone: str) -> Dict:
@@ -0,0 +1,281 @@
+"""
+Versiyalangan modellar va to'xtovsiz almashtirish (hot swap)
+
+Katalog tuzilishi:
+
+    models/nlp/
+        versions/
+            2024-06-01/    intent_model/, ner_model/, tokenizer/
+            2024-06-15/
+        CURRENT            faol versiya nomi ("2024-06-15")
+
+Yangi versiya fon thread'ida yuklanadi va warmup qilinadi, shu vaqtda eski
+model so'rovlarga javob berishda davom etadi. Tayyor bo'lgach `ModelHandle`
+havolasi bitta o'zlashtirish bilan almashtiriladi. So'rov boshida olingan
+handle oxirigacha ishlatiladi, shuning uchun boshlangan so'rovlar eski
+versiyada tugaydi, eski model esa oxirgi havola yo'qolganda tozalanadi.
+
+`versions/` bo'lmasa `model_dir`ning o'zi "default" versiya sifatida
+ishlatiladi (eski tuzilish). `model_variant = "student"` bo'lsa xuddi shu
+tuzilish `model_dir/student/` ichida qidiriladi.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import settings
+
+DEFAULT_VERSION = "default"
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+
+
+@dataclass(frozen=True)
+class ModelHandle:
+    """Bitta yuklangan versiya (so'rov davomida o'zgarmaydi)"""
+    version: str
+    model: Any
+    loaded_at: float
+
+
+def variant_dir(variant: Optional[str] = None) -> Path:
+    """Model varianti katalogi: "base" - model_dir, "student" - model_dir/student"""
+    variant = variant or settings.model_variant
+    if variant == "base":
+        return Path(settings.model_dir)
+    if variant == "student":
+        return Path(settings.model_dir) / settings.student_model_path
+    raise ValueError(f"Unknown model variant: {variant}")
+
+
+def load_bert_model(path: Path, version: str):
+    """Standart loader: versiya katalogidan BERTNLPModel (torch shu yerda yuklanadi)"""
+    from .bert_model import BERTNLPModel
+    return BERTNLPModel(str(path))
+
+
+class ModelRegistry:
+    """
+    Faol model havolasi, fon yuklash va CURRENT faylini kuzatish.
+
+    Bir vaqtda faqat bitta versiya yuklanadi (bitta worker thread). Yuklash
+    yoki warmup xato bersa eski versiya ishlashda davom etadi.
+    """
+
+    def __init__(self, model_dir: Optional[str] = None,
+                 loader: Optional[Callable[[Path, str], Any]] = None,
+                 warmup_prompts: Sequence[str] = (),
+                 pinned_version: Optional[str] = None,
+                 metrics: bool = False):
+        self.model_dir = Path(model_dir) if model_dir else variant_dir()
+        self.loader = loader or load_bert_model
+        self.warmup_prompts = list(warmup_prompts)
+        self.pinned_version = pinned_version
+        self._handle: Optional[ModelHandle] = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Optional[Tuple[str, Future]] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.loading: Optional[str] = None
+        self.swaps = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+        self._reload_counter = self._active_gauge = None
+        if metrics:
+            from app.core.metrics import MODEL_ACTIVE, MODEL_RELOADS
+            self._reload_counter = MODEL_RELOADS
+            self._active_gauge = MODEL_ACTIVE
+
+    @classmethod
+    def from_settings(cls, model_dir: Optional[str] = None) -> "ModelRegistry":
+        return cls(
+            model_dir=model_dir,
+            warmup_prompts=settings.model_warmup_prompts,
+            pinned_version=settings.model_version,
+            metrics="prometheus" in settings.span_hooks,
+        )
+
+    @classmethod
+    def fixed(cls, model: Any, version: str = DEFAULT_VERSION) -> "ModelRegistry":
+        """Tayyor model bilan (diskdan yuklamasdan, masalan benchmark va testlar uchun)"""
+        registry = cls(loader=lambda path, name: model)
+        registry._handle = ModelHandle(version, model, time.time())
+        return registry
+
+    # Versiyalar
+
+    def versions(self) -> List[str]:
+        """To'liq versiya kataloglari (intent va NER modeli bor), nom bo'yicha saralangan"""
+        root = self.model_dir / VERSIONS_DIR
+        if not root.is_dir():
+            return []
+        return sorted(
+            path.name for path in root.iterdir()
+            if (path / settings.intent_model_path).exists() and (path / settings.ner_model_path).exists()
+        )
+
+    def resolve(self) -> str:
+        """Qaysi versiya faol bo'lishi kerak: pin > CURRENT > eng so'nggi > default"""
+        if self.pinned_version:
+            return self.pinned_version
+        try:
+            current = (self.model_dir / CURRENT_FILE).read_text().strip()
+        except OSError:
+            current = ""
+        if current:
+            return current
+        versions = self.versions()
+        return versions[-1] if versions else DEFAULT_VERSION
+
+    def version_path(self, version: str) -> Path:
+        if version == DEFAULT_VERSION:
+            return self.model_dir
+        if version not in self.versions():
+            raise LookupError(f"Unknown model version: {version}")
+        return self.model_dir / VERSIONS_DIR / version
+
+    # Faol model
+
+    @property
+    def version(self) -> Optional[str]:
+        handle = self._handle
+        return handle.version if handle else None
+
+    def current(self) -> ModelHandle:
+        """Faol handle (birinchi chaqiruvda sinxron yuklanadi)"""
+        handle = self._handle
+        if handle is None:
+            handle = self.load(self.resolve())
+        return handle
+
+    def load(self, version: str) -> ModelHandle:
+        """Versiyani yuklash, warmup va almashtirish (chaqiruvchi thread'da)"""
+        with self._load_lock:
+            if self._handle is not None and self._handle.version == version:
+                return self._handle
+            with self._lock:
+                self.loading = version
+            try:
+                model = self.loader(self.version_path(version), version)
+                if self.warmup_prompts:
+                    model.predict_intent_batch(self.warmup_prompts)
+                    model.extract_slots_batch(self.warmup_prompts)
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                    self.last_error = f"{version}: {e}"
+                if self._reload_counter is not None:
+                    self._reload_counter.labels("error").inc()
+                raise
+            finally:
+                with self._lock:
+                    self.loading = None
+
+            handle = ModelHandle(version, model, time.time())
+            with self._lock:
+                previous, self._handle = self._handle, handle
+                self.swaps += previous is not None
+                self.last_error = None
+            if self._reload_counter is not None:
+                self._reload_counter.labels("ok").inc()
+            if self._active_gauge is not None:
+                if previous is not None:
+                    self._active_gauge.remove(previous.version)
+                self._active_gauge.labels(version).set(1)
+            return handle
+
+    def reload(self, version: Optional[str] = None) -> Future:
+        """Fon thread'ida yuklash; bir xil versiya allaqachon navbatda bo'lsa o'sha Future qaytadi"""
+        version = version or self.resolve()
+        with self._lock:
+            if self._pending is not None:
+                pending_version, pending = self._pending
+                if pending_version == version and not pending.done():
+                    return pending
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nlp-model-loader")
+            future = self._executor.submit(self.load, version)
+            self._pending = (version, future)
+        return future
+
+    def activate(self, version: str) -> Future:
+        """
+        Versiyani fon rejimida yuklash; muvaffaqiyatli yuklanib warmup'dan
+        o'tgandan keyingina CURRENT fayli yangilanadi. Boshqa workerlar
+        `watch()` orqali shu o'zgarishni ko'rib o'zlari ham almashtiradi.
+        Yuklash xato bersa CURRENT eski versiyada qoladi.
+        """
+        self.version_path(version)  # mavjudligini tekshirish
+        future = self.reload(version)
+        future.add_done_callback(lambda f: self._write_current(version) if not f.cancelled() and f.exception() is None else None)
+        return future
+
+    def _write_current(self, version: str):
+        path = self.model_dir / CURRENT_FILE
+        tmp = path.with_name(f".{CURRENT_FILE}.{os.getpid()}")
+        tmp.write_text(version + "\n")
+        os.replace(tmp, path)
+
+    # CURRENT faylini kuzatish
+
+    def watch(self, interval: float):
+        """Har `interval` sekundda `resolve()` ni tekshirib, o'zgarsa fon yuklash"""
+        if self._watcher is not None or interval <= 0:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch_loop, args=(interval,), name="nlp-model-watch", daemon=True,
+        )
+        self._watcher.start()
+
+    def _watch_loop(self, interval: float):
+        # Faqat CURRENT o'zgarishiga javob beriladi: o'zimiz activate() qilgan
+        # versiya CURRENT yozilishidan oldin eski qiymat bilan qaytarilmaydi,
+        # buzuq versiya esa har intervalda qayta yuklanmaydi
+        seen = self.version
+        while not self._stop.wait(interval):
+            try:
+                target = self.resolve()
+            except Exception:
+                continue
+            if target == seen:
+                continue
+            seen = target
+            if target == self.version:
+                continue
+            try:
+                self.reload(target).result()
+            except Exception:
+                pass
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        target = self.resolve()
+        with self._lock:
+            handle = self._handle
+            return {
+                "version": handle.version if handle else None,
+                "loaded_at": handle.loaded_at if handle else None,
+                "target": target,
+                "loading": self.loading,
+                "swaps": self.swaps,
+                "failures": self.failures,
+                "last_error": self.last_error,
+                "watching": self._watcher is not None,
+            }
@@ -0,0 +1,325 @@
+"""
+Qoidalarga asoslangan tezkor yo'l (cascade)
+
+Ko'p chat so'rovlari qisqa va shablonli: "Uchrashuv yarat, ertaga soat
+15:00 da, 1 soat". `RuleEngine` bunday promptlarni oldindan kompilyatsiya
+qilingan regexlar bilan tahlil qiladi va ishonch darajasini hisoblaydi:
+
+- intent kalit so'zi aniq bitta intentga tegishli bo'lishi kerak
+  (bir nechta yoki birorta ham bo'lmasa - natija yo'q)
+- promptdagi so'zlarning qancha qismi slotlar, intent kalit so'zi yoki
+  yordamchi so'zlar bilan qoplangani (qoplanmagan so'z - noma'lum mazmun,
+  uni model ko'rishi kerak)
+
+`Cascade` ishonch `threshold`dan yuqori bo'lsa qoidalar natijasini
+qaytaradi, aks holda BERT modellariga o'tadi; har bir tier ulushini
+hisoblaydi va `shadow_rate` ulushidagi qoidalar natijalarini fon rejimida
+model bilan solishtiradi.
+"""
+
+import random
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import settings
+from .lexicon import INTENT_KEYWORDS, RELATIVE_TERMS
+from .models import Intent
+
+SLOT_CONFIDENCE = 0.9
+INTENT_CONFIDENCE = 0.95
+
+# O'zbekcha apostrof variantlari bitta belgiga keltiriladi (uzunlik o'zgarmaydi)
+APOSTROPHES = str.maketrans({"ʻ": "'", "ʼ": "'", "‘": "'", "’": "'", "`": "'"})
+
+WORD = re.compile(r"\w+(?:'\w+)*")
+
+# Ma'nosi intent/slotga ta'sir qilmaydigan so'zlar. O'zaklar qo'shimchalari
+# bilan mos keladi ("встречу", "meetings"); yordamchi so'zlar faqat butun so'z
+# sifatida - aks holda "about", "Anna", "встреча" ham to'ldiruvchi bo'lib qolardi
+FILLER_STEMS = (
+    "yig'ilish", "uchrashuv", "tadbir", "reja", "iltimos", "mening", "menga",
+    "встреч", "событи", "расписани", "мероприяти", "пожалуйста",
+    "meeting", "event", "please",
+)
+FILLER_WORDS = (
+    "the", "a", "an", "my", "me", "for", "with", "and", "at", "on",
+    "ni", "da", "va", "мои", "мне", "и", "в", "на",
+)
+
+_UNITS_UZ = r"(?:daqiqa|minut|soat|kun)(?!\w)"
+_UNITS_RU = r"(?:минут\w*|час\w*|д(?:ень|ня|ней))(?!\w)"
+_UNITS_EN = r"(?:minutes?|mins?|hours?|hrs?|days?)(?!\w)"
+_EMAIL = settings.email_pattern
+
+# Tartib muhim: oldingi qoida egallagan joyni keyingilari olmaydi.
+# Span chegaralari korpus belgilari bilan bir xil (kalit so'z va qo'shtirnoq ham slotga kiradi)
+SLOT_PATTERNS: List[Tuple[str, str]] = [
+    ("NOTE", r"(?<!\w)(?:izoh|eslatma|заметка|примечание|note)\s*:.+$"),
+    ("URL", r"https?://[^\s,]+"),
+    ("INVITE", rf"(?:invite|пригласи\w*)\s+{_EMAIL}"),
+    ("INVITE", rf"{_EMAIL}\s+ni\s+taklif\s+qil\w*"),
+    ("INVITE", _EMAIL),
+    ("TITLE", r"(?<!\w)[\"'«“][^\n]+?[\"'»”](?!\w)"),
+    ("ALERT", rf"\d+\s*{_UNITS_UZ}\s+oldin(?:\s+eslat\w*)?"),
+    ("ALERT", rf"напомн\w*\s+(?:за\s+)?\d+\s*{_UNITS_RU}(?:\s+до)?"),
+    ("ALERT", rf"remind(?:\s+me)?\s+\d+\s*{_UNITS_EN}\s+before"),
+    ("ALLDAY", r"butun\s+kun|весь\s+день|целый\s+день|all[\s-]day"),
+    ("REPEAT", r"har\s+(?:kun|hafta|oy|yil|dushanba|seshanba|chorshanba|payshanba|juma|shanba|yakshanba)\w*"),
+    ("REPEAT", r"кажд\w+\s+(?:день|недел\w*|месяц|год|понедельник|вторник|сред\w*|четверг|пятниц\w*|суббот\w*|воскресенье)"),
+    ("REPEAT", r"every\s+(?:day|week|month|year|weekday|monday|tuesday|wednesday|thursday|friday|saturday|sunday)"),
+    ("REPEAT", r"(?<!\w)(?:daily|weekly|monthly|ежедневно|еженедельно)(?!\w)"),
+    ("DURATION", rf"\d+\s*{_UNITS_UZ}(?:\s+\d+\s*daqiqa)?"),
+    ("DURATION", rf"\d+\s*{_UNITS_RU}(?:\s+\d+\s*минут\w*)?"),
+    ("DURATION", rf"(?:for\s+)?\d+\s*{_UNITS_EN}(?:\s+\d+\s*minutes?)?"),
+]
+
+# Vaqt ifodalari; yonma-yon turgan bo'laklar bitta DATETIME slotga birlashadi.
+# Soat va daqiqa oralig'i tekshiriladi ("25:99" vaqt emas - model hal qiladi)
+_HOUR_12 = r"(?:1[0-2]|0?[1-9])"
+_HOUR_24 = r"(?:[01]?\d|2[0-3])"
+_MINUTE = r"[0-5]\d"
+TIME_PATTERN = (
+    rf"(?:soat\s+|at\s+|в\s+)?{_HOUR_12}(?:[:.]{_MINUTE})?\s*(?:am|pm)"
+    rf"|(?:soat\s+|at\s+|в\s+)?{_HOUR_24}[:.]{_MINUTE}"
+    rf"|(?:soat|at|в)\s+{_HOUR_24}(?!\d)"
+)
+DATETIME_JOINERS = re.compile(r"^(?:\s+|\s*,\s*|\s+(?:da|dan|в|at|on)\s+)?$")
+DATETIME_SUFFIX = re.compile(r"^\s*da(?!\w)")
+
+
+@dataclass
+class RuleResult:
+    intent: Intent
+    intent_confidence: float
+    slots: List[Dict[str, Any]]
+    confidence: float
+
+
+class RuleEngine:
+    """Kompilyatsiya qilingan kalit so'z va slot qoidalari"""
+
+    def __init__(self):
+        self.intent_patterns = {
+            intent: re.compile(
+                r"(?<![\w'])(?:" + "|".join(map(re.escape, keywords)) + r")(?:ing|ingiz|sin)?(?![\w'])",
+                re.IGNORECASE,
+            )
+            for intent, keywords in INTENT_KEYWORDS.items()
+        }
+        self.slot_patterns = [
+            (kind, re.compile(pattern, re.IGNORECASE)) for kind, pattern in SLOT_PATTERNS
+        ]
+        terms = sorted({term for table in RELATIVE_TERMS.values() for term in table}, key=len, reverse=True)
+        self.datetime_pattern = re.compile(
+            r"(?<!\w)(?:" + "|".join(map(re.escape, terms)) + r"|" + TIME_PATTERN + r")(?!\w)",
+            re.IGNORECASE,
+        )
+        self.filler_pattern = re.compile(
+            r"^(?:" + "|".join(map(re.escape, FILLER_STEMS)) + r"|(?:"
+            + "|".join(map(re.escape, FILLER_WORDS)) + r")$)",
+            re.IGNORECASE,
+        )
+
+    def analyze(self, prompt: str) -> Optional[RuleResult]:
+        """
+        Returns:
+            RuleResult yoki None (intent aniqlanmadi yoki bir nechta intent mos keldi)
+        """
+        text = prompt.translate(APOSTROPHES)
+
+        intent_spans: List[Tuple[int, int]] = []
+        matched = []
+        for intent, pattern in self.intent_patterns.items():
+            spans = [m.span() for m in pattern.finditer(text)]
+            if spans:
+                matched.append(intent)
+                intent_spans.extend(spans)
+        if len(matched) != 1:
+            return None
+
+        taken = bytearray(len(text))
+        slots = []
+
+        def claim(kind: str, start: int, end: int) -> bool:
+            if start >= end or any(taken[start:end]):
+                return False
+            taken[start:end] = b"\x01" * (end - start)
+            slots.append({
+                "type": kind, "value": prompt[start:end],
+                "start": start, "end": end, "confidence": SLOT_CONFIDENCE,
+            })
+            return True
+
+        for kind, pattern in self.slot_patterns:
+            for match in pattern.finditer(text):
+                claim(kind, *match.span())
+
+        self._claim_datetimes(text, taken, claim)
+
+        for start, end in intent_spans:
+            taken[start:end] = b"\x01" * (end - start)
+        words = list(WORD.finditer(text))
+        uncovered = [
+            m for m in words
+            if not any(taken[m.start():m.end()]) and not self.filler_pattern.match(m.group())
+        ]
+        coverage = 1.0 - len(uncovered) / len(words) if words else 0.0
+
+        slots.sort(key=lambda slot: slot["start"])
+        return RuleResult(
+            intent=matched[0],
+            intent_confidence=INTENT_CONFIDENCE,
+            slots=slots,
+            confidence=round(INTENT_CONFIDENCE * coverage ** 2, 4),
+        )
+
+    def _claim_datetimes(self, text: str, taken: bytearray, claim: Callable[[str, int, int], bool]):
+        for start, end in self.datetime_spans(text, taken):
+            claim("DATETIME", start, end)
+
+    def datetime_spans(self, text: str, taken: Optional[bytearray] = None) -> List[Tuple[int, int]]:
+        """
+        Relative so'zlar va vaqtlarni topib, yonma-yonlarini bitta spanga birlashtirish.
+        `taken` bilan belgilangan (boshqa slotlar egallagan) joylar o'tkazib yuboriladi.
+        """
+        if taken is None:
+            taken = bytearray(len(text))
+        pieces = [m.span() for m in self.datetime_pattern.finditer(text) if not any(taken[m.start():m.end()])]
+        merged: List[List[int]] = []
+        for start, end in pieces:
+            if merged and DATETIME_JOINERS.match(text[merged[-1][1]:start]):
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+        spans = []
+        for start, end in merged:
+            # "soat 15:00 da" - "da" qo'shimchasi ham slotga kiradi
+            suffix = DATETIME_SUFFIX.match(text[end:])
+            if suffix:
+                end += suffix.end()
+            spans.append((start, end))
+        return spans
+
+
+def _slot_key(slots: List[Dict[str, Any]]) -> set:
+    return {(slot["type"], slot["value"].strip().lower()) for slot in slots}
+
+
+@dataclass
+class ShadowStats:
+    compared: int = 0
+    intent_mismatch: int = 0
+    slot_mismatch: int = 0
+    skipped: int = 0
+    recent: deque = field(default_factory=lambda: deque(maxlen=50))
+
+
+class Cascade:
+    """
+    Qoidalar -> model kaskadi, tier statistikasi va shadow taqqoslash.
+
+    Shadow taqqoslash bitta fon thread'ida bajariladi: foydalanuvchi
+    javobiga latency qo'shmaydi, thread band bo'lsa namuna tashlab yuboriladi.
+    """
+
+    def __init__(self, engine: Optional[RuleEngine] = None, enabled: bool = False,
+                 threshold: float = 0.85, shadow_rate: float = 0.0,
+                 metrics: bool = False):
+        self.engine = engine or RuleEngine()
+        self.enabled = enabled
+        self.threshold = threshold
+        self.shadow_rate = shadow_rate
+        self.tiers: Dict[str, int] = {"rules": 0, "semantic": 0, "model": 0}
+        self.shadow = ShadowStats()
+        self._lock = threading.Lock()
+        self._shadow_busy = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self._tier_counters = self._shadow_counters = None
+        if metrics:
+            from app.core.metrics import PARSER_SHADOW_COMPARE, PARSER_TIER
+            self._tier_counters = {tier: PARSER_TIER.labels(tier) for tier in self.tiers}
+            self._shadow_counters = PARSER_SHADOW_COMPARE
+
+    @classmethod
+    def from_settings(cls) -> "Cascade":
+        return cls(
+            enabled=settings.cascade_enabled,
+            threshold=settings.cascade_threshold,
+            shadow_rate=settings.cascade_shadow_rate,
+            metrics="prometheus" in settings.span_hooks,
+        )
+
+    def route(self, prompt: str) -> Optional[RuleResult]:
+        """Qoidalar natijasi ishonchli bo'lsa uni qaytaradi, aks holda None (model)"""
+        if not self.enabled:
+            return None
+        result = self.engine.analyze(prompt)
+        if result is not None and result.confidence >= self.threshold:
+            return result
+        return None
+
+    def record(self, tier: str):
+        with self._lock:
+            self.tiers[tier] += 1
+        if self._tier_counters is not None:
+            self._tier_counters[tier].inc()
+
+    def maybe_shadow(self, prompt: str, result: RuleResult,
+                     model: Callable[[str], Tuple[Intent, List[Dict[str, Any]]]]):
+        """`shadow_rate` ehtimollik bilan qoidalar natijasini model bilan solishtirish"""
+        if self.shadow_rate <= 0 or random.random() >= self.shadow_rate:
+            return
+        with self._lock:
+            if self._shadow_busy:
+                self.shadow.skipped += 1
+                return
+            self._shadow_busy = True
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nlp-shadow")
+        self._executor.submit(self._compare, prompt, result, model)
+
+    def _compare(self, prompt: str, result: RuleResult, model):
+        try:
+            intent, slots = model(prompt)
+            intent_ok = intent == result.intent
+            slots_ok = _slot_key(slots) == _slot_key(result.slots)
+            with self._lock:
+                self.shadow.compared += 1
+                self.shadow.intent_mismatch += not intent_ok
+                self.shadow.slot_mismatch += not slots_ok
+                if not (intent_ok and slots_ok):
+                    self.shadow.recent.append({
+                        "prompt": prompt,
+                        "rules": {"intent": result.intent.value, "slots": result.slots},
+                        "model": {"intent": intent.value, "slots": slots},
+                    })
+            if self._shadow_counters is not None:
+                self._shadow_counters.labels("intent", "match" if intent_ok else "mismatch").inc()
+                self._shadow_counters.labels("slots", "match" if slots_ok else "mismatch").inc()
+        finally:
+            with self._lock:
+                self._shadow_busy = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self.tiers.values())
+            return {
+                "enabled": self.enabled,
+                "threshold": self.threshold,
+                "requests": dict(self.tiers),
+                "fractions": {tier: (count / total if total else 0.0) for tier, count in self.tiers.items()},
+                "shadow": {
+                    "compared": self.shadow.compared,
+                    "intent_agreement": 1 - self.shadow.intent_mismatch / self.shadow.compared
+                    if self.shadow.compared else None,
+                    "slot_agreement": 1 - self.shadow.slot_mismatch / self.shadow.compared
+                    if self.shadow.compared else None,
+                    "skipped": self.shadow.skipped,
+                    "recent_mismatches": list(self.shadow.recent),
+                },
+            }
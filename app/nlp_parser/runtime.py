@@ -0,0 +1,209 @@
+"""
+Inference process'ining CPU thread topologiyasi
+
+Har bir uvicorn worker va Celery prefork child torch'ning standart intra-op
+thread sonidan (barcha yadrolar) foydalansa, bitta nodeda thread'lar yadrodan
+ko'p bo'lib ketadi va latency oshadi. Bu yerda thread soni va (ixtiyoriy)
+yadro to'plami har bir process uchun `NLPSettings` dan hisoblanadi:
+
+- `intra_op_threads = 0` bo'lsa: mavjud CPU (cgroup kvotasi hisobga olingan)
+  / inference workerlar soni
+- `cpu_affinity = "auto"` bo'lsa: process bo'sh slotni egallaydi (lock fayl)
+  va affinity maskasidagi barcha yadrolarning shu slotga tegishli qismiga
+  bog'lanadi. Kvota yadrolarni emas, vaqtni cheklaydi, shuning uchun u faqat
+  thread sonini belgilaydi - aks holda har bir konteyner 0-1 yadrolarga
+  yopishib qolardi
+- `cpu_affinity = "0-3,8"` bo'lsa: aniq yadrolar ro'yxati
+
+`configure()` process uchun bir marta, torch ishlatilishidan oldin chaqiriladi.
+Slot fork'dan keyin egallanishi kerak: Celery prefork / gunicorn child'lari
+modelni birinchi marta o'zlari yuklaganda `configure()` chaqiriladi. Agar
+parent process allaqachon sozlangan bo'lsa, fork'dan keyin child'da holat
+tozalanadi (`os.register_at_fork`) va child o'z slotini qayta egallaydi.
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, List, Optional
+
+from .config import settings
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+@dataclass(frozen=True)
+class ThreadTopology:
+    """Bitta process uchun hisoblangan sozlama"""
+    intra_op_threads: int
+    inter_op_threads: int
+    cpu_affinity: Optional[List[int]] = None
+    slot: Optional[int] = None
+
+
+def available_cpus() -> List[int]:
+    """Process'ga ruxsat berilgan yadrolar ro'yxati"""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:  # macOS/Windows
+        return list(range(os.cpu_count() or 1))
+
+
+def cpu_quota() -> Optional[float]:
+    """cgroup v2 `cpu.max` kvotasi (konteynerda --cpus), yo'q bo'lsa None"""
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+    except (OSError, ValueError):
+        return None
+    if quota == "max":
+        return None
+    return int(quota) / int(period)
+
+
+def effective_cpu_count() -> int:
+    cpus = len(available_cpus())
+    quota = cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, int(quota)))
+    return cpus
+
+
+def inference_workers() -> int:
+    """Bir nodedagi inference processlari: sozlama, WEB_CONCURRENCY yoki 1"""
+    if settings.inference_workers > 0:
+        return settings.inference_workers
+    try:
+        return max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+    except ValueError:
+        return 1
+
+
+def parse_cpu_list(spec: str) -> List[int]:
+    """"0-3,8" -> [0, 1, 2, 3, 8]"""
+    cpus = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        cpus.update(range(int(start), int(end or start) + 1))
+    return sorted(cpus)
+
+
+def slot_cpus(cpus: List[int], slot: int, workers: int) -> List[int]:
+    """`slot`-chi workerga tegishli yadrolar (workerlar yadrodan ko'p bo'lsa aylana bo'yicha)"""
+    if workers >= len(cpus):
+        return [cpus[slot % len(cpus)]]
+    per_worker = len(cpus) // workers
+    return cpus[slot * per_worker:(slot + 1) * per_worker]
+
+
+_slot_file: Optional[IO] = None
+_slot: Optional[int] = None
+
+
+def claim_slot(workers: int, directory: Optional[str] = None) -> Optional[int]:
+    """
+    Bo'sh worker slotini egallash (fcntl lock fayl, process tugaganda OS bo'shatadi).
+    Barcha slotlar band bo'lsa None.
+    """
+    global _slot_file, _slot
+    if _slot is not None:
+        return _slot
+    try:
+        import fcntl
+    except ImportError:
+        return None
+    directory = Path(directory or settings.runtime_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    for slot in range(workers):
+        f = open(directory / f"nlp-slot-{slot}.lock", "w")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            continue
+        _slot_file, _slot = f, slot  # fayl yopilmasligi (lock saqlanishi) uchun havola
+        return slot
+    return None
+
+
+def derive(cpus: Optional[List[int]] = None, workers: Optional[int] = None) -> ThreadTopology:
+    """Sozlamalar, CPU soni va workerlar sonidan topologiya hisoblash"""
+    cpus = cpus if cpus is not None else available_cpus()
+    workers = workers or inference_workers()
+    # Kvota bilan cheklangan CPU soni faqat thread sonini belgilaydi
+    count = min(len(cpus), effective_cpu_count()) if cpus else 1
+
+    affinity: Optional[List[int]] = None
+    slot: Optional[int] = None
+    mode = settings.cpu_affinity.strip().lower()
+    if mode == "auto":
+        slot = claim_slot(workers)
+        if slot is not None and cpus:
+            affinity = slot_cpus(cpus, slot, workers)
+    elif mode not in ("", "none"):
+        affinity = parse_cpu_list(mode)
+
+    intra = settings.intra_op_threads
+    if intra <= 0:
+        intra = max(1, count // workers)
+        if affinity:
+            intra = min(intra, len(affinity))
+    return ThreadTopology(
+        intra_op_threads=intra,
+        inter_op_threads=max(1, settings.inter_op_threads),
+        cpu_affinity=affinity,
+        slot=slot,
+    )
+
+
+_configured: Optional[ThreadTopology] = None
+_lock = threading.Lock()
+
+
+def configure(topology: Optional[ThreadTopology] = None) -> ThreadTopology:
+    """
+    Topologiyani process'ga qo'llash (bir marta; keyingi chaqiruvlar natijani qaytaradi).
+    torch inter-op thread sonini faqat birinchi parallel ishdan oldin qabul qiladi.
+    """
+    global _configured
+    with _lock:
+        if _configured is not None:
+            return _configured
+        topology = topology or derive()
+
+        if topology.cpu_affinity and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, topology.cpu_affinity)
+        for name in THREAD_ENV_VARS:
+            os.environ.setdefault(name, str(topology.intra_op_threads))
+
+        import torch
+        torch.set_num_threads(topology.intra_op_threads)
+        try:
+            torch.set_num_interop_threads(topology.inter_op_threads)
+        except RuntimeError:
+            pass  # inter-op pool allaqachon ishga tushgan
+        _configured = topology
+        return topology
+
+
+def current() -> Optional[ThreadTopology]:
+    return _configured
+
+
+def _reset_after_fork():
+    """Child process parent'ning slotini va topologiyasini meros qilib olmaydi"""
+    global _configured, _slot, _slot_file, _lock
+    _configured = None
+    _slot = None
+    # Lock fayl descriptor'i parent bilan umumiy: yopish parent lock'ini bo'shatmaydi
+    if _slot_file is not None:
+        _slot_file.close()
+        _slot_file = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,240 @@
+"""
+Ma'nosi yaqin promptlar uchun kesh (semantic cache)
+
+Aniq mos kelish bo'yicha kesh "meeting tomorrow at 10" va "tomorrow 10am
+meeting" ni har xil deb hisoblaydi. Bu yerda intent modeli forward'ida
+baribir hisoblanadigan encoder holatlarining o'rtachasi (pooled embedding)
+saqlanadi. Har bir til uchun bitta NumPy matritsa bor va so'rovda bitta
+matritsa-vektor ko'paytmasi bilan eng yaqin prompt topiladi (cosine,
+vektorlar normallashtirilgan).
+
+O'xshashlik `threshold`dan yuqori va intent bir xil bo'lsa NER forward
+o'tkazib yuboriladi, keshdagi slot tuzilmasi yangi promptga moslanadi:
+
+- DATETIME dan boshqa slotlar qiymati yangi promptdan qidiriladi va
+  offsetlar qayta hisoblanadi (topilmasa - kesh ishlatilmaydi)
+- DATETIME slotlari yangi promptdan `RuleEngine.datetime_spans` bilan qayta
+  ajratiladi (soni mos kelishi kerak), normalizatsiya odatdagidek "hozir"ga
+  nisbatan bajariladi
+- slotlardan tashqaridagi so'zlar (tartibidan qat'i nazar) keshdagi prompt
+  bilan bir xil bo'lishi kerak, aks holda yangi promptda keshda yo'q slot
+  bo'lishi mumkin
+
+Xotira har bir til uchun `capacity` qator bilan chegaralangan; to'lganda eng
+uzoq ishlatilmagan (LRU) yozuv almashtiriladi. Model versiyasi o'zgarsa
+(hot swap) embeddinglar mos kelmaydi va kesh tozalanadi.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .config import settings
+from .models import Intent
+from .rules import APOSTROPHES, RuleEngine
+
+
+@dataclass
+class CacheEntry:
+    prompt: str
+    intent: Intent
+    slots: List[Dict[str, Any]]
+    residual: List[str]  # slotlardan tashqaridagi so'zlar (saralangan)
+
+
+def _residual(text: str, slots: List[Dict[str, Any]]) -> List[str]:
+    """Slot oraliqlari olib tashlangandan keyin qolgan so'zlar (tartibsiz taqqoslash uchun)"""
+    chars = list(text.translate(APOSTROPHES).lower())
+    for slot in slots:
+        chars[slot["start"]:slot["end"]] = " " * (slot["end"] - slot["start"])
+    return sorted(re.findall(r"\w+", "".join(chars)))
+
+
+class _LanguageIndex:
+    """Bitta til: normallashtirilgan embeddinglar matritsasi va LRU belgilari"""
+
+    def __init__(self, capacity: int, dim: int):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.entries: List[Optional[CacheEntry]] = [None] * capacity
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.size = 0
+
+    def nearest(self, query: np.ndarray):
+        if self.size == 0:
+            return None, 0.0
+        similarities = self.vectors[:self.size] @ query
+        index = int(similarities.argmax())
+        return index, float(similarities[index])
+
+    def add(self, vector: np.ndarray, entry: CacheEntry, tick: int) -> bool:
+        """Returns: yozuv almashtirildimi (eviction)"""
+        evicted = self.size == len(self.entries)
+        if evicted:
+            index = int(self.last_used.argmin())
+        else:
+            index = self.size
+            self.size += 1
+        self.vectors[index] = vector
+        self.entries[index] = entry
+        self.last_used[index] = tick
+        return evicted
+
+
+def _normalize(embedding) -> Optional[np.ndarray]:
+    vector = np.asarray(embedding, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(vector))
+    if norm == 0.0 or not np.isfinite(norm):
+        return None
+    return vector / norm
+
+
+def _find_free(text: str, value: str, taken: bytearray) -> int:
+    """`value` ning band bo'lmagan va so'z chegarasida turgan birinchi joyi (-1 - yo'q)"""
+    start = text.find(value)
+    while start >= 0:
+        end = start + len(value)
+        boundary = (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+        if boundary and not any(taken[start:end]):
+            return start
+        start = text.find(value, start + 1)
+    return -1
+
+
+class SemanticCache:
+    """Til bo'yicha embedding indekslari (thread-safe)"""
+
+    def __init__(self, enabled: bool = False, threshold: float = 0.95, capacity: int = 2048,
+                 rules: Optional[RuleEngine] = None, metrics: bool = False):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.capacity = capacity
+        self.rules = rules or RuleEngine()
+        self.version: Optional[str] = None
+        self._indexes: Dict[str, _LanguageIndex] = {}
+        self._lock = threading.Lock()
+        self._tick = 0
+        self.counts = {"hit": 0, "miss": 0, "rejected": 0, "evicted": 0}
+
+        self._counters = None
+        if metrics:
+            from app.core.metrics import SEMANTIC_CACHE
+            self._counters = {result: SEMANTIC_CACHE.labels(result) for result in self.counts}
+
+    @classmethod
+    def from_settings(cls) -> "SemanticCache":
+        return cls(
+            enabled=settings.semantic_cache_enabled,
+            threshold=settings.semantic_cache_threshold,
+            capacity=settings.semantic_cache_capacity,
+            metrics="prometheus" in settings.span_hooks,
+        )
+
+    def lookup(self, version: Optional[str], language: str, embedding, prompt: str,
+               intent: Intent) -> Optional[List[Dict[str, Any]]]:
+        """
+        Yaqin prompt topilsa uning slotlari yangi promptga moslangan holda,
+        aks holda None (NER modeli ishlatiladi)
+        """
+        query = _normalize(embedding)
+        if query is None:
+            return None
+        with self._lock:
+            self._check_version(version)
+            index = self._indexes.get(language)
+            position, similarity = index.nearest(query) if index else (None, 0.0)
+            entry = None
+            if position is not None and similarity >= self.threshold:
+                entry = index.entries[position]
+                self._tick += 1
+                index.last_used[position] = self._tick
+        if entry is None:
+            self._count("miss")
+            return None
+
+        slots = self._adapt(entry, prompt) if entry.intent == intent else None
+        self._count("hit" if slots is not None else "rejected")
+        return slots
+
+    def store(self, version: Optional[str], language: str, embedding, prompt: str,
+              intent: Intent, slots: List[Dict[str, Any]]):
+        vector = _normalize(embedding)
+        if vector is None:
+            return
+        entry = CacheEntry(prompt, intent, [dict(slot) for slot in slots], _residual(prompt, slots))
+        with self._lock:
+            self._check_version(version)
+            index = self._indexes.get(language)
+            if index is None:
+                index = self._indexes[language] = _LanguageIndex(self.capacity, vector.shape[0])
+            self._tick += 1
+            evicted = index.add(vector, entry, self._tick)
+        if evicted:
+            self._count("evicted")
+
+    def _check_version(self, version: Optional[str]):
+        """Boshqa model versiyasining embeddinglari bilan solishtirib bo'lmaydi"""
+        if version != self.version:
+            self._indexes.clear()
+            self.version = version
+
+    def _adapt(self, entry: CacheEntry, prompt: str) -> Optional[List[Dict[str, Any]]]:
+        """Keshdagi slot tuzilmasini yangi promptga ko'chirish (mos kelmasa None)"""
+        text = prompt.translate(APOSTROPHES)
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            return None
+
+        taken = bytearray(len(text))
+        slots = []
+        datetimes = []
+        for slot in entry.slots:
+            if slot["type"] == "DATETIME":
+                datetimes.append(slot)
+                continue
+            value = slot["value"].translate(APOSTROPHES).lower().strip()
+            start = _find_free(lowered, value, taken) if value else -1
+            if start < 0:
+                return None
+            end = start + len(value)
+            taken[start:end] = b"\x01" * len(value)
+            slots.append({
+                "type": slot["type"], "value": prompt[start:end],
+                "start": start, "end": end, "confidence": slot["confidence"],
+            })
+
+        spans = self.rules.datetime_spans(text, taken)
+        if len(spans) != len(datetimes):
+            return None
+        for (start, end), slot in zip(spans, datetimes):
+            slots.append({
+                "type": "DATETIME", "value": prompt[start:end],
+                "start": start, "end": end, "confidence": slot["confidence"],
+            })
+
+        # Promptda keshdagida bo'lmagan qo'shimcha slot bo'lishi mumkin emas
+        if _residual(prompt, slots) != entry.residual:
+            return None
+        slots.sort(key=lambda slot: slot["start"])
+        return slots
+
+    def _count(self, result: str):
+        with self._lock:
+            self.counts[result] += 1
+        if self._counters is not None:
+            self._counters[result].inc()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.counts["hit"] + self.counts["miss"] + self.counts["rejected"]
+            return {
+                "enabled": self.enabled,
+                "threshold": self.threshold,
+                "version": self.version,
+                "entries": {language: index.size for language, index in self._indexes.items()},
+                "memory_bytes": sum(index.vectors.nbytes for index in self._indexes.values()),
+                **self.counts,
+                "hit_ratio": self.counts["hit"] / lookups if lookups else 0.0,
+            }
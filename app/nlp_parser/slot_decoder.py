@@ -0,0 +1,133 @@
+"""
+BIO teglarini vektorlashtirilgan dekodlash
+
+NER model logitlari `[batch, tokens, labels]` matritsa ko'rinishida bir
+marta softmax/argmax qilinadi, span chegaralari massiv amallari bilan
+topiladi, qiymatlar esa asl matndan offset mapping bo'yicha kesib olinadi
+(wordpiece tokenlarini qayta yopishtirish kerak emas). Slot confidence -
+span tokenlari ehtimolliklarining o'rtachasi.
+
+Qoidalar:
+- offset'i bo'sh (start == end) tokenlar - [CLS]/[SEP]/[PAD] - hisobga olinmaydi
+- `B-X` har doim yangi span boshlaydi
+- `I-X` ochiq X spanni davom ettiradi; ochiq span bo'lmasa yangi X span
+  boshlaydi
+- boshqa turdagi `I-Y` ochiq X spanni yopmaydi va unga qo'shilmaydi (keyingi
+  `I-X` spanni davom ettiradi), `O` esa spanni yopadi
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class BIODecoder:
+    """`slot_types` - model label'lari tartibida ("O", "B-DATETIME", "I-DATETIME", ...)"""
+
+    def __init__(self, slot_types: Sequence[str]):
+        self.entities: List[str] = []
+        entity_ids = []
+        is_begin = []
+        for label in slot_types:
+            prefix, _, name = label.partition("-")
+            if not name:
+                entity_ids.append(-1)
+                is_begin.append(False)
+                continue
+            if name not in self.entities:
+                self.entities.append(name)
+            entity_ids.append(self.entities.index(name))
+            is_begin.append(prefix == "B")
+        self.entity_ids = np.asarray(entity_ids, dtype=np.int64)
+        self.is_begin = np.asarray(is_begin, dtype=bool)
+
+    def decode(self, text: str, logits: np.ndarray, offsets: np.ndarray) -> List[Dict[str, Any]]:
+        """Bitta matn: logits `[tokens, labels]`, offsets `[tokens, 2]`"""
+        return self.decode_batch([text], logits[None], offsets[None])[0]
+
+    def decode_batch(
+        self,
+        texts: Sequence[str],
+        logits: np.ndarray,
+        offsets: np.ndarray,
+        attention_mask: Optional[np.ndarray] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Args:
+            texts: asl matnlar
+            logits: `[batch, tokens, labels]`
+            offsets: `[batch, tokens, 2]` (tokenizer offset_mapping)
+            attention_mask: `[batch, tokens]` (ixtiyoriy, padding uchun)
+
+        Returns:
+            Har bir matn uchun slotlar ro'yxati
+        """
+        batch, length, _ = logits.shape
+        logits = np.asarray(logits, dtype=np.float32)
+        labels = logits.argmax(axis=-1)
+        # Tanlangan label'ning softmax ehtimolligi: 1 / sum(exp(l - max))
+        shifted = logits - logits.max(axis=-1, keepdims=True)
+        token_probs = 1.0 / np.exp(shifted, out=shifted).sum(axis=-1)
+
+        offsets = np.asarray(offsets, dtype=np.int64)
+        char_start = offsets[..., 0]
+        char_end = offsets[..., 1]
+        valid = char_end > char_start
+        if attention_mask is not None:
+            valid &= np.asarray(attention_mask, dtype=bool)
+
+        entity = np.where(valid, self.entity_ids[labels], -1)
+        begin = valid & self.is_begin[labels]
+        inside = (entity >= 0) & ~begin
+
+        # Span holati (ochiq span turi yoki -1) ketma-ketlikka bog'liq, shuning
+        # uchun uni "o'rnatuvchi" tokenlardan forward-fill bilan tarqatamiz.
+        # 1-bosqich: `B-X`, `O` va har bir qatorning boshi
+        positions = np.arange(batch * length).reshape(batch, length)
+        setter = begin | (valid & (entity < 0))
+        setter[:, 0] = True
+        state = np.where(begin, entity, -1).ravel()
+        owner = np.maximum.accumulate(np.where(setter, positions, 0).ravel())
+
+        # 2-bosqich: ochiq span yo'q joydagi birinchi `I-X` yangi X span boshlaydi
+        orphan = np.flatnonzero(inside.ravel() & (state[owner] < 0))
+        if orphan.size:
+            _, first = np.unique(owner[orphan], return_index=True)
+            orphan = orphan[first]
+            state[orphan] = entity.ravel()[orphan]
+            setter.ravel()[orphan] = True
+            owner = np.maximum.accumulate(np.where(setter.ravel(), positions.ravel(), 0))
+
+        # Span tokenlari - span turiga mos tokenlar; boshqa turdagi `I-Y`
+        # spanni yopmaydi, lekin unga qo'shilmaydi ham
+        span_kind = state[owner]
+        in_span = (entity.ravel() >= 0) & (entity.ravel() == span_kind)
+
+        # Span tokenlari tekislangan massivda ketma-ket turadi
+        flat = np.flatnonzero(in_span)
+        results: List[List[Dict[str, Any]]] = [[] for _ in range(batch)]
+        if flat.size == 0:
+            return results
+
+        span_owner = owner[flat]
+        span_first = np.flatnonzero(np.r_[True, span_owner[1:] != span_owner[:-1]])
+        span_last = np.append(span_first[1:], flat.size) - 1
+        sizes = span_last - span_first + 1
+        confidence = np.round(np.add.reduceat(token_probs.ravel()[flat], span_first) / sizes, 4)
+
+        first_token = flat[span_first]
+        last_token = flat[span_last]
+        rows = (first_token // length).tolist()
+        starts = char_start.ravel()[first_token].tolist()
+        ends = char_end.ravel()[last_token].tolist()
+        kinds = entity.ravel()[first_token].tolist()
+
+        for row, kind, start, end, score in zip(rows, kinds, starts, ends, confidence.tolist()):
+            results[row].append({
+                "type": self.entities[kind],
+                "value": texts[row][start:end],
+                "start": start,
+                "end": end,
+                "confidence": score,
+            })
+        return results
@@ -1,3 +1,5 @@
+import uuid
+
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
@@ -23,6 +25,10 @@ class EventRepository(AbstractEventRepository):
             raise HTTPException(status_code=500, detail="Database error during event creation")
 
     def get_event_by_id(self, event_id):
+        try:
+            event_id = uuid.UUID(str(event_id))
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Event not found")
         event = self.db.query(Event).filter(Event.id == event_id).first()
         if not event:
             raise HTTPException(status_code=404, detail="Event not found")
@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel
 
 class EventCreateIn(BaseModel):
@@ -36,6 +37,7 @@ class EventRetrieveOut(BaseModel):
     note: str | None = None     
 
 class EventUpdateIn(BaseModel):
+    id: str
     title: str | None = None
     description: str | None = None
     start_time: str | None = None
@@ -62,3 +64,16 @@ class EventDeleteIn(BaseModel):
 class EventDeleteOut(BaseModel):
     id: str
     message: str
+
+
+class EventProposal(BaseModel):
+    """Chatda parse qilingan va tasdiqlangan event taklifi"""
+    title: str | None = None
+    all_day: bool = False
+    time_start: datetime | None = None
+    time_end: datetime | None = None
+    repeat: str | None = None
+    invites: list[str] = []
+    alerts: list[str] = []
+    url: str | None = None
+    note: str | None = None
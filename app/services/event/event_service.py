@@ -1,3 +1,6 @@
+import uuid
+from datetime import datetime
+
 from fastapi import HTTPException, status
 
 from .interfaces import AbstractEventService
@@ -14,6 +17,42 @@ from ...schemas.events_schemas import (
 from ...repository.event.event_repo import EventRepository
 from ...core.security import get_user_id_from_jwt
 
+
+# API nomi -> model ustuni
+FIELD_MAP = {"start_time": "time_start", "end_time": "time_end"}
+
+
+def _to_model_fields(data: dict) -> dict:
+    """API maydonlarini Event ustunlariga o'tkazish (vaqtlar datetime bo'ladi)"""
+    fields = {}
+    for key, value in data.items():
+        column = FIELD_MAP.get(key, key)
+        if column in ("time_start", "time_end") and isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Invalid datetime for {key}: {value}"
+                )
+        fields[column] = value
+    return fields
+
+
+def _to_out(schema, event):
+    """Event -> javob sxemasi"""
+    return schema(
+        id=str(event.id),
+        title=event.title or "",
+        start_time=event.time_start.isoformat() if event.time_start else "",
+        end_time=event.time_end.isoformat() if event.time_end else "",
+        all_day=bool(event.all_day),
+        repeat=event.repeat,
+        url=event.url,
+        note=event.note,
+    )
+
+
 class EventService(AbstractEventService):
 
     def __init__(self, repo: EventRepository):
@@ -21,12 +60,12 @@ class EventService(AbstractEventService):
 
     def create_event(self, event_in: EventCreateIn, access_token: str) -> EventCreateOut:
         
-        user_id = get_user_id_from_jwt(access_token)
+        user_id = uuid.UUID(get_user_id_from_jwt(access_token))
         event = self.repo.create_event(
             user_id=user_id,
-            **event_in.model_dump()
+            **_to_model_fields(event_in.model_dump())
         )
-        return EventCreateOut.model_validate(event)
+        return _to_out(EventCreateOut, event)
 
     def get_event(self, event_in: EventRetrieveIn, access_token: str) -> EventRetrieveOut:
         
@@ -38,7 +77,7 @@ class EventService(AbstractEventService):
                 detail="Event not found"
             )
 
-        return EventRetrieveOut.model_validate(event)
+        return _to_out(EventRetrieveOut, event)
     
     def update_event(
         self,
@@ -54,12 +93,14 @@ class EventService(AbstractEventService):
                 detail="Event not found"
             )
 
+        # description ustuni modelda yo'q
+        changes = event_in.model_dump(exclude_unset=True, exclude={"id", "description"})
         updated_event = self.repo.update_event(
             event_id,
-            **event_in.model_dump(exclude_unset=True)
+            **_to_model_fields(changes)
         )
 
-        return EventUpdateOut.model_validate(updated_event)
+        return _to_out(EventUpdateOut, updated_event)
 
     def delete_event(self, event_in: EventDeleteIn, access_token: str) -> EventDeleteOut:
         event = self.repo.get_event_by_id(event_in.id)
@@ -73,5 +114,6 @@ class EventService(AbstractEventService):
         self.repo.delete_event(event_in.id)
 
         return EventDeleteOut(
+            id=event_in.id,
             message="Event successfully deleted"
         )
@@ -13,6 +13,8 @@ from enum import Enum
 
 from pydantic import BaseModel, Field, validator
 
+from ..core.metrics import observe_stage
+
 class FakeIntent(str, Enum):
     """Tasavvuriy intentlar"""
     CREATE = "create"
@@ -184,16 +186,20 @@ class FakeEventParser:
                 raise ValueError("Prompt bo'sh bo'lishi mumkin emas")
             
             # 1. Tilni aniqlash (pattern orqali)
-            language = self._detect_language(prompt, request.locale)
+            with observe_stage("fake", "language"):
+                language = self._detect_language(prompt, request.locale)
             
             # 2. Intentni aniqlash (pattern orqali)
-            intent, intent_confidence = self._detect_intent(prompt)
+            with observe_stage("fake", "intent"):
+                intent, intent_confidence = self._detect_intent(prompt)
             
             # 3. Tasavvuriy slotlarni yaratish
-            raw_slots = self._generate_fake_slots(prompt, language)
+            with observe_stage("fake", "slots"):
+                raw_slots = self._generate_fake_slots(prompt, language)
             
             # 4. Tasavvuriy event ma'lumotlarini yaratish
-            event_data = self._generate_fake_event_data(prompt, language)
+            with observe_stage("fake", "normalize"):
+                event_data = self._generate_fake_event_data(prompt, language)
             
             # 5. Warnings yaratish
             warnings = self._generate_warnings(event_data)
@@ -1,14 +1,116 @@
-import ast
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+import orjson
+
+
+# Python repr'dagi string elementlar: 'a@b.c' yoki "o'z"
+_REPR_STRING = re.compile(r"'((?:[^'\\]|\\.)*)'|\"((?:[^\"\\]|\\.)*)\"")
+_NULLS = {"None", "null", "N/A", ""}
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _to_optional_str(value: Any) -> Optional[str]:
+    if isinstance(value, str) and value in _NULLS:
+        return None
+    return value
+
+
+def _to_bool(value: Any) -> Any:
+    if isinstance(value, str):
+        lowered = value.lower()
+        if lowered in ("true", "1"):
+            return True
+        if lowered in ("false", "0"):
+            return False
+    return value
+
+
+def _to_float(value: Any) -> Any:
+    if isinstance(value, str):
+        if value in _NULLS:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _to_datetime(value: Any) -> Any:
+    if isinstance(value, str):
+        if value in _NULLS:
+            return None
+        try:
+            # "2025-12-25 00:00:00" ham, "2025-12-25T00:00:00" ham o'qiladi
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _to_str_list(value: Any) -> Any:
+    if not isinstance(value, str):
+        return value
+    value = value.strip()
+    if value in _NULLS:
+        return []
+    if not value.startswith("["):
+        return value
+    try:
+        # JSON list
+        return orjson.loads(value)
+    except orjson.JSONDecodeError:
+        pass
+    # Python repr: "['a@b.c', 'x@y.z']"
+    return [
+        (single or double).replace("\\'", "'").replace('\\"', '"')
+        for single, double in _REPR_STRING.findall(value)
+    ]
+
+
+# Parse natijasi maydonlari uchun converterlar jadvali
+PARSE_RESULT_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "success": _to_bool,
+    "requires_confirmation": _to_bool,
+    "all_day": _to_bool,
+    "confidence": _to_float,
+    "timestamp": _to_datetime,
+    "time_start": _to_datetime,
+    "time_end": _to_datetime,
+    "title": _to_optional_str,
+    "repeat": _to_optional_str,
+    "url": _to_optional_str,
+    "note": _to_optional_str,
+    "invites": _to_str_list,
+    "alerts": _to_str_list,
+    "warnings": _to_str_list,
+}
+
+
+def decode_parse_result(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parse natijasini (compat formatdagi string maydonlar bilan ham) bitta
+    o'tishda typed dict'ga aylantirish. Har bir maydon o'z converteri orqali
+    o'tadi, noma'lum maydonlar o'zgarmaydi.
+    """
+    converters = PARSE_RESULT_CONVERTERS
+    return {
+        key: converters.get(key, _identity)(value)
+        for key, value in payload.items()
+    }
 
 
 def normalize_for_json(obj):
+    """
+    Eski API: endi ast.literal_eval o'rniga decode_parse_result ishlatadi
+    """
     if isinstance(obj, dict):
-        return {k: normalize_for_json(v) for k, v in obj.items()}
+        return decode_parse_result(obj)
     if isinstance(obj, list):
         return [normalize_for_json(i) for i in obj]
-    if isinstance(obj, str):
-        try:
-            return ast.literal_eval(obj)
-        except Exception:
-            return obj
-    return obj
\ No newline at end of file
+    return obj
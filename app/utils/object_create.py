@@ -1,60 +1,91 @@
-# eventdata = {
-#     'client_id' = 'cd9040b3-041b-4e27-8b60-439703a99259',
-#     'title': 'Muhokama sessiyasi', 
-#     'all_day': 'True',
-#     'time_start': '2025-12-25 00:00:00',  
-#     'time_end': '2025-12-26 00:00:00', 
-#     'repeat': 'None', 
-#     'url': 'None', 
-#     'note': 'None' 
-#}
-
+import re
+import uuid
+from typing import List, Tuple
 
 from sqlalchemy.orm import Session
-from ..models import Event
-from datetime import datetime
-import uuid
 
-def create_event(eventdata: dict, db: Session = None):
+from ..core.logger import get_logger
+
+from ..models import Event, EventInvite, EventAlert
+from ..schemas.events_schemas import EventProposal
+
+logger = get_logger(__name__)
+
+
+ISO_DURATION = re.compile(
+    r'^P(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$'
+)
+
+
+def iso_duration_to_seconds(value: str) -> int:
+    """ISO 8601 davomiylikni (PT10M, PT1H, P1D) sekundga o'tkazish"""
+    match = ISO_DURATION.match(value)
+    if not match:
+        raise ValueError(f"Invalid ISO duration format: {value}")
+    parts = {k: int(v) for k, v in match.groupdict().items() if v}
+    return (
+        parts.get('days', 0) * 86400
+        + parts.get('hours', 0) * 3600
+        + parts.get('minutes', 0) * 60
+        + parts.get('seconds', 0)
+    )
+
+
+def build_event(user_id: uuid.UUID, proposal: EventProposal) -> Event:
     """
-    Database'ga event yaratish
+    Taklifdan Event, EventInvite va EventAlert obyektlarini yasash.
+    Alertlar sxema bo'yicha invite'ga bog'langan, shuning uchun har bir
+    invite uchun alohida yaratiladi.
     """
+    offsets = [iso_duration_to_seconds(alert) for alert in proposal.alerts]
+
+    event = Event(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        title=proposal.title,
+        all_day=proposal.all_day,
+        time_start=proposal.time_start,
+        time_end=proposal.time_end,
+        repeat=proposal.repeat,
+        url=proposal.url,
+        note=proposal.note,
+    )
+    for email in proposal.invites:
+        invite = EventInvite(id=uuid.uuid4(), email=email)
+        invite.alerts = [EventAlert(offset_seconds=offset) for offset in offsets]
+        event.invites.append(invite)
+    return event
+
+
+def _commit_events(db: Session, events: List[Event]):
+    """Eventlarni (invite va alertlari bilan) bitta tranzaksiyada yozish"""
     try:
-        event = Event(
-            id=uuid.uuid4(),  
-            user_id=uuid.UUID(eventdata['client_id']), 
-            title=eventdata['title'],
-            all_day=bool(eventdata['all_day']), 
-            time_start=datetime.fromisoformat(eventdata['time_start'].replace(' ', 'T')) if eventdata['time_start'] != 'None' else None,
-            time_end=datetime.fromisoformat(eventdata['time_end'].replace(' ', 'T')) if eventdata['time_end'] != 'None' else None,
-            repeat=eventdata['repeat'] if eventdata['repeat'] != 'None' else None,
-            url=eventdata['url'] if eventdata['url'] != 'None' else None,
-            note=eventdata['note'] if eventdata['note'] != 'None' else None
-        )
-        
-        db.add(event)
+        db.add_all(events)
         db.commit()
-        db.refresh(event)
-        
-        print(f" Event created: {event.id}")
-        return event
-        
+
     except Exception as e:
         db.rollback()  # Xatolikda rollback
-        print(f"Error creating event: {e}")
+        logger.error("Error creating events: %s", e)
         raise
-    
-    
-# def create_event_invites(db: Session, eventinvites: list):
-#     """
-#     Database'ga event invites yaratish
-#     """
-#     try:
-#         eventinvites = [EventInvite(**invite) for invite in eventinvites]
-#         db.bulk_save_objects(eventinvites)
-#         db.commit()
-#     except Exception as e:
-#         db.rollback()  # Xatolikda rollback
-#         print(f"Error creating event invites: {e}")
-#         raise
-    
\ No newline at end of file
+
+
+def create_events_batch(db: Session, items: List[Tuple[uuid.UUID, EventProposal]]) -> List[uuid.UUID]:
+    """
+    Bir nechta eventni (invite va alertlari bilan) bitta tranzaksiyada yaratish.
+    Id'lar client tomonida yaratiladi va commitdan oldin olinadi (commitdan
+    keyin `event.id` har bir event uchun qayta SELECT qiladi)
+    """
+    events = [build_event(user_id, proposal) for user_id, proposal in items]
+    event_ids = [event.id for event in events]
+    _commit_events(db, events)
+    return event_ids
+
+
+def create_event(db: Session, user_id: uuid.UUID, proposal: EventProposal) -> Event:
+    """
+    Database'ga event yaratish
+    """
+    event = build_event(user_id, proposal)
+    _commit_events(db, [event])
+    logger.info("Event created: %s", event.id)
+    return event
@@ -1,43 +1,101 @@
+import asyncio
 import os
-import sys
-import orjson
-from aio_pika import connect_robust, Message, IncomingMessage, DeliveryMode
-from typing import Callable, Dict, Any
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Any, Optional, Union
 from dotenv import load_dotenv
-import json
 from datetime import datetime
 import uuid
-sys.stdout.flush()
 
-from ..utils.fake_nlp import FakeEventParser, FakeParseRequest
-from ..utils.json_format import normalize_for_json
+from ..core.logger import SAMPLED, get_logger, log_context
+from ..core.metrics import BROKER_CONSUME_LATENCY, BROKER_INFLIGHT, BROKER_PUBLISH_LATENCY
+from ..core.settings import settings
+from ..utils.fake_nlp import FakeEventParser, FakeParseRequest, FakeParseResponse
+from ..schemas.events_schemas import EventProposal
+from .confirmation_store import PendingConfirmationStore
+from .event_writer import EventWriter
+from .protocol import (
+    Envelope, MessageType, SERVER_MESSAGE_TYPES,
+    encode_body, decode_body, parsed_event_payload,
+)
+
+if TYPE_CHECKING:
+    from aio_pika import IncomingMessage
 
 
 load_dotenv()
-DATA = {}
+logger = get_logger(__name__)
+
 class RabbitMQBroker:
-    def __init__(self, url=os.getenv("CELERY_BROKER_URL"), exchange_name="chat_direct"):
+    def __init__(self, url=os.getenv("CELERY_BROKER_URL"), exchange_name="chat_direct",
+                 prefetch_count: int = settings.WS_BROKER_PREFETCH,
+                 confirmations: Optional[PendingConfirmationStore] = None,
+                 event_writer: Optional[EventWriter] = None,
+                 connection_factory: Optional[Callable[[str], Awaitable[Any]]] = None):
         self.url = url
+        # aio_pika.connect_robust bilan bir xil interfeys (load test'da in-process stand-in).
+        # None bo'lsa aio_pika birinchi ulanishda import qilinadi
+        self.connection_factory = connection_factory
         self.exchange_name = exchange_name
+        # Bir vaqtda ack qilinmagan parse ishlari soni chegarasi
+        self.prefetch_count = prefetch_count
         self.queues: Dict[str, Any] = {}
         self.consumers: Dict[str, str] = {}
+        # client_id -> joriy ulanishning on_message'i (qayta ulanishda almashtiriladi)
+        self.handlers: Dict[str, Callable[[Envelope], Awaitable[None]]] = {}
         self.connection = None
         self.channel = None
         self.exchange = None
-        self.pending_responses: Dict[str, Dict[str, Any]] = {}
+        self._channel_lock = asyncio.Lock()
+        # message_id -> tasdiq kutayotgan parse natijasi
+        self.confirmations = confirmations or PendingConfirmationStore(
+            max_entries=settings.CONFIRMATION_MAX_ENTRIES,
+            ttl_seconds=settings.CONFIRMATION_TTL_SECONDS,
+            redis_url=settings.CONFIRMATION_REDIS_URL,
+        )
+        self.event_writer = event_writer or EventWriter(
+            batch_size=settings.EVENT_WRITER_BATCH_SIZE,
+            flush_interval=settings.EVENT_WRITER_FLUSH_INTERVAL_SECONDS,
+            queue_size=settings.EVENT_WRITER_QUEUE_SIZE,
+        )
+
+    async def ensure_channel(self):
+        """
+        Ulanish, kanal va exchange'ni ochish (kerak bo'lsa qayta ochish).
+        Lock bilan ketma-ketlashtirilgan: bir vaqtdagi chaqiruvlar bitta ulanishni
+        ishlatadi. Kanal ulanishdan alohida tekshiriladi - `.channel()` xato
+        bersa yoki kanal yopilsa keyingi chaqiruvda qayta ochiladi.
+        """
+        async with self._channel_lock:
+            if self.connection is None or self.connection.is_closed:
+                if self.connection_factory is None:
+                    from aio_pika import connect_robust
+                    self.connection_factory = connect_robust
+                self.connection = await self.connection_factory(self.url)
+                self.channel = None
 
-    async def connect(self, client_id: str, on_message: Callable[[str], None]):
+            if not self.is_channel_open():
+                # Eski kanalga bog'langan exchange, queue va consumer'lar yaroqsiz
+                self.channel = None
+                self.exchange = None
+                self.queues.clear()
+                self.consumers.clear()
+                channel = await self.connection.channel()
+                await channel.set_qos(prefetch_count=self.prefetch_count)
+                self.channel = channel
+
+            if self.exchange is None:
+                self.exchange = await self.channel.declare_exchange(
+                    self.exchange_name, type="direct", durable=True
+                )
+            return self.channel
+
+    def is_channel_open(self) -> bool:
+        return self.channel is not None and not self.channel.is_closed
+
+    async def connect(self, client_id: str, on_message: Callable[[Envelope], Awaitable[None]]):
         queue_name = f"queue_{client_id}"
         routing_key = client_id
 
-        if not self.connection:
-            self.connection = await connect_robust(self.url)
-            self.channel = await self.connection.channel()
-
-        if not self.exchange:
-            self.exchange = await self.channel.declare_exchange(
-                self.exchange_name, type="direct", durable=True
-            )
+        await self.ensure_channel()
 
         if queue_name not in self.queues:
             queue = await self.channel.declare_queue(
@@ -48,178 +106,194 @@ class RabbitMQBroker:
         else:
             queue = self.queues[queue_name]
 
+        # Consumer saqlanib qolsa ham xabarlar oxirgi ulanishning callback'iga
+        # (uning socketi va codec'iga) boradi
+        self.handlers[client_id] = on_message
+
         if client_id not in self.consumers:
-            async def handle(msg: IncomingMessage):
-                message = msg.body.decode()
-                try:
-                    # Xabarni qayta ishlash
-                    processed_message = self._process_message(message, client_id)
-                    await on_message(processed_message)
-                    await msg.ack()
-                except Exception as e:
-                    print(f"[ERROR] Xabar yuborilmadi: {e}")
+            async def handle(msg: "IncomingMessage"):
+                current = self.handlers.get(client_id)
+                if current is None:
                     await msg.nack(requeue=True)
+                    return
+                with log_context(client_id=client_id), \
+                        BROKER_INFLIGHT.track_inprogress(), BROKER_CONSUME_LATENCY.time():
+                    await self._handle_incoming(msg, client_id, current)
 
             consumer_tag = await queue.consume(handle)
             self.consumers[client_id] = consumer_tag
 
-    def _process_message(self, message: str, client_id: str) -> str:
+    async def _handle_incoming(self, msg: "IncomingMessage", client_id: str,
+                               on_message: Callable[[Envelope], Awaitable[None]]):
+        try:
+            payload = decode_body(msg.body)
+            if payload.get("type") in SERVER_MESSAGE_TYPES:
+                # Server xabari (tasdiq, xato...) parse qilinmaydi
+                envelope = Envelope.from_dict(payload)
+            else:
+                # Xabarni qayta ishlash
+                envelope = self._process_message(payload, client_id)
+                if envelope.requires_confirmation and envelope.data:
+                    await self.confirmations.put(
+                        client_id, envelope.message_id, envelope.data
+                    )
+            with log_context(message_id=envelope.message_id):
+                await on_message(envelope)
+            await msg.ack()
+        except Exception as e:
+            logger.exception("Xabar yuborilmadi: %s", e)
+            await msg.nack(requeue=True)
+
+    def _process_message(self, payload: Dict[str, Any], client_id: str) -> Envelope:
         """
         Xabarni qayta ishlash - avtomatik tasdiq talab qiladigan versiya
         """
-        try:
-            data = json.loads(message)
-            original_text = data.get("text", message)
-        except:
-            original_text = message
+        original_text = str(payload.get("text", ""))
+
+        # Avtomatik ravishda message_id yaratish
+        message_id = f"msg_{int(datetime.now().timestamp())}_{uuid.uuid4().hex[:8]}"
 
         try:
-            parser = FakeEventParser()
-            request = FakeParseRequest(prompt=original_text)
-            response = parser.parse(request)
-            
-            # Avtomatik ravishda message_id yaratish
-            message_id = f"msg_{int(datetime.now().timestamp())}_{uuid.uuid4().hex[:8]}"
-            
+            draft = payload.get("draft_result")
+            if draft is not None:
+                # Client shu matnni draft sifatida yuborgan, natija tayyor
+                response = FakeParseResponse.model_validate(draft)
+            else:
+                parser = FakeEventParser()
+                request = FakeParseRequest(prompt=original_text)
+                response = parser.parse(request)
+
             # HAR QANDAY xabar uchun tasdiq talab qilamiz (test uchun)
-            requires_confirmation = True  # HAR DOIM true qilamiz
-            
-            result_dict = {
-                "original_text": str(original_text),
-                "success": bool(response.success),
-                "client_id": str(client_id),
-                "timestamp": str(datetime.now().isoformat()),
-                "type": "parsed_result",
-                "requires_confirmation": requires_confirmation,  # TEST: har doim true
-                "message_id": message_id
-            }
-            
+            envelope = Envelope(
+                type=MessageType.PARSED_RESULT,
+                client_id=str(client_id),
+                original_text=original_text,
+                success=bool(response.success),
+                requires_confirmation=True,
+                message_id=message_id,
+            )
+
             if response.success and response.data:
-                data = response.data
-                
-                # Convert all attributes to string
-                result_dict.update({
-                    "intent": str(data.intent.value if hasattr(data.intent, 'value') else data.intent),
-                    "language": str(data.language.value if hasattr(data.language, 'value') else data.language),
-                    "confidence": str(round(data.confidence, 2) if hasattr(data, 'confidence') else 'N/A'),
-                    "title": str(data.title) if hasattr(data, 'title') else original_text[:30],
-                    "time_start": str(data.time_start) if hasattr(data, 'time_start') else '',
-                    "time_end": str(data.time_end) if hasattr(data, 'time_end') else '',
-                    "all_day": str(data.all_day) if hasattr(data, 'all_day') else 'False',
-                    "repeat": str(data.repeat) if hasattr(data, 'repeat') else '',
-                    "invites": str(data.invites) if hasattr(data, 'invites') else '[]',
-                    "alerts": str(data.alerts) if hasattr(data, 'alerts') else '[]',
-                    "url": str(data.url) if hasattr(data, 'url') else '',
-                    "note": str(data.note) if hasattr(data, 'note') else '',
-                    "warnings": str(data.warnings) if hasattr(data, 'warnings') else '[]'
-                })
-                DATA["data"] = result_dict
-                
+                envelope.data = parsed_event_payload(response.data)
+
                 # Tasdiq so'rash uchun savol
-                if requires_confirmation:
-                    title = result_dict.get('title', 'Tadbiringiz')
-                    result_dict["confirmation_question"] = f"'{title}' tadbirini yaratishni tasdiqlaysizmi? (Ha/Yo'q)"
-            
-            # Agar parsing muvaffaqiyatsiz bo'lsa ham tasdiq talab qilamiz
-            elif requires_confirmation:
-                result_dict["confirmation_question"] = f"'{original_text[:30]}' uchun amalni tasdiqlaysizmi? (Ha/Yo'q)"
-            
-            return json.dumps(result_dict, ensure_ascii=False)
-            
+                title = envelope.data.get("title") or "Tadbiringiz"
+                envelope.confirmation_question = f"'{title}' tadbirini yaratishni tasdiqlaysizmi? (Ha/Yo'q)"
+            else:
+                # Agar parsing muvaffaqiyatsiz bo'lsa ham tasdiq talab qilamiz
+                envelope.confirmation_question = f"'{original_text[:30]}' uchun amalni tasdiqlaysizmi? (Ha/Yo'q)"
+
+            return envelope
+
         except Exception as e:
             # Xatolikda ham tasdiq talab qilamiz
-            message_id = f"msg_{int(datetime.now().timestamp())}_{uuid.uuid4().hex[:8]}"
-            return json.dumps({
-                "original_text": str(original_text),
-                "error": str(e),
-                "client_id": str(client_id),
-                "timestamp": str(datetime.now().isoformat()),
-                "success": False,
-                "type": "error",
-                "requires_confirmation": True,  # TEST: hatoda ham true
-                "message_id": message_id,
-                "confirmation_question": f"Xatolik yuz berdi, amalni davom ettirishni xohlaysizmi? (Ha/Yo'q)"
-            }, ensure_ascii=False)
-
-    async def publish(self, target_client_id: str, message: str):
-        print(f"[DEBUG] Publishing to {target_client_id}")
-        print(f"[DEBUG] Message preview: {message[:200]}")
+            return Envelope(
+                type=MessageType.ERROR,
+                client_id=str(client_id),
+                original_text=original_text,
+                error=str(e),
+                success=False,
+                requires_confirmation=True,
+                message_id=message_id,
+                confirmation_question="Xatolik yuz berdi, amalni davom ettirishni xohlaysizmi? (Ha/Yo'q)",
+            )
+
+    async def publish(self, target_client_id: str, message: Union[Envelope, Dict[str, Any]]):
+        body = encode_body(message)
+        logger.debug("Publishing to %s: %.200r", target_client_id, body, extra=SAMPLED)
         if not self.exchange:
             raise Exception("Exchange ochilmagan. connect() chaqirilmadi.")
 
-        await self.exchange.publish(
-            Message(message.encode(), delivery_mode=DeliveryMode.PERSISTENT),
-            routing_key=target_client_id
-        )
+        from aio_pika import DeliveryMode, Message
+
+        with BROKER_PUBLISH_LATENCY.time():
+            await self.exchange.publish(
+                Message(body, delivery_mode=DeliveryMode.PERSISTENT),
+                routing_key=target_client_id
+            )
 
-    async def process_response(self, client_id: str, response_message: str):
+    async def process_response(self, client_id: str, data: Dict[str, Any]):
         """
         Clientdan kelgan javobni qayta ishlash - soddalashtirilgan
         """
         try:
-            print(f"[DEBUG] Processing response from {client_id}: {response_message}")
-            data = json.loads(response_message)
-            response_text = data.get("text", "").lower().strip()
+            logger.debug("Processing response from %s: %s", client_id, data, extra=SAMPLED)
+            response_text = str(data.get("text", "")).lower().strip()
             response_to = data.get("response_to")
-            
+
             # Javob matnini tekshirish
             if response_text in ["ha", "yes", "да", "ok", "1"]:
-                # from ..utils.event_data_order import event_data_order
-                # import ast
-            
-                # data = DATA.copy()
-                # print(">>>>>>>>>>>>>>>>>>>",data,"###################################################")
-                # sys.stdout.flush()
-                # cleaned = normalize_for_json(data)
-        
-            
-                # from ..utils.object_create import create_event
-                
-                # data_list = event_data_order(cleaned) # [eventdata, eventinvites, eventalarm]
-                
-                # event = create_event(data_list[0])
-                # # eventinvites = data_list[1]
-                # # eventalarms = data_list[2]
-            
-                
+                # Taklif message_id bo'yicha olinadi, qayta parse qilinmaydi
+                proposal = await self.confirmations.pop(client_id, response_to)
+                if proposal is None:
+                    await self.publish(client_id, Envelope(
+                        type=MessageType.ERROR,
+                        client_id=client_id,
+                        text="⚠️ Tasdiqlanadigan taklif topilmadi yoki muddati o'tgan.",
+                        original_message_id=response_to,
+                    ))
+                    logger.warning("No pending proposal %s for %s", response_to, client_id)
+                    return
+
+                # Event batch writer orqali yoziladi (event + invite + alert bitta tranzaksiyada)
+                try:
+                    future = await self.event_writer.submit(
+                        uuid.UUID(client_id), EventProposal.model_validate(proposal)
+                    )
+                    event_id = await future
+                except Exception as e:
+                    # Taklif qaytariladi: user "Ha" ni qayta yuborib urinishi mumkin
+                    await self.confirmations.put(client_id, response_to, proposal)
+                    await self.publish(client_id, Envelope(
+                        type=MessageType.ERROR,
+                        client_id=client_id,
+                        text="⚠️ Tadbirni yaratib bo'lmadi, qayta urinib ko'ring.",
+                        error=str(e),
+                        original_message_id=response_to,
+                    ))
+                    logger.error("Event creation failed for %s: %s", client_id, e)
+                    return
+
                 # Tasdiq javobi
-                confirmation_msg = json.dumps({
-                    "text": "✅ Tasdiqlandi! Tadbir yaratildi.",
-                    "type": "confirmation",
-                    "client_id": client_id,
-                    "timestamp": datetime.now().isoformat(),
-                    "original_message_id": response_to
-                })
-                await self.publish(client_id, confirmation_msg)
-                print(f"[INFO] Confirmation sent to {client_id}")
-                
+                await self.publish(client_id, Envelope(
+                    type=MessageType.CONFIRMATION,
+                    client_id=client_id,
+                    text="✅ Tasdiqlandi! Tadbir yaratildi.",
+                    original_message_id=response_to,
+                    data={"event_id": str(event_id)},
+                ))
+                logger.info("Confirmation sent to %s", client_id)
+
             elif response_text in ["yo'q", "no", "нет", "cancel", "0"]:
+                await self.confirmations.pop(client_id, response_to)
+
                 # Rad etish javobi
-                rejection_msg = json.dumps({
-                    "text": "❌ Bekor qilindi.",
-                    "type": "rejection", 
-                    "client_id": client_id,
-                    "timestamp": datetime.now().isoformat(),
-                    "original_message_id": response_to
-                })
-                await self.publish(client_id, rejection_msg)
-                print(f"[INFO] Rejection sent to {client_id}")
-                
+                await self.publish(client_id, Envelope(
+                    type=MessageType.REJECTION,
+                    client_id=client_id,
+                    text="❌ Bekor qilindi.",
+                    original_message_id=response_to,
+                ))
+                logger.info("Rejection sent to %s", client_id)
+
             else:
                 # Noto'g'ri javob
-                error_msg = json.dumps({
-                    "text": f"⚠️ Noto'g'ri javob: '{response_text}'. Iltimos, 'Ha' yoki 'Yo'q' deb javob bering.",
-                    "type": "error",
-                    "client_id": client_id,
-                    "timestamp": datetime.now().isoformat()
-                })
-                await self.publish(client_id, error_msg)
-                print(f"[WARNING] Invalid response from {client_id}: {response_text}")
-                
+                await self.publish(client_id, Envelope(
+                    type=MessageType.ERROR,
+                    client_id=client_id,
+                    text=f"⚠️ Noto'g'ri javob: '{response_text}'. Iltimos, 'Ha' yoki 'Yo'q' deb javob bering.",
+                ))
+                logger.warning("Invalid response from %s: %s", client_id, response_text)
+
         except Exception as e:
-            print(f"[ERROR] Failed to process response: {e}")
-            import traceback
-            print(traceback.format_exc())
+            logger.exception("Failed to process response: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "channel_open": self.is_channel_open(),
+            "queues": len(self.queues),
+            "consumers": len(self.consumers),
+        }
 
     async def disconnect_consumer(self, client_id: str):
         queue_name = f"queue_{client_id}"
@@ -228,8 +302,9 @@ class RabbitMQBroker:
 
         if queue and consumer_tag:
             await queue.cancel(consumer_tag)
-            print(f"[INFO] Consumer to'xtatildi: {client_id}")
+            logger.info("Consumer to'xtatildi: %s", client_id)
             del self.consumers[client_id]
+            self.handlers.pop(client_id, None)
             
             if queue.consumer_count == 0:
                 await queue.delete()
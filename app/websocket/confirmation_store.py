@@ -0,0 +1,119 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+
+from ..core.logger import get_logger
+from ..utils.json_format import decode_parse_result
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # redis ixtiyoriy
+    aioredis = None
+
+logger = get_logger(__name__)
+
+
+class PendingConfirmationStore:
+    """
+    Tasdiq kutayotgan parse natijalari (message_id bo'yicha).
+
+    Lokal qism - TTL'li, hajmi chegaralangan LRU. Redis berilsa u asosiy
+    manba bo'ladi: yozuv bir nechta node o'rtasida ko'rinadi va GETDEL orqali
+    faqat bitta node uni "olib" tasdiqlay oladi.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: int = 900,
+        redis_url: Optional[str] = None,
+        key_prefix: str = "pending_confirmation:",
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self._local: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.redis = aioredis.from_url(redis_url) if (redis_url and aioredis) else None
+
+        # Statistika
+        self.evicted = 0
+        self.expired = 0
+
+    def _redis_key(self, client_id: str, message_id: str) -> str:
+        return f"{self.key_prefix}{client_id}:{message_id}"
+
+    def _evict(self, now: float):
+        """Muddati o'tgan va ortiqcha yozuvlarni boshidan olib tashlash"""
+        # Yozuvlar qo'shilish tartibida turadi, TTL hammasi uchun bir xil,
+        # shuning uchun eng eski (va birinchi eskiradigan) yozuv har doim boshida
+        while self._local:
+            key, (expires_at, _) = next(iter(self._local.items()))
+            if expires_at > now:
+                break
+            self._local.popitem(last=False)
+            self.expired += 1
+
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+            self.evicted += 1
+
+    async def put(self, client_id: str, message_id: str, proposal: Dict[str, Any]):
+        """Taklifni saqlash"""
+        now = time.monotonic()
+        key = (client_id, message_id)
+        self._local[key] = (now + self.ttl_seconds, proposal)
+        self._local.move_to_end(key)
+        self._evict(now)
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(
+                    self._redis_key(client_id, message_id),
+                    orjson.dumps(proposal),
+                    ex=self.ttl_seconds,
+                )
+            except Exception as e:
+                logger.warning("Redis put failed for %s: %s", message_id, e)
+
+    async def pop(self, client_id: str, message_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Taklifni olish va o'chirish (bir marta tasdiqlanadi)
+
+        Returns:
+            dict yoki None (topilmadi, muddati o'tgan yoki boshqa node oldi)
+        """
+        now = time.monotonic()
+        entry = self._local.pop((client_id, message_id), None)
+        proposal = None
+        if entry is not None and entry[0] > now:
+            proposal = entry[1]
+
+        if self.redis is not None:
+            try:
+                raw = await self.redis.getdel(self._redis_key(client_id, message_id))
+            except Exception as e:
+                logger.warning("Redis pop failed for %s: %s", message_id, e)
+                return proposal
+
+            if raw is None:
+                # Boshqa node allaqachon tasdiqlagan yoki muddati o'tgan
+                return None
+            if proposal is None:
+                # Redis'da datetime'lar ISO string bo'lib qoladi
+                proposal = decode_parse_result(orjson.loads(raw))
+
+        return proposal
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._local),
+            "max_entries": self.max_entries,
+            "evicted": self.evicted,
+            "expired": self.expired,
+            "redis": self.redis is not None,
+        }
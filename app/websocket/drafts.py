@@ -0,0 +1,138 @@
+"""
+Yozilayotgan matn uchun oldindan parse (draft preview)
+
+Client foydalanuvchi yozayotgan matnni `{"type": "draft", "text": ...}`
+ko'rinishida yuboradi. Har bir ulanishda:
+
+- yangi draft kelganda eski draft'ning kutish (debounce) yoki kutayotgan
+  parse task'i bekor qilinadi, shuning uchun faqat oxirgi draft natijasi
+  `draft_result` bo'lib clientga boradi
+- bir vaqtda bitta parse thread'da bajariladi: boshlangan parse thread'ini
+  to'xtatib bo'lmaydi, keyingisi uning tugashini kutadi
+- yakuniy xabar (`text`) oxirgi draft matni bilan bir xil bo'lsa brokerga
+  tayyor natija biriktiriladi va qayta parse qilinmaydi
+
+Draftlar brokerdan o'tmaydi va tasdiq talab qilmaydi.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from ..core.logger import get_logger
+from ..core.metrics import WS_DRAFTS
+from ..utils.fake_nlp import FakeEventParser, FakeParseRequest
+from .protocol import Envelope, MessageType, parsed_event_payload
+
+logger = get_logger(__name__)
+
+_parser: Optional[FakeEventParser] = None
+
+
+def default_parse(text: str):
+    """Draftlar uchun umumiy parser (thread'da chaqiriladi)"""
+    global _parser
+    if _parser is None:
+        _parser = FakeEventParser()
+    return _parser.parse(FakeParseRequest(prompt=text))
+
+
+class DraftSession:
+    """Bitta ulanishning draft holati (bitta event loop ichida ishlaydi)"""
+
+    def __init__(self, client_id: str, send: Callable[[Envelope], Awaitable[None]],
+                 parse: Callable[[str], Any] = default_parse, debounce: float = 0.15):
+        self.client_id = client_id
+        self.send = send
+        self.parse = parse
+        self.debounce = debounce
+
+        self._generation = 0
+        self._task: Optional[asyncio.Task] = None
+        self._running: Optional[asyncio.Future] = None  # thread'dagi parse
+        self._last_text: Optional[str] = None
+        self._last_result: Any = None
+
+        # Statistika
+        self.offered = 0
+        self.cancelled = 0
+        self.delivered = 0
+        self.reused = 0
+
+    def offer(self, text: str, draft_id: Optional[str] = None):
+        """Yangi draft: eski kutish/parse bekor qilinadi, debounce'dan keyin parse"""
+        self.offered += 1
+        WS_DRAFTS.labels("offered").inc()
+        self._cancel_pending()
+        self._generation += 1
+        self._task = asyncio.create_task(self._run(self._generation, text, draft_id))
+
+    def take(self, text: str) -> Any:
+        """
+        Yakuniy xabar uchun: matn oxirgi draft bilan bir xil bo'lsa uning
+        natijasi (bir marta), aks holda None. Kutayotgan draft bekor qilinadi.
+        """
+        self._cancel_pending()
+        result = None
+        if self._last_result is not None and text == self._last_text:
+            result = self._last_result
+            self.reused += 1
+            WS_DRAFTS.labels("reused").inc()
+        self._last_text = self._last_result = None
+        return result
+
+    def _cancel_pending(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            self.cancelled += 1
+            WS_DRAFTS.labels("cancelled").inc()
+        self._task = None
+
+    async def _run(self, generation: int, text: str, draft_id: Optional[str]):
+        try:
+            await self._parse_and_deliver(generation, text, draft_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Draft parse failed for %s: %s", self.client_id, e)
+
+    async def _parse_and_deliver(self, generation: int, text: str, draft_id: Optional[str]):
+        await asyncio.sleep(self.debounce)
+        # Oldingi parse thread'i tugashini kutish (uni bekor qilib bo'lmaydi)
+        if self._running is not None and not self._running.done():
+            await asyncio.wait({self._running})
+
+        running = asyncio.ensure_future(asyncio.to_thread(self.parse, text))
+        # Kutuvchisi bekor qilingan parse xatosi "never retrieved" ogohlantirishini bermasin
+        running.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._running = running
+        # Bu task bekor qilinsa ham thread'dagi parse davom etadi va keyingi draft uni kutadi
+        response = await asyncio.shield(running)
+        if generation != self._generation:
+            return
+
+        self._last_text, self._last_result = text, response
+        envelope = Envelope(
+            type=MessageType.DRAFT_RESULT,
+            client_id=self.client_id,
+            original_text=text,
+            original_message_id=draft_id,
+            success=bool(response.success),
+            error=response.error,
+        )
+        if response.success and response.data:
+            envelope.data = parsed_event_payload(response.data)
+        self.delivered += 1
+        WS_DRAFTS.labels("delivered").inc()
+        await self.send(envelope)
+
+    async def close(self):
+        self._cancel_pending()
+        self._last_text = self._last_result = None
+
+    def stats(self) -> dict:
+        return {
+            "offered": self.offered,
+            "cancelled": self.cancelled,
+            "delivered": self.delivered,
+            "reused": self.reused,
+        }
@@ -0,0 +1,133 @@
+import asyncio
+import uuid
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..core.logger import get_logger
+from ..database import SessionLocal
+from ..schemas.events_schemas import EventProposal
+from ..utils.object_create import create_events_batch
+
+logger = get_logger(__name__)
+
+
+class EventWriter:
+    """
+    Tasdiqlangan takliflarni fon rejimida, batch qilib yozuvchi.
+
+    `submit` taklifni navbatga qo'yadi va event id uchun future qaytaradi.
+    Worker navbatdan `batch_size` tagacha yozuvni (yoki `flush_interval`
+    ichida kelganlarini) yig'ib, bitta tranzaksiyada thread'da yozadi, shuning
+    uchun sinxron SQLAlchemy event loopni bloklamaydi.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = 50,
+        flush_interval: float = 0.05,
+        queue_size: int = 1000,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.worker: Optional[asyncio.Task] = None
+
+        # Statistika
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+
+    def start(self):
+        if self.worker is None or self.worker.done():
+            self.worker = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0):
+        """
+        Navbatdagi (tasdiqlangan, hali yozilmagan) takliflarni `timeout`
+        soniyagacha yozib bo'lib, keyin workerni to'xtatish
+        """
+        if self.worker is not None and not self.worker.done():
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Event writer stopped with %d unwritten proposals", self.queue.qsize())
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+
+    async def submit(self, user_id: uuid.UUID, proposal: EventProposal) -> "asyncio.Future[uuid.UUID]":
+        """Taklifni yozish navbatiga qo'yish"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((user_id, proposal, future))
+        return future
+
+    async def _collect(self) -> List[Tuple[uuid.UUID, EventProposal, asyncio.Future]]:
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _write_batch(self, batch: List[Tuple[uuid.UUID, EventProposal, asyncio.Future]]):
+        items = [(user_id, proposal) for user_id, proposal, _ in batch]
+        try:
+            event_ids = await asyncio.to_thread(self._write, items)
+        except Exception:
+            # Bitta yomon yozuv butun batchni yiqitmasligi uchun alohida urinib ko'ramiz
+            for item, (_, _, future) in zip(items, batch):
+                try:
+                    [event_id] = await asyncio.to_thread(self._write, [item])
+                    self._resolve(future, event_id)
+                except Exception as e:
+                    self.failed += 1
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        self.batches += 1
+        for event_id, (_, _, future) in zip(event_ids, batch):
+            self._resolve(future, event_id)
+
+    def _resolve(self, future: asyncio.Future, event_id: uuid.UUID):
+        self.written += 1
+        if not future.done():
+            future.set_result(event_id)
+
+    def _write(self, items: List[Tuple[uuid.UUID, EventProposal]]) -> List[uuid.UUID]:
+        db = self.session_factory()
+        try:
+            return create_events_batch(db, items)
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
@@ -1,52 +1,123 @@
+import asyncio
+from typing import Optional, Union
 from fastapi import WebSocket
 import json
 
+from ..core.logger import SAMPLED, get_logger
+from ..core.metrics import WS_MESSAGES_OUT
+from ..core.settings import settings
+
+logger = get_logger(__name__)
+
+
 class ConnectionManager:
-    def __init__(self):
+    def __init__(self, send_queue_size: int = settings.WS_SEND_QUEUE_MAXSIZE):
         self.connections = {}
-        
-        
+        self.send_queue_size = send_queue_size
+        # Har bir client uchun alohida yuborish navbati va writer task
+        self.send_queues = {}
+        self.writers = {}
+
+
     async def connect(self, client_id: str, websocket: WebSocket):
         await websocket.accept()
+        # Shu client_id bilan eski ulanish bo'lsa, uning writer'i to'xtatiladi va
+        # socketi yopiladi; yangi ulanish holatni to'liq egallaydi
+        previous = self.connections.get(client_id)
+        if previous is not None:
+            self._release(client_id)
+            try:
+                await previous.close(code=1000)
+            except Exception as e:
+                logger.debug("Closing replaced socket for %s failed: %s", client_id, e)
+            logger.info("Client %s reconnected, previous socket closed", client_id)
+
         self.connections[client_id] = websocket
-        print(f"[INFO] Client {client_id} connected")
-        
-        
-    def disconnect(self, client_id: str):
-        if client_id in self.connections:
-            del self.connections[client_id]
-            print(f"[INFO] Client {client_id} disconnected")
-        
-    
-    async def send_to_client(self, client_id: str, message: str):
-        websocket = self.connections.get(client_id)
-        
-        if not websocket:
-            print(f"[WARNING] Client {client_id} not found in active connections")
+
+        queue = asyncio.Queue(maxsize=self.send_queue_size)
+        self.send_queues[client_id] = queue
+        self.writers[client_id] = asyncio.create_task(
+            self._writer(client_id, websocket, queue)
+        )
+        logger.info("Client %s connected", client_id)
+
+
+    def disconnect(self, client_id: str, websocket: Optional[WebSocket] = None) -> bool:
+        """
+        Ulanish holatini o'chirish. `websocket` berilsa, holat faqat shu socketga
+        tegishli bo'lsagina o'chiriladi (qayta ulangan clientning yangi holatiga
+        eski socketning tozalanishi tegmaydi).
+
+        Returns:
+            bool: holat o'chirildimi
+        """
+        current = self.connections.get(client_id)
+        if current is None or (websocket is not None and current is not websocket):
+            return False
+        self._release(client_id)
+        logger.info("Client %s disconnected", client_id)
+        return True
+
+    def _release(self, client_id: str):
+        self.connections.pop(client_id, None)
+        self.send_queues.pop(client_id, None)
+
+        writer = self.writers.pop(client_id, None)
+        if writer and writer is not asyncio.current_task():
+            writer.cancel()
+
+
+    async def send_to_client(self, client_id: str, message: Union[str, bytes]):
+        """
+        Xabarni client navbatiga qo'yish.
+        Haqiqiy yozishni writer task bajaradi, shuning uchun sekin client
+        boshqalarni kutdirib qo'ymaydi.
+        """
+        queue = self.send_queues.get(client_id)
+
+        if queue is None:
+            logger.warning("Client %s not found in active connections", client_id)
             return False
-            
+
         try:
-            await websocket.send_text(message)
-            print(f"[INFO] Message sent to client {client_id}")
+            queue.put_nowait(message)
             return True
-        except Exception as e:
-            print(f"[ERROR] Failed to send message to client {client_id}: {e}")
-            # Connection muammo bo'lsa, disconnect qilish
-            self.disconnect(client_id)
+        except asyncio.QueueFull:
+            logger.warning("Send queue full for client %s, message dropped", client_id)
             return False
-        
+
+    async def _writer(self, client_id: str, websocket: WebSocket, queue: asyncio.Queue):
+        while True:
+            message = await queue.get()
+            try:
+                if isinstance(message, bytes):
+                    await websocket.send_bytes(message)
+                else:
+                    await websocket.send_text(message)
+                WS_MESSAGES_OUT.inc()
+                logger.debug("Message sent to client %s", client_id, extra=SAMPLED)
+            except Exception as e:
+                logger.error("Failed to send message to client %s: %s", client_id, e)
+                # Connection muammo bo'lsa, disconnect qilish
+                self.disconnect(client_id, websocket)
+                return
+
     async def receive_from(self, client_id: str):
         websocket = self.connections.get(client_id)
-        
+
         if not websocket:
-            print(f"[WARNING] Client {client_id} not found for receiving")
+            logger.warning("Client %s not found for receiving", client_id)
             return None
-            
+
         try:
             return await websocket.receive_text()
         except Exception as e:
-            print(f"[ERROR] Failed to receive from client {client_id}: {e}")
+            logger.error("Failed to receive from client %s: %s", client_id, e)
             return None
-    
+
     def get_connection_count(self) -> int:
-        return len(self.connections)
\ No newline at end of file
+        return len(self.connections)
+
+    def get_send_queue_depth(self, client_id: str) -> int:
+        queue = self.send_queues.get(client_id)
+        return queue.qsize() if queue else 0
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from enum import Enum
+from typing import Any, Awaitable, Callable, Optional
+
+from ..core.logger import get_logger
+from ..core.metrics import WS_INBOX_COALESCED, WS_INBOX_DROPPED, WS_INBOX_REJECTED
+
+logger = get_logger(__name__)
+
+
+class OverflowPolicy(str, Enum):
+    """Inbox to'lganda nima qilish kerakligi"""
+    DROP = "drop"      # yangi xabar jimgina tashlab yuboriladi
+    REJECT = "reject"  # clientga "band" xatosi qaytariladi
+    BLOCK = "block"    # socketdan o'qish to'xtaydi (slow-read)
+
+
+class ConnectionPipeline:
+    """
+    Bitta ulanish uchun chegaralangan inbox.
+
+    Socketdan o'qilgan xabarlar navbatga tushadi va bitta worker task ularni
+    ketma-ket qayta ishlaydi, shuning uchun client qancha tez yozmasin,
+    brokerga bir vaqtda bittadan ortiq ish yuborilmaydi.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        handler: Callable[[Any], Awaitable[None]],
+        maxsize: int = 32,
+        policy: OverflowPolicy = OverflowPolicy.DROP,
+        coalesce_window: float = 1.0,
+    ):
+        self.client_id = client_id
+        self.handler = handler
+        self.policy = OverflowPolicy(policy)
+        self.coalesce_window = coalesce_window
+        self.inbox: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.worker: Optional[asyncio.Task] = None
+
+        self._last_message: Any = None
+        self._last_message_at = 0.0
+
+        # Statistika
+        self.accepted = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def start(self):
+        if self.worker is None:
+            self.worker = asyncio.create_task(self._run())
+
+    async def offer(self, message: Any) -> bool:
+        """
+        Xabarni inboxga qo'yish
+
+        Returns:
+            bool: False bo'lsa xabar rad etildi (REJECT siyosati)
+        """
+        now = time.monotonic()
+
+        # Ketma-ket kelgan bir xil xabarlarni birlashtirish
+        if (
+            message == self._last_message
+            and now - self._last_message_at < self.coalesce_window
+        ):
+            self.coalesced += 1
+            WS_INBOX_COALESCED.inc()
+            return True
+
+        if self.policy == OverflowPolicy.BLOCK:
+            await self.inbox.put(message)
+            self._mark_accepted(message, now)
+            return True
+
+        try:
+            self.inbox.put_nowait(message)
+        except asyncio.QueueFull:
+            if self.policy == OverflowPolicy.REJECT:
+                self.rejected += 1
+                WS_INBOX_REJECTED.inc()
+                return False
+            self.dropped += 1
+            WS_INBOX_DROPPED.inc()
+            logger.warning("Inbox full, message dropped for %s", self.client_id)
+            return True
+
+        self._mark_accepted(message, now)
+        return True
+
+    def _mark_accepted(self, message: Any, now: float):
+        # Faqat navbatga tushgan xabar keyingi dublikatlar uchun asos bo'ladi
+        self._last_message = message
+        self._last_message_at = now
+        self.accepted += 1
+
+    async def _run(self):
+        while True:
+            message = await self.inbox.get()
+            try:
+                await self.handler(message)
+            except Exception as e:
+                logger.exception("Pipeline handler failed for %s: %s", self.client_id, e)
+            finally:
+                self.inbox.task_done()
+
+    async def close(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+
+    def depth(self) -> int:
+        return self.inbox.qsize()
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth(),
+            "accepted": self.accepted,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,212 @@
+"""
+WebSocket xabar protokoli
+
+Server yuboradigan har bir xabar bitta typed `Envelope` ko'rinishida bo'ladi va
+faqat bir marta serializatsiya qilinadi. Format ulanish vaqtida tanlanadi:
+
+- json: orjson, text frame
+- msgpack: MessagePack, binary frame (msgpack o'rnatilgan bo'lsa)
+- compat: eski clientlar uchun barcha maydonlari string bo'lgan tekis JSON
+"""
+
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional, Union
+
+import orjson
+
+try:
+    import msgpack
+except ImportError:  # msgpack ixtiyoriy
+    msgpack = None
+
+
+class MessageType(str, Enum):
+    """Xabar turlari"""
+    PROMPT = "prompt"
+    DRAFT = "draft"  # client yozayotgan matn (preview uchun)
+    PARSED_RESULT = "parsed_result"
+    DRAFT_RESULT = "draft_result"
+    CONFIRMATION = "confirmation"
+    REJECTION = "rejection"
+    ERROR = "error"
+
+
+class WireFormat(str, Enum):
+    """Socket orqali uzatish formati"""
+    JSON = "json"
+    MSGPACK = "msgpack"
+    COMPAT = "compat"
+
+
+# Brokerdan parse qilinmasdan to'g'ridan-to'g'ri clientga o'tadigan turlar
+SERVER_MESSAGE_TYPES = {
+    MessageType.PARSED_RESULT.value,
+    MessageType.DRAFT_RESULT.value,
+    MessageType.CONFIRMATION.value,
+    MessageType.REJECTION.value,
+    MessageType.ERROR.value,
+}
+
+
+@dataclass(slots=True)
+class Envelope:
+    """Server -> client xabari"""
+    type: MessageType
+    client_id: str
+    timestamp: datetime = field(default_factory=datetime.now)
+    text: Optional[str] = None
+    message_id: Optional[str] = None
+    original_message_id: Optional[str] = None
+    original_text: Optional[str] = None
+    success: Optional[bool] = None
+    requires_confirmation: bool = False
+    confirmation_question: Optional[str] = None
+    error: Optional[str] = None
+    data: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """None bo'lmagan maydonlardan dict yasash"""
+        result = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if value is None:
+                continue
+            result[f.name] = value
+        result["type"] = self.type.value
+        return result
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "Envelope":
+        """Broker body'dan Envelope tiklash"""
+        known = {f.name for f in fields(cls)}
+        kwargs = {k: v for k, v in payload.items() if k in known}
+        kwargs["type"] = MessageType(kwargs["type"])
+        if isinstance(kwargs.get("timestamp"), str):
+            kwargs["timestamp"] = datetime.fromisoformat(kwargs["timestamp"])
+        return cls(**kwargs)
+
+    def to_legacy_dict(self) -> Dict[str, Any]:
+        """Eski clientlar kutadigan tekis format (data maydonlari string)"""
+        result = {}
+        for name in _LEGACY_FIELDS:
+            value = getattr(self, name)
+            if value is None:
+                continue
+            result[name] = value
+        result["type"] = self.type.value
+        result["timestamp"] = self.timestamp.isoformat()
+        if self.requires_confirmation:
+            result["requires_confirmation"] = True
+
+        if self.data:
+            for key, value in self.data.items():
+                result[key] = _legacy_str(key, value)
+
+        if self.confirmation_question is not None:
+            result["confirmation_question"] = self.confirmation_question
+        return result
+
+
+_LEGACY_FIELDS = (
+    "text",
+    "original_text",
+    "success",
+    "client_id",
+    "error",
+    "message_id",
+    "original_message_id",
+)
+
+
+def _legacy_str(key: str, value: Any) -> str:
+    if key == "confidence" and isinstance(value, float):
+        return str(round(value, 2))
+    # datetime uchun ham eski format saqlanadi: "2025-12-25 00:00:00"
+    return str(value)
+
+
+def parsed_event_payload(data) -> Dict[str, Any]:
+    """Parse natijasini typed dict ko'rinishiga o'tkazish (stringlarsiz)"""
+    return {
+        "intent": getattr(data.intent, "value", data.intent),
+        "language": getattr(data.language, "value", data.language),
+        "confidence": round(data.confidence, 2),
+        "title": data.title,
+        "time_start": data.time_start,
+        "time_end": data.time_end,
+        "all_day": data.all_day,
+        "repeat": data.repeat,
+        "invites": list(data.invites),
+        "alerts": list(data.alerts),
+        "url": data.url,
+        "note": data.note,
+        "warnings": list(data.warnings),
+    }
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Unsupported type: {type(obj)!r}")
+
+
+def encode_body(payload: Union[Envelope, Dict[str, Any]]) -> bytes:
+    """Broker uchun body (orjson dataclass va datetime'ni o'zi biladi)"""
+    if isinstance(payload, Envelope):
+        payload = payload.to_dict()
+    return orjson.dumps(payload)
+
+
+def decode_body(body: bytes) -> Dict[str, Any]:
+    return orjson.loads(body)
+
+
+class MessageCodec:
+    """Bitta ulanish uchun tanlangan format bo'yicha encode/decode"""
+
+    def __init__(self, wire_format: WireFormat = WireFormat.COMPAT):
+        wire_format = WireFormat(wire_format)
+        if wire_format == WireFormat.MSGPACK and msgpack is None:
+            wire_format = WireFormat.JSON
+        self.wire_format = wire_format
+
+    def encode(self, envelope: Envelope) -> Union[str, bytes]:
+        """
+        Envelope'ni frame'ga aylantirish
+
+        Returns:
+            str (text frame) yoki bytes (binary frame)
+        """
+        if self.wire_format == WireFormat.MSGPACK:
+            return msgpack.packb(envelope.to_dict(), default=_msgpack_default)
+        if self.wire_format == WireFormat.COMPAT:
+            return orjson.dumps(envelope.to_legacy_dict()).decode()
+        return orjson.dumps(envelope.to_dict()).decode()
+
+    def decode(self, raw: Union[str, bytes]) -> Dict[str, Any]:
+        """Clientdan kelgan frame'ni dict'ga aylantirish"""
+        try:
+            if isinstance(raw, bytes) and self.wire_format == WireFormat.MSGPACK:
+                payload = msgpack.unpackb(raw)
+            else:
+                payload = orjson.loads(raw)
+        except Exception:
+            payload = None
+
+        if not isinstance(payload, dict):
+            text = raw.decode(errors="replace") if isinstance(raw, bytes) else raw
+            return {"text": text}
+        return payload
+
+
+def negotiate(requested: Optional[str], default: str) -> MessageCodec:
+    """Query parametridagi `protocol` bo'yicha codec tanlash"""
+    try:
+        wire_format = WireFormat((requested or default).lower())
+    except ValueError:
+        wire_format = WireFormat(default)
+    return MessageCodec(wire_format)
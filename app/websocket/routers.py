@@ -1,4 +1,6 @@
 from fastapi import APIRouter, WebSocket
+from ..core.metrics import WebSocketCollector, register_collector
+from ..core.throttling import throttle
 from .manager import ConnectionManager
 from .broker import RabbitMQBroker
 from .service_socket.service import WebSocketService
@@ -6,7 +8,8 @@ from .service_socket.service import WebSocketService
 router = APIRouter()
 manager = ConnectionManager()
 broker = RabbitMQBroker()
-ws_service = WebSocketService(manager, broker)
+ws_service = WebSocketService(manager, broker, throttle)
+register_collector(WebSocketCollector(manager, ws_service))
 
 @router.websocket("/ws/chat")
 async def websocket_endpoint(websocket: WebSocket):
@@ -1,23 +1,36 @@
-import json
+import logging
 from datetime import datetime
+from typing import Optional, Union
 from jwt import decode
-from fastapi import WebSocket
+from fastapi import WebSocket, WebSocketDisconnect
+from ...core.logger import SAMPLED, bind_client, get_logger, log_context
+from ...core.metrics import WS_CONNECTS, WS_DRAFTS, WS_MESSAGES_IN
 from ...core.settings import settings
+from ...core.throttling import Throttle
 from ..manager import ConnectionManager
 from ..broker import RabbitMQBroker
+from ..drafts import DraftSession
+from ..pipeline import ConnectionPipeline
+from ..protocol import Envelope, MessageCodec, MessageType, negotiate
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 
+logger = get_logger(__name__)
+
 def get_user_id_from_jwt(token: str) -> int:
     payload = decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     return payload["sub"]
 
 
 class WebSocketService:
-    def __init__(self, manager: ConnectionManager, broker: RabbitMQBroker):
+    def __init__(self, manager: ConnectionManager, broker: RabbitMQBroker,
+                 throttle: Optional[Throttle] = None):
         self.manager = manager
         self.broker = broker
+        self.throttle = throttle
+        self.pipelines = {}
+        self.drafts = {}
 
     async def handle_connection(self, websocket: WebSocket):
         token = websocket.query_params.get("token")
@@ -31,51 +44,147 @@ class WebSocketService:
             return
 
         client_id_str = str(client_id)
+        # Shu ulanishdagi barcha loglar (va undan yaratilgan tasklar) client_id bilan
+        bind_client(client_id_str)
+        # json | msgpack | compat (eski clientlar uchun default)
+        codec = negotiate(
+            websocket.query_params.get("protocol"), settings.WS_DEFAULT_PROTOCOL
+        )
         await self.manager.connect(client_id_str, websocket)
+        WS_CONNECTS.inc()
 
-        async def send_to_ws(processed_message: str):
-            success = await self.manager.send_to_client(client_id_str, processed_message)
+        async def send_to_ws(envelope: Envelope):
+            success = await self.manager.send_to_client(client_id_str, codec.encode(envelope))
             if not success:
-                print(f"[WARNING] Failed to send to client {client_id_str}")
+                logger.warning("Failed to send to client %s", client_id_str)
 
         await self.broker.connect(client_id_str, send_to_ws)
 
+        async def handle_message(data: dict):
+            await self._handle_message(client_id_str, data)
+
+        pipeline = ConnectionPipeline(
+            client_id_str,
+            handle_message,
+            maxsize=settings.WS_INBOX_MAXSIZE,
+            policy=settings.WS_INBOX_POLICY,
+            coalesce_window=settings.WS_COALESCE_WINDOW_SECONDS,
+        )
+        self.pipelines[client_id_str] = pipeline
+        pipeline.start()
+
+        drafts = None
+        if settings.WS_DRAFTS_ENABLED:
+            drafts = DraftSession(client_id_str, send_to_ws, debounce=settings.WS_DRAFT_DEBOUNCE_SECONDS)
+            self.drafts[client_id_str] = drafts
+
         try:
             while True:
-                raw_message = await websocket.receive_text()
-                print(f"[INFO] Received from client {client_id_str}: {raw_message[:100]}")
-                
-                try:
-                    data = json.loads(raw_message)
-                    
-                    # 1. Agar bu javob bo'lsa (response_to bor)
-                    if "response_to" in data:
-                        print(f"[DEBUG] Detected response: {data.get('response_to')}")
-                        await self.broker.process_response(client_id_str, raw_message)
+                raw_message = await self._receive(websocket)
+                WS_MESSAGES_IN.inc()
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Received from client: %.100r", raw_message, extra=SAMPLED)
+
+                # Xabar bir marta decode qilinadi va turi bo'yicha yo'naltiriladi
+                data = self._decode(codec, raw_message)
+                if data is None:
+                    continue
+
+                # Draftlar inboxga tushmaydi: har bir yangisi eskisini bekor qiladi,
+                # ulanishda bir vaqtda bittadan ortiq parse bo'lmaydi. O'z rate
+                # limiti bor (user bo'yicha, barcha ulanishlari uchun umumiy)
+                if data.get("type") == MessageType.DRAFT.value:
+                    if drafts is not None and await self._allow_draft(client_id_str):
+                        drafts.offer(str(data.get("text", "")), data.get("draft_id"))
+                    continue
+
+                # User bo'yicha rate limit (inboxga tushmasdan oldin)
+                if self.throttle is not None:
+                    decision = await self.throttle.allow_message(client_id_str)
+                    if not decision.allowed:
+                        await send_to_ws(Envelope(
+                            type=MessageType.ERROR,
+                            client_id=client_id_str,
+                            text="⚠️ Juda ko'p xabar yuborildi, iltimos biroz kuting.",
+                        ))
                         continue
-                    
-                    # 2. Oddiy xabar bo'lsa
-                    text = data.get("text", raw_message)
-                    enhanced_data = {
-                        "text": text,
-                        "timestamp": datetime.now().isoformat(),
-                        "client_id": client_id_str
-                    }
-                    message_to_send = json.dumps(enhanced_data)
-                    
-                except json.JSONDecodeError:
-                    # Oddiy text bo'lsa
-                    message_to_send = json.dumps({
-                        "text": raw_message,
-                        "timestamp": datetime.now().isoformat(),
-                        "client_id": client_id_str
-                    })
-
-                # Xabarni brokerga yuborish
-                await self.broker.publish(client_id_str, message_to_send)
-                print(f"[INFO] Sent to broker for processing: {message_to_send[:100]}")
 
+                # Inbox to'lgan bo'lsa va siyosat REJECT bo'lsa, clientga xabar beramiz
+                if not await pipeline.offer(data):
+                    await send_to_ws(Envelope(
+                        type=MessageType.ERROR,
+                        client_id=client_id_str,
+                        text="⚠️ Juda ko'p xabar yuborildi, iltimos biroz kuting.",
+                    ))
+
+        except Exception as e:
+            logger.info("WebSocket closed for %s: %r", client_id_str, e)
+            # Shu client_id bilan yangi ulanish ochilgan bo'lsa, consumer unga tegishli
+            if self.manager.disconnect(client_id_str, websocket):
+                await self.broker.disconnect_consumer(client_id_str)
+        finally:
+            await pipeline.close()
+            if self.pipelines.get(client_id_str) is pipeline:
+                del self.pipelines[client_id_str]
+            if drafts is not None:
+                await drafts.close()
+                if self.drafts.get(client_id_str) is drafts:
+                    del self.drafts[client_id_str]
+
+    async def _receive(self, websocket: WebSocket) -> Union[str, bytes]:
+        """Text yoki binary frame o'qish"""
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        if message.get("text") is not None:
+            return message["text"]
+        return message.get("bytes") or b""
+
+    def _decode(self, codec: MessageCodec, raw_message: Union[str, bytes]) -> Optional[dict]:
+        """Xabar dict'i; buzuq yoki dict bo'lmagan xabar tashlab yuboriladi (None)"""
+        try:
+            data = codec.decode(raw_message)
         except Exception as e:
-            print(f"[ERROR] WebSocket error for {client_id_str}: {e}")
-            self.manager.disconnect(client_id_str)
-            await self.broker.disconnect_consumer(client_id_str)
\ No newline at end of file
+            logger.warning("Undecodable message dropped: %s", e)
+            return None
+        if not isinstance(data, dict):
+            logger.warning("Non-object message dropped: %.100r", data)
+            return None
+        return data
+
+    async def _allow_draft(self, client_id_str: str) -> bool:
+        """Limitdan oshgan draft jimgina tashlanadi (keyingi draft yoki yakuniy xabar baribir keladi)"""
+        if self.throttle is None:
+            return True
+        decision = await self.throttle.allow_draft(client_id_str)
+        if not decision.allowed:
+            WS_DRAFTS.labels("throttled").inc()
+        return decision.allowed
+
+    async def _handle_message(self, client_id_str: str, data: dict):
+        """Inboxdan olingan bitta (decode qilingan) xabarni qayta ishlash"""
+        # 1. Agar bu javob bo'lsa (response_to bor)
+        if "response_to" in data:
+            with log_context(message_id=data.get("response_to")):
+                logger.debug("Detected response: %s", data.get("response_to"), extra=SAMPLED)
+                await self.broker.process_response(client_id_str, data)
+            return
+
+        # 2. Oddiy xabar bo'lsa
+        message_to_send = {
+            "type": MessageType.PROMPT.value,
+            "text": data.get("text", ""),
+            "timestamp": datetime.now(),
+            "client_id": client_id_str
+        }
+
+        # Matn oxirgi draft bilan bir xil bo'lsa broker qayta parse qilmaydi
+        drafts = self.drafts.get(client_id_str)
+        if drafts is not None:
+            draft = drafts.take(str(message_to_send["text"]))
+            if draft is not None:
+                message_to_send["draft_result"] = draft.model_dump(mode="json")
+
+        # Xabarni brokerga yuborish
+        await self.broker.publish(client_id_str, message_to_send)
+        logger.debug("Sent to broker for processing: %.100s", message_to_send["text"], extra=SAMPLED)
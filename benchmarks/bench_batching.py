@@ -0,0 +1,90 @@
+"""
+Dynamic padding benchmarki
+
+Qisqa promptlar va bir nechta uzun izohlardan iborat batchlar uchun:
+
+1. padding samaradorligi (haqiqiy / pad qilingan tokenlar) - bitta batchni
+   eng uzun matngacha pad qilish va uzunlik bo'yicha bucketlash
+2. torch/transformers o'rnatilgan bo'lsa - kichik tasodifiy DistilBERT
+   (`BERTNLPModel.tiny_random`) bilan intent + slot latency
+
+    python -m benchmarks.bench_batching --batch 32 --long-ratio 0.05
+"""
+
+import argparse
+import random
+from typing import List
+
+from app.nlp_parser.batching import padding_stats, plan_buckets
+from app.nlp_parser.config import settings
+from app.nlp_parser.corpus import CorpusSample, generate_corpus
+from benchmarks.bench_slot_decode import tokenize
+from benchmarks.harness import measure
+
+LONG_NOTE = (
+    " izoh: oldingi uchrashuv bayonnomasini, byudjet jadvalini, mijoz bilan "
+    "kelishilgan muddatlarni va dizayn jamoasining so'nggi maketlarini olib keling"
+)
+
+
+def build_batches(count: int, batch: int, long_ratio: float, seed: int) -> List[List[str]]:
+    rng = random.Random(seed)
+    prompts = [sample.prompt for sample in generate_corpus(count, seed=seed)]
+    prompts = [p + LONG_NOTE * 2 if rng.random() < long_ratio else p for p in prompts]
+    return [prompts[i:i + batch] for i in range(0, len(prompts), batch)]
+
+
+def token_lengths(texts: List[str]) -> List[int]:
+    """Taxminiy wordpiece uzunligi (tokenizer'siz)"""
+    return [min(len(tokenize(CorpusSample(text, None, "create"))[0]), settings.max_length) for text in texts]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=1024)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--long-ratio", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    batches = build_batches(args.samples, args.batch, args.long_ratio, args.seed)
+    naive = {"real_tokens": 0, "padded_tokens": 0}
+    bucketed = {"real_tokens": 0, "padded_tokens": 0}
+    for texts in batches:
+        lengths = token_lengths(texts)
+        for totals, buckets in (
+            (naive, [list(range(len(texts)))]),
+            (bucketed, plan_buckets(lengths, settings.length_buckets, settings.batch_size)),
+        ):
+            stats = padding_stats(lengths, buckets)
+            totals["real_tokens"] += stats["real_tokens"]
+            totals["padded_tokens"] += stats["padded_tokens"]
+
+    print(f"{'strategy':<10} {'real tokens':>12} {'padded tokens':>14} {'efficiency':>11}")
+    for name, totals in (("naive", naive), ("bucketed", bucketed)):
+        efficiency = totals["real_tokens"] / totals["padded_tokens"]
+        print(f"{name:<10} {totals['real_tokens']:>12,} {totals['padded_tokens']:>14,} {efficiency:>11.1%}")
+
+    try:
+        from app.nlp_parser.bert_model import BERTNLPModel
+    except ImportError as e:
+        print(f"\nmodel latency: skipped ({e})")
+        return
+
+    model = BERTNLPModel.tiny_random([text for texts in batches for text in texts])
+    boundaries = settings.length_buckets
+    print(f"\n{'strategy':<10} {'p50 ms/batch':>13} {'p95 ms/batch':>13}")
+    for name, buckets in (("naive", [settings.max_length]), ("bucketed", boundaries)):
+        settings.length_buckets = buckets
+
+        def infer(texts):
+            model.predict_intent_batch(texts)
+            model.extract_slots_batch(texts)
+
+        stats = measure(infer, batches, repeat=2, warmup=2)
+        print(f"{name:<10} {stats['p50_us'] / 1000:>13.2f} {stats['p95_us'] / 1000:>13.2f}")
+    settings.length_buckets = boundaries
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Model hot swap benchmarki
+
+Vaqtinchalik `model_dir` da ikkita versiya yaratiladi. Yuklash (`--load-ms`)
+va har bir inference (`--infer-ms`) sekin bo'lgan soxta model ishlatiladi,
+shuning uchun torch kerak emas. Bir nechta thread uzluksiz so'rov yuboradi.
+Shu vaqtda `activate("v2")` chaqiriladi (admin trigger bilan bir xil yo'l)
+yoki `--watch` bilan CURRENT fayli yangilanadi.
+
+Hisobotda quyidagilar chiqadi:
+- har bir versiyaga tushgan so'rovlar soni;
+- swap oldidan, swap paytida va undan keyingi latency;
+- xatolar soni (0 bo'lishi kerak);
+- swap qancha vaqt olgani.
+
+    python -m benchmarks.bench_hot_swap --threads 8 --load-ms 500
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+from app.nlp_parser.config import settings
+from app.nlp_parser.registry import CURRENT_FILE, VERSIONS_DIR, ModelRegistry
+from benchmarks.harness import summarize
+
+
+class SlowModel:
+    def __init__(self, version: str, infer_seconds: float):
+        self.version = version
+        self.infer_seconds = infer_seconds
+
+    def predict_intent_batch(self, texts: List[str]):
+        time.sleep(self.infer_seconds)
+        return [("create", 1.0) for _ in texts]
+
+    def extract_slots_batch(self, texts: List[str]):
+        time.sleep(self.infer_seconds)
+        return [[] for _ in texts]
+
+
+def make_versions(root: Path, names: List[str]):
+    for name in names:
+        for part in (settings.intent_model_path, settings.ner_model_path):
+            (root / VERSIONS_DIR / name / part).mkdir(parents=True)
+    (root / CURRENT_FILE).write_text(names[0] + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=3.0, help="umumiy davomiylik, sekund")
+    parser.add_argument("--load-ms", type=float, default=500.0)
+    parser.add_argument("--infer-ms", type=float, default=2.0)
+    parser.add_argument("--watch", action="store_true", help="activate() o'rniga CURRENT faylini yangilash")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_versions(root, ["v1", "v2"])
+
+        def loader(path: Path, version: str):
+            time.sleep(args.load_ms / 1000)
+            return SlowModel(version, args.infer_ms / 1000)
+
+        registry = ModelRegistry(model_dir=str(root), loader=loader, warmup_prompts=["ertaga 10 da"])
+        registry.current()
+        if args.watch:
+            registry.watch(0.05)
+
+        stop = threading.Event()
+        swap_window: Dict[str, float] = {}
+        samples: List[tuple] = []
+        errors: List[BaseException] = []
+        lock = threading.Lock()
+
+        def worker():
+            local = []
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    handle = registry.current()
+                    handle.model.predict_intent_batch(["ertaga 10 da"])
+                    handle.model.extract_slots_batch(["ertaga 10 da"])
+                    # So'rov olgan handle'ning versiyasida tugashi kerak
+                    assert handle.model.version == handle.version
+                except BaseException as e:  # noqa: BLE001 - hisobotga yoziladi
+                    with lock:
+                        errors.append(e)
+                    continue
+                local.append((start, time.perf_counter() - start, handle.version))
+            with lock:
+                samples.extend(local)
+
+        threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+
+        time.sleep(args.duration / 3)
+        swap_window["start"] = time.perf_counter()
+        if args.watch:
+            (root / CURRENT_FILE).write_text("v2\n")
+        else:
+            registry.activate("v2")
+        while registry.version != "v2":
+            time.sleep(0.001)
+        swap_window["end"] = time.perf_counter()
+
+        time.sleep(args.duration / 3)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        registry.stop()
+        registry_stats = registry.stats()
+
+    phases = {"before": [], "during": [], "after": []}
+    for start, latency, _ in samples:
+        if start < swap_window["start"]:
+            phases["before"].append(latency)
+        elif start < swap_window["end"]:
+            phases["during"].append(latency)
+        else:
+            phases["after"].append(latency)
+
+    print(f"swap: {(swap_window['end'] - swap_window['start']) * 1000:.0f} ms "
+          f"(load {args.load_ms:.0f} ms + warmup), errors: {len(errors)}")
+    print(f"versions served: {dict(Counter(version for _, _, version in samples))}")
+    print(f"\n{'phase':<8} {'requests':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, latencies in phases.items():
+        stats = summarize(latencies, 1.0)
+        print(f"{name:<8} {stats['count']:>9} {stats['p50_us'] / 1000:>8.2f} "
+              f"{stats['p99_us'] / 1000:>8.2f} {max(latencies, default=0) * 1000:>8.2f}")
+    print(f"\nregistry: {registry_stats}")
+
+
+if __name__ == "__main__":
+    main()
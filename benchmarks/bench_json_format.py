@@ -0,0 +1,86 @@
+"""
+normalize_for_json benchmarki
+
+Eski ast.literal_eval asosidagi normalizatsiya bilan converter jadvali
+asosidagi decode_parse_result'ni real (compat formatdagi) payloadlarda
+solishtiradi.
+
+    python -m benchmarks.bench_json_format --payloads 2000
+"""
+
+import argparse
+import ast
+import time
+
+from app.utils.fake_nlp import FakeEventParser, FakeParseRequest
+from app.utils.json_format import decode_parse_result
+from app.websocket.protocol import Envelope, MessageType, parsed_event_payload
+
+PROMPTS = [
+    "Ertaga 15:00 da 'Design sync' yig'ilishi, 1 soat, 30 daqiqa oldin eslat",
+    "Создай встречу 'Демо' завтра с 15:30 до 16:00, напомни за 10 минут",
+    "Create meeting 'Budget review' tomorrow 3pm-4pm, weekly repeat",
+    "Bugun soat 10:00 da loyiha bahosi",
+]
+
+
+def legacy_normalize_for_json(obj):
+    """Oldingi versiya (har bir string uchun ast.literal_eval)"""
+    if isinstance(obj, dict):
+        return {k: legacy_normalize_for_json(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [legacy_normalize_for_json(i) for i in obj]
+    if isinstance(obj, str):
+        try:
+            return ast.literal_eval(obj)
+        except Exception:
+            return obj
+    return obj
+
+
+def build_payloads(count: int, prompts: list = PROMPTS) -> list:
+    parser = FakeEventParser()
+    payloads = []
+    for i in range(count):
+        prompt = prompts[i % len(prompts)]
+        response = parser.parse(FakeParseRequest(prompt=prompt))
+        envelope = Envelope(
+            type=MessageType.PARSED_RESULT,
+            client_id="cd9040b3-041b-4e27-8b60-439703a99259",
+            original_text=prompt,
+            success=True,
+            requires_confirmation=True,
+            message_id=f"msg_{i}",
+            data=parsed_event_payload(response.data),
+            confirmation_question="'x' tadbirini yaratishni tasdiqlaysizmi? (Ha/Yo'q)",
+        )
+        payloads.append(envelope.to_legacy_dict())
+    return payloads
+
+
+def run(name: str, fn, payloads: list, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for payload in payloads:
+            fn(payload)
+        best = min(best, time.perf_counter() - start)
+    print(
+        f"{name:<22} {len(payloads) / best:>12,.0f} payload/s "
+        f"{best / len(payloads) * 1e6:>8.2f} us/payload"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--payloads", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = build_payloads(args.payloads)
+    run("ast.literal_eval", legacy_normalize_for_json, payloads, args.repeat)
+    run("decode_parse_result", decode_parse_result, payloads, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Model xotirasi: nusxalab yuklash va mmap qilingan safetensors
+
+Har bir rejim uchun N ta worker process ishga tushiriladi. Har bir worker
+`BERTNLPModel(model_dir)` ni yuklab, bitta inference qiladi va kutib turadi.
+Shu paytda parent `/proc/<pid>/smaps_rollup` dan quyidagilarni o'qiydi:
+
+- RSS: process ko'radigan barcha sahifalar;
+- PSS: umumiy sahifalar processlar soniga bo'lingan holda;
+- Shared_Clean: page cache'dan bo'lishilgan sahifalar.
+
+Node'dagi haqiqiy xotira - PSS yig'indisi.
+
+`--model-dir` berilmasa vaqtinchalik katalogga DistilBERT o'lchamidagi
+tasodifiy model (intent + NER, safetensors) saqlanadi.
+
+    python -m benchmarks.bench_model_memory --workers 1 2 4
+    python -m benchmarks.bench_model_memory --model-dir models/nlp/versions/2024-06-15
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.env import apply_defaults
+
+CHILD = r"""
+import os, sys
+from app.nlp_parser.bert_model import BERTNLPModel
+model = BERTNLPModel(sys.argv[1])
+model.predict_intent_batch(["ertaga soat 10 da uchrashuv"])
+model.extract_slots_batch(["ertaga soat 10 da uchrashuv"])
+print("ready", flush=True)
+sys.stdin.read()
+"""
+
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Private_Clean", "Private_Dirty")
+
+
+def smaps_rollup(pid: int) -> Dict[str, float]:
+    """/proc/<pid>/smaps_rollup -> MB"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in FIELDS:
+                values[key] = int(rest.split()[0]) / 1024
+    return values
+
+
+def build_model(path: Path, dim: int, layers: int, vocab: int):
+    """Tasodifiy DistilBERT'ni `save_models` orqali safetensors ko'rinishida saqlash"""
+    import torch
+    from transformers import DistilBertConfig, DistilBertForSequenceClassification, DistilBertForTokenClassification
+
+    from app.nlp_parser.bert_model import BERTNLPModel, build_wordpiece_tokenizer
+    from app.nlp_parser.config import settings
+    from app.nlp_parser.corpus import generate_corpus
+
+    tokenizer = build_wordpiece_tokenizer(sample.prompt for sample in generate_corpus(2000))
+
+    def config(num_labels: int) -> DistilBertConfig:
+        return DistilBertConfig(
+            vocab_size=max(vocab, len(tokenizer)), dim=dim, n_layers=layers, n_heads=dim // 64,
+            hidden_dim=dim * 4, max_position_embeddings=512,
+            pad_token_id=tokenizer.pad_token_id, num_labels=num_labels,
+        )
+
+    torch.manual_seed(0)
+    BERTNLPModel.from_components(
+        tokenizer,
+        DistilBertForSequenceClassification(config(len(settings.intents))),
+        DistilBertForTokenClassification(config(len(settings.slot_types))),
+        model_dir=str(path),
+    ).save_models()
+
+
+def run_workers(model_dir: str, count: int, mmap: bool) -> List[Dict[str, float]]:
+    env = apply_defaults(dict(os.environ))
+    env["NLP_MMAP_WEIGHTS"] = "true" if mmap else "false"
+    workers = [
+        subprocess.Popen([sys.executable, "-c", CHILD, model_dir], env=env,
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(count)
+    ]
+    try:
+        for worker in workers:
+            if worker.stdout.readline().strip() != "ready":
+                sys.exit(f"worker {worker.pid} failed (exit code {worker.wait()})")
+        return [smaps_rollup(worker.pid) for worker in workers]
+    finally:
+        for worker in workers:
+            worker.stdin.close()
+            worker.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--model-dir", default=None, help="saqlangan model katalogi (intent_model/, ner_model/)")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--vocab", type=int, default=30522)
+    parser.add_argument("--output", default=None, help="natijalarni JSON faylga yozish")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = args.model_dir
+        if model_dir is None:
+            model_dir = tmp
+            build_model(Path(tmp), args.dim, args.layers, args.vocab)
+        weights = sum(path.stat().st_size for path in Path(model_dir).rglob("model.safetensors"))
+        print(f"model: {model_dir} (safetensors {weights / 2**20:.0f} MB)\n")
+
+        results = []
+        print(f"{'mode':<6} {'workers':>7} {'RSS/proc':>9} {'PSS/proc':>9} {'shared':>8} {'PSS total':>10}")
+        for count in args.workers:
+            for mode in ("copy", "mmap"):
+                stats = run_workers(model_dir, count, mmap=mode == "mmap")
+                row = {
+                    "mode": mode,
+                    "workers": count,
+                    "rss_mb": sum(s["Rss"] for s in stats) / count,
+                    "pss_mb": sum(s["Pss"] for s in stats) / count,
+                    "shared_clean_mb": sum(s["Shared_Clean"] for s in stats) / count,
+                    "pss_total_mb": sum(s["Pss"] for s in stats),
+                }
+                results.append(row)
+                print(f"{mode:<6} {count:>7} {row['rss_mb']:>9.0f} {row['pss_mb']:>9.0f} "
+                      f"{row['shared_clean_mb']:>8.0f} {row['pss_total_mb']:>10.0f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+NLP parser benchmark to'plami
+
+Sintetik UZ/RU/EN korpusda quyidagilarni o'lchaydi:
+FakeEventParser.parse, EventParser.parse (tasodifiy vaznli kichik model,
+offline; cascade bilan va cascade'siz), RuleEngine.analyze, LanguageDetector.detect, har bir normalizer va normalize_for_json.
+
+    python -m benchmarks.bench_nlp --corpus 2000 --output bench_results/nlp.json
+    python -m benchmarks.bench_nlp --baseline benchmarks/baselines/nlp.json --threshold 0.15
+    python -m benchmarks.bench_nlp --save-baseline
+
+Kerakli kutubxona o'rnatilmagan benchmark "skipped" deb belgilanadi.
+Baseline'dan sekinlashish threshold'dan oshsa yoki qoidalar tieri
+`RULE_REGRESSIONS` promptlariga javob bersa exit code 1 qaytadi.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from app.nlp_parser.corpus import generate_corpus
+from benchmarks.harness import (
+    compare, environment, load_results, measure, print_table, save_results,
+)
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "nlp.json"
+
+
+def case_fake_parser(corpus, args):
+    from app.utils.fake_nlp import FakeEventParser, FakeParseRequest
+    parser = FakeEventParser()
+    return parser.parse, [FakeParseRequest(prompt=s.prompt) for s in corpus]
+
+
+def case_event_parser(corpus, args):
+    from app.nlp_parser.bert_model import BERTNLPModel
+    from app.nlp_parser.instrumentation import Instrumentation
+    from app.nlp_parser.models import ParseRequest
+    from app.nlp_parser.parser import EventParser
+
+    model = BERTNLPModel.tiny_random([s.prompt for s in corpus], seed=args.seed)
+    parser = EventParser(bert_model=model, instrumentation=Instrumentation())
+    samples = corpus[:args.model_samples]
+    return parser.parse, [ParseRequest(prompt=s.prompt) for s in samples]
+
+
+def case_event_parser_cascade(corpus, args):
+    from app.nlp_parser.bert_model import BERTNLPModel
+    from app.nlp_parser.instrumentation import Instrumentation
+    from app.nlp_parser.models import ParseRequest
+    from app.nlp_parser.parser import EventParser
+    from app.nlp_parser.rules import Cascade
+
+    model = BERTNLPModel.tiny_random([s.prompt for s in corpus], seed=args.seed)
+    parser = EventParser(bert_model=model, instrumentation=Instrumentation(), cascade=Cascade(enabled=True))
+    samples = corpus[:args.model_samples]
+    return parser.parse, [ParseRequest(prompt=s.prompt) for s in samples]
+
+
+def case_rule_engine(corpus, args):
+    from app.nlp_parser.rules import RuleEngine
+    engine = RuleEngine()
+    return engine.analyze, [s.prompt for s in corpus]
+
+
+def case_language_detector(corpus, args):
+    from app.nlp_parser.language_detector import LanguageDetector
+    detector = LanguageDetector()
+    return detector.detect, [s.prompt for s in corpus]
+
+
+def _normalizer_case(name: str, slot_type: str):
+    def case(corpus, args):
+        from app.nlp_parser import normalizers
+        normalizer = getattr(normalizers, name)()
+        inputs = [(text, s.language) for s in corpus for text in s.slot_texts(slot_type)]
+        return (lambda item: normalizer.normalize(*item)), inputs
+    return case
+
+
+def case_normalize_for_json(corpus, args):
+    from app.utils.json_format import normalize_for_json
+    from benchmarks.bench_json_format import build_payloads
+    payloads = build_payloads(min(len(corpus), 1000), [s.prompt for s in corpus])
+    return normalize_for_json, payloads
+
+
+# Qoplanmagan mazmunli so'zlari (to'ldiruvchi so'z harflari bilan boshlanadigan)
+# promptlar: qoidalar tieri ularga javob bermasligi, modelga o'tkazishi kerak
+RULE_REGRESSIONS = [
+    "create meeting tomorrow at 10:00 about annual analytics",
+    "add an appointment with Anna at 10:00 tomorrow",
+    "create online meeting tomorrow at 10:00",
+    "создай встречу завтра в 10:00 с Ивановым",
+    "создай встречу завтра в 10:00 настроить сервер",
+    "ertaga soat 10:00 da analitika uchrashuvi yarat",
+]
+
+
+def check_rule_regressions() -> list:
+    """Cascade threshold'idan o'tib ketgan regression promptlari"""
+    from app.nlp_parser.config import settings
+    from app.nlp_parser.rules import RuleEngine
+    engine = RuleEngine()
+    failed = []
+    for prompt in RULE_REGRESSIONS:
+        result = engine.analyze(prompt)
+        if result is not None and result.confidence >= settings.cascade_threshold:
+            failed.append((prompt, result.confidence))
+    return failed
+
+
+CASES = {
+    "fake_parser.parse": case_fake_parser,
+    "event_parser.parse": case_event_parser,
+    "event_parser.parse[cascade]": case_event_parser_cascade,
+    "rule_engine.analyze": case_rule_engine,
+    "language_detector.detect": case_language_detector,
+    "datetime_normalizer": _normalizer_case("DateTimeNormalizer", "DATETIME"),
+    "duration_normalizer": _normalizer_case("DurationNormalizer", "DURATION"),
+    "repeat_normalizer": _normalizer_case("RepeatNormalizer", "REPEAT"),
+    "normalize_for_json": case_normalize_for_json,
+}
+
+
+def run(args) -> dict:
+    corpus = generate_corpus(args.corpus, seed=args.seed)
+    results = {
+        "environment": environment(),
+        "corpus": {"size": args.corpus, "seed": args.seed},
+        "benchmarks": {},
+        "skipped": {},
+    }
+    for name, case in CASES.items():
+        if args.only and name not in args.only:
+            continue
+        try:
+            fn, inputs = case(corpus, args)
+        except ImportError as e:
+            results["skipped"][name] = str(e)
+            continue
+        results["benchmarks"][name] = measure(fn, inputs, repeat=args.repeat, warmup=args.warmup)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=int, default=2000, help="korpus hajmi")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--model-samples", type=int, default=200, help="EventParser uchun promptlar soni")
+    parser.add_argument("--only", nargs="*", choices=sorted(CASES), help="faqat shu benchmarklar")
+    parser.add_argument("--output", type=Path, help="natijani JSON'ga yozish")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.15, help="ruxsat etilgan sekinlashish (0.15 = 15%%)")
+    parser.add_argument("--metric", default="p50_us", choices=["mean_us", "p50_us", "p95_us", "p99_us"])
+    parser.add_argument("--save-baseline", action="store_true", help="natijani baseline sifatida saqlash")
+    args = parser.parse_args()
+
+    results = run(args)
+    print_table(results)
+
+    failed_rules = check_rule_regressions()
+    for prompt, confidence in failed_rules:
+        print(f"RULE REGRESSION {prompt!r}: rules tier answers at {confidence:.2f}")
+
+    if args.output:
+        save_results(args.output, results)
+    if args.save_baseline:
+        save_results(args.baseline, results)
+        print(f"baseline saved: {args.baseline}")
+        return 1 if failed_rules else 0
+
+    if not args.baseline.exists():
+        return 1 if failed_rules else 0
+    baseline = load_results(args.baseline)
+    if baseline.get("environment", {}).get("platform") != results["environment"]["platform"]:
+        print("warning: baseline boshqa muhitda yozilgan, natijalar taqqoslanmasligi mumkin")
+    regressions = compare(results, baseline, args.threshold, args.metric)
+    for r in regressions:
+        print(
+            f"REGRESSION {r['benchmark']}: {r['metric']} {r['baseline']:.1f} -> "
+            f"{r['current']:.1f} (+{r['change']:.0%})"
+        )
+    return 1 if regressions or failed_rules else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
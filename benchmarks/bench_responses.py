@@ -0,0 +1,92 @@
+"""
+Katta ro'yxatli javoblar benchmarki
+
+Bir xil EventRetrieveOut ro'yxatini uch xil yo'l bilan qaytaradi:
+
+- default:  FastAPI JSONResponse + response_model (dump -> qayta validatsiya -> jsonable_encoder)
+- orjson:   ORJSONResponse + response_model (validatsiya saqlanadi)
+- model:    ModelResponse (validatsiyasiz, pydantic-core serializer)
+
+va har birini siqishsiz hamda CompressionMiddleware bilan o'lchaydi.
+
+    python -m benchmarks.bench_responses --items 100 1000 10000 --requests 50
+"""
+
+import argparse
+import uuid
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.responses import CompressionMiddleware, ModelResponse, ORJSONResponse
+from app.schemas.events_schemas import EventRetrieveOut
+from benchmarks.harness import measure
+
+
+def build_items(count: int) -> List[EventRetrieveOut]:
+    return [
+        EventRetrieveOut(
+            id=str(uuid.UUID(int=i)),
+            title=f"Sprint planning #{i}",
+            description="Haftalik reja va backlog ko'rib chiqish",
+            start_time="2026-01-05T10:00:00+05:00",
+            end_time="2026-01-05T11:00:00+05:00",
+            all_day=False,
+            repeat="RRULE:FREQ=WEEKLY;BYDAY=MO",
+            url="https://meet.example.com/sprint",
+            note="Slaydlarni oldindan yuboring",
+        )
+        for i in range(count)
+    ]
+
+
+def build_app(variant: str, items: List[EventRetrieveOut], compress: bool) -> FastAPI:
+    response_class = JSONResponse if variant == "default" else ORJSONResponse
+    app = FastAPI(default_response_class=response_class)
+    if compress:
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    if variant == "model":
+        @app.get("/events", response_model=List[EventRetrieveOut])
+        def list_events():
+            return ModelResponse(items)
+    else:
+        @app.get("/events", response_model=List[EventRetrieveOut])
+        def list_events():
+            return items
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'items':>6} {'variant':<8} {'encoding':<9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'bytes':>10}")
+    for count in args.items:
+        items = build_items(count)
+        for compress, encoding in ((False, "identity"), (True, "gzip"), (True, "br")):
+            for variant in ("default", "orjson", "model"):
+                client = TestClient(build_app(variant, items, compress))
+                headers = {"Accept-Encoding": encoding}
+                response = client.get("/events", headers=headers)
+                if encoding != "identity" and response.headers.get("content-encoding") != encoding:
+                    # br uchun brotli o'rnatilmagan
+                    break
+                size = int(response.headers.get("content-length", len(response.content)))
+                stats = measure(
+                    lambda _: client.get("/events", headers=headers),
+                    list(range(args.requests)), repeat=1, warmup=3,
+                )
+                print(
+                    f"{count:>6} {variant:<8} {encoding:<9} {stats['ops_per_sec']:>9.1f} "
+                    f"{stats['p50_us'] / 1000:>9.2f} {stats['p95_us'] / 1000:>9.2f} {size:>10,}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Semantic cache benchmarki
+
+1. Qidiruv: har bir sig'im (`--capacity`) uchun indeks tasodifiy birlik
+   vektorlar bilan to'ldiriladi va `lookup` latency'si o'lchanadi (miss va
+   yaqin vektor bilan hit). Bu brute-force matritsa-vektor ko'paytmasi
+   sig'imning qancha qismida hali arzonligini ko'rsatadi.
+2. Korpus: sintetik korpus promptlari ketma-ket keshdan o'tkaziladi. torch
+   kerak bo'lmasligi uchun embedding o'rniga belgi trigrammalarining hash
+   vektori ishlatiladi. Miss bo'lsa oltin slotlar saqlanadi, hit bo'lsa
+   moslangan slotlar oltin slotlar bilan solishtiriladi (offsetlar aniq mos
+   kelishi kerak).
+
+    python -m benchmarks.bench_semantic_cache --capacity 256 2048 8192 --dim 768
+"""
+
+import argparse
+import zlib
+from typing import Dict, List
+
+import numpy as np
+
+from app.nlp_parser.corpus import generate_corpus
+from app.nlp_parser.models import Intent
+from app.nlp_parser.semantic_cache import SemanticCache
+from benchmarks.harness import measure
+
+
+def random_units(rng: np.random.Generator, count: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def bench_search(capacity: int, dim: int, queries: int) -> Dict[str, float]:
+    rng = np.random.default_rng(0)
+    cache = SemanticCache(enabled=True, capacity=capacity)
+    stored = random_units(rng, capacity, dim)
+    for vector in stored:
+        cache.store("v1", "en", vector, "x", Intent.CREATE, [])
+
+    misses = list(random_units(rng, queries, dim))
+    # Saqlangan vektorga kichik shovqin: o'xshashlik chegaradan yuqori
+    near = [stored[i] + rng.standard_normal(dim).astype(np.float32) * 0.005
+            for i in rng.integers(0, capacity, queries)]
+    miss = measure(lambda q: cache.lookup("v1", "en", q, "x", Intent.CREATE), misses, repeat=3)
+    hit = measure(lambda q: cache.lookup("v1", "en", q, "x", Intent.CREATE), near, repeat=3)
+    return {
+        "miss_p50_us": miss["p50_us"], "miss_p99_us": miss["p99_us"],
+        "hit_p50_us": hit["p50_us"], "hit_p99_us": hit["p99_us"],
+        "memory_mb": cache.stats()["memory_bytes"] / 2**20,
+    }
+
+
+def trigram_embedding(text: str, dim: int) -> np.ndarray:
+    """Belgi trigrammalarining hash vektori (model embeddingi o'rniga)"""
+    vector = np.zeros(dim, dtype=np.float32)
+    text = f"  {text.lower()} "
+    for i in range(len(text) - 2):
+        vector[zlib.crc32(text[i:i + 3].encode()) % dim] += 1.0
+    return vector
+
+
+def bench_corpus(size: int, threshold: float, capacity: int, dim: int) -> Dict[str, float]:
+    cache = SemanticCache(enabled=True, threshold=threshold, capacity=capacity)
+    hits = exact = 0
+    for sample in generate_corpus(size, seed=1):
+        intent = Intent(sample.intent)
+        gold: List[Dict] = [
+            {"type": kind, "value": sample.prompt[start:end], "start": start, "end": end, "confidence": 1.0}
+            for kind, start, end in sample.slots
+        ]
+        embedding = trigram_embedding(sample.prompt, dim)
+        language = sample.language.value
+        slots = cache.lookup("v1", language, embedding, sample.prompt, intent)
+        if slots is None:
+            cache.store("v1", language, embedding, sample.prompt, intent, gold)
+            continue
+        hits += 1
+        key = lambda slot: (slot["type"], slot["start"], slot["end"])  # noqa: E731
+        exact += sorted(map(key, slots)) == sorted(map(key, gold))
+
+    stats = cache.stats()
+    return {
+        "prompts": size,
+        "hit_ratio": hits / size,
+        "rejected": stats["rejected"],
+        "exact_slots": exact / hits if hits else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--capacity", type=int, nargs="+", default=[256, 2048, 8192])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--corpus", type=int, default=3000)
+    parser.add_argument("--threshold", type=float, nargs="+", default=[0.9, 0.95, 0.98])
+    args = parser.parse_args()
+
+    print(f"search (dim={args.dim})")
+    print(f"{'capacity':>9} {'miss p50':>9} {'miss p99':>9} {'hit p50':>9} {'hit p99':>9} {'MiB':>7}")
+    for capacity in args.capacity:
+        row = bench_search(capacity, args.dim, args.queries)
+        print(f"{capacity:>9} {row['miss_p50_us']:>9.1f} {row['miss_p99_us']:>9.1f} "
+              f"{row['hit_p50_us']:>9.1f} {row['hit_p99_us']:>9.1f} {row['memory_mb']:>7.2f}")
+
+    print(f"\ncorpus ({args.corpus} prompts, trigram embeddings)")
+    print(f"{'threshold':>9} {'hit ratio':>9} {'rejected':>9} {'exact slots':>11}")
+    for threshold in args.threshold:
+        row = bench_corpus(args.corpus, threshold, max(args.capacity), 1024)
+        print(f"{threshold:>9.2f} {row['hit_ratio']:>9.1%} {row['rejected']:>9} {row['exact_slots']:>11.1%}")
+
+
+if __name__ == "__main__":
+    main()
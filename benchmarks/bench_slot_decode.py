@@ -0,0 +1,145 @@
+"""
+BIO slot dekodlash benchmarki
+
+Sintetik korpus promptlari wordpiece'ga o'xshash bo'laklarga ajratiladi va
+to'g'ri teglar atrofida shovqinli logitlar yasaladi (torch/transformers
+kerak emas). Eski token-bo'yicha Python sikli bilan `BIODecoder`
+(bitta matn va butun batch) taqqoslanadi, span aniqligi ham ko'rsatiladi.
+
+    python -m benchmarks.bench_slot_decode --samples 512 --batch 1 8 32
+"""
+
+import argparse
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.nlp_parser.config import settings
+from app.nlp_parser.corpus import CorpusSample, generate_corpus
+from app.nlp_parser.slot_decoder import BIODecoder
+from benchmarks.harness import measure
+
+WORD = re.compile(r"\w+|[^\w\s]")
+PIECE = 4
+
+
+def tokenize(sample: CorpusSample) -> Tuple[List[str], List[Tuple[int, int]], List[int]]:
+    """[CLS] + so'z bo'laklari (##) + [SEP], offsetlar va to'g'ri label indekslari"""
+    tokens, offsets, labels = ["[CLS]"], [(0, 0)], [0]
+    for match in WORD.finditer(sample.prompt):
+        for i, start in enumerate(range(match.start(), match.end(), PIECE)):
+            end = min(start + PIECE, match.end())
+            piece = sample.prompt[start:end]
+            label = "O"
+            for kind, slot_start, slot_end in sample.slots:
+                if slot_start <= start < slot_end:
+                    label = ("B-" if start == slot_start else "I-") + kind
+            tokens.append(piece if i == 0 else "##" + piece)
+            offsets.append((start, end))
+            labels.append(settings.slot_types.index(label))
+    tokens.append("[SEP]")
+    offsets.append((0, 0))
+    labels.append(0)
+    return tokens, offsets, labels
+
+
+def build_inputs(samples: List[CorpusSample], noise: float, seed: int) -> List[Dict]:
+    rng = np.random.default_rng(seed)
+    inputs = []
+    for sample in samples:
+        tokens, offsets, labels = tokenize(sample)
+        logits = rng.normal(0, noise, (len(tokens), len(settings.slot_types))).astype(np.float32)
+        logits[np.arange(len(tokens)), labels] += 3.0
+        inputs.append({"text": sample.prompt, "tokens": tokens, "offsets": np.asarray(offsets),
+                       "logits": logits, "sample": sample})
+    return inputs
+
+
+def pad_batch(items: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    length = max(len(item["tokens"]) for item in items)
+    labels = len(settings.slot_types)
+    logits = np.zeros((len(items), length, labels), dtype=np.float32)
+    offsets = np.zeros((len(items), length, 2), dtype=np.int64)
+    mask = np.zeros((len(items), length), dtype=np.int64)
+    for i, item in enumerate(items):
+        size = len(item["tokens"])
+        logits[i, :size] = item["logits"]
+        offsets[i, :size] = item["offsets"]
+        mask[i, :size] = 1
+    return logits, offsets, mask
+
+
+def legacy_decode(item: Dict) -> List[Dict]:
+    """Oldingi `_decode_slots` (token satrlarini yopishtirish, confidence 0.8)"""
+    predictions = item["logits"].argmax(axis=-1)
+    slots, current = [], None
+    for token, offset, pred in zip(item["tokens"], item["offsets"], predictions):
+        if token in ("[CLS]", "[SEP]", "[PAD]"):
+            continue
+        slot_type = settings.slot_types[pred]
+        if slot_type.startswith("B-"):
+            if current:
+                slots.append(current)
+            current = {"type": slot_type[2:], "value": token, "start": int(offset[0]),
+                       "end": int(offset[1]), "confidence": 0.8}
+        elif slot_type.startswith("I-") and current:
+            if slot_type[2:] == current["type"]:
+                current["value"] += " " + token
+                current["end"] = int(offset[1])
+        elif current:
+            slots.append(current)
+            current = None
+    if current:
+        slots.append(current)
+    for slot in slots:
+        slot["value"] = slot["value"].replace(" ##", "")
+    return slots
+
+
+def span_accuracy(items: List[Dict], decoded: List[List[Dict]]) -> Tuple[float, float]:
+    """(to'g'ri spanlar ulushi, qiymati asl matn bilan mos spanlar ulushi)"""
+    exact = values = total = 0
+    for item, slots in zip(items, decoded):
+        gold = {(kind, start, end) for kind, start, end in item["sample"].slots}
+        total += len(gold)
+        for slot in slots:
+            if (slot["type"], slot["start"], slot["end"]) in gold:
+                exact += 1
+                values += slot["value"] == item["text"][slot["start"]:slot["end"]]
+    return exact / max(total, 1), values / max(total, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=512)
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--noise", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    items = build_inputs(generate_corpus(args.samples, seed=args.seed), args.noise, args.seed)
+    decoder = BIODecoder(settings.slot_types)
+
+    legacy = [legacy_decode(item) for item in items]
+    vectorized = [decoder.decode(item["text"], item["logits"], item["offsets"]) for item in items]
+    for name, decoded in (("legacy", legacy), ("vectorized", vectorized)):
+        exact, values = span_accuracy(items, decoded)
+        print(f"{name:<11} span aniqligi {exact:.1%}, qiymat == matn[start:end] {values:.1%}")
+    print()
+
+    print(f"{'decoder':<11} {'batch':>6} {'prompts/s':>11} {'p50 us/batch':>13} {'p95 us/batch':>13}")
+    stats = measure(legacy_decode, items, repeat=3, warmup=20)
+    print(f"{'legacy':<11} {1:>6} {stats['ops_per_sec']:>11,.0f} {stats['p50_us']:>13.1f} {stats['p95_us']:>13.1f}")
+    for size in args.batch:
+        batches = []
+        for i in range(0, len(items), size):
+            chunk = items[i:i + size]
+            batches.append(([item["text"] for item in chunk], *pad_batch(chunk)))
+        stats = measure(lambda batch: decoder.decode_batch(*batch), batches, repeat=3, warmup=5)
+        print(f"{'vectorized':<11} {size:>6} {stats['ops_per_sec'] * size:>11,.0f} "
+              f"{stats['p50_us']:>13.1f} {stats['p95_us']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Cold start benchmarki
+
+Har bir o'lchov yangi Python process'da: `import app.main` vaqti, birinchi
+so'rovgacha (`/healthz`, ASGI orqali, tarmoqsiz) vaqt va process RSS.
+Autoscaling pod'lar ishga tushish vaqtini baholash uchun.
+
+    python -m benchmarks.bench_startup --runs 10
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+from benchmarks.env import apply_defaults
+from benchmarks.harness import percentile
+
+CHILD = r"""
+import asyncio, json, resource, sys, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+async def first_request():
+    messages = []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        messages.append(message)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/healthz", "raw_path": b"/healthz",
+        "query_string": b"", "root_path": "", "headers": [],
+        "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80),
+    }
+    await app.main.app(scope, receive, send)
+    return messages[0]["status"]
+
+status = asyncio.run(first_request())
+served = time.perf_counter()
+heavy = [name for name in ("torch", "transformers", "aio_pika", "yaml", "psycopg2") if name in sys.modules]
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_request_ms": (served - start) * 1000,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+    "status": status,
+    "heavy": heavy,
+}))
+"""
+
+
+def run_once(env: Dict[str, str]) -> dict:
+    result = subprocess.run([sys.executable, "-c", CHILD], capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        sys.exit(result.stderr[-2000:])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", default=None, help="natijalarni JSON faylga yozish")
+    args = parser.parse_args()
+
+    env = apply_defaults(dict(os.environ))
+
+    # Birinchi process .pyc keshini isitadi, o'lchovga kirmaydi
+    run_once(env)
+    runs: List[dict] = [run_once(env) for _ in range(args.runs)]
+
+    summary = {}
+    for key in ("import_ms", "first_request_ms", "rss_mb"):
+        values = sorted(run[key] for run in runs)
+        summary[key] = {"p50": percentile(values, 0.5), "p95": percentile(values, 0.95), "max": values[-1]}
+
+    print(f"{'metric':<18} {'p50':>9} {'p95':>9} {'max':>9}")
+    for key, stats in summary.items():
+        print(f"{key:<18} {stats['p50']:>9.1f} {stats['p95']:>9.1f} {stats['max']:>9.1f}")
+    print(f"modules: {runs[-1]['modules']}, import vaqtida yuklangan og'ir paketlar: "
+          f"{', '.join(runs[-1]['heavy']) or '-'}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"runs": runs, "summary": summary}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
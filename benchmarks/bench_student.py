@@ -0,0 +1,65 @@
+"""
+Student va asosiy model o'lchamlarining CPU latency'si
+
+Tasodifiy vaznli DistilBERT (`BERTNLPModel.tiny_random`) ikki o'lchamda
+quriladi: asosiy model arxitekturasi (`distilbert-base`: 6 qatlam, 768) va
+`NLPSettings` dagi student arxitekturasi. Har biri uchun bitta prompt
+(intent + slotlar) p50/p99 latency va batch throughput o'lchanadi. Hisoblash
+yo'li haqiqiy model bilan bir xil, shuning uchun o'qitilgan teacher
+bo'lmasa ham (offline) tezlik farqini ko'rsatadi. Aniqlik hisoboti
+`python -m app.nlp_parser.distill` natijasida (`distill_report.json`).
+
+    python -m benchmarks.bench_student --samples 300
+"""
+
+import argparse
+import sys
+import time
+
+from app.nlp_parser.config import settings
+from app.nlp_parser.corpus import generate_corpus
+from benchmarks.harness import measure
+
+
+def run(name: str, prompts, dim: int, layers: int, heads: int, args):
+    from app.nlp_parser.bert_model import BERTNLPModel
+    from app.nlp_parser.distill import parameter_count
+
+    model = BERTNLPModel.tiny_random(prompts, dim=dim, layers=layers, heads=heads, seed=args.seed)
+    samples = prompts[:args.samples]
+
+    def parse_one(prompt):
+        model.predict_intent(prompt)
+        model.extract_slots(prompt)
+
+    single = measure(parse_one, samples, repeat=1, warmup=20)
+    start = time.perf_counter()
+    model.predict_intent_batch(samples)
+    model.extract_slots_batch(samples)
+    batch = len(samples) / (time.perf_counter() - start)
+    print(f"{name:<8} {dim:>5} {layers:>6} {parameter_count(model) / 1e6:>9.2f} "
+          f"{single['p50_us'] / 1000:>8.2f} {single['p99_us'] / 1000:>8.2f} {batch:>9.1f}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=300)
+    parser.add_argument("--base-dim", type=int, default=768)
+    parser.add_argument("--base-layers", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        import torch  # noqa: F401
+        import transformers  # noqa: F401
+    except ImportError as e:
+        sys.exit(f"skipped ({e})")
+
+    prompts = [sample.prompt for sample in generate_corpus(max(args.samples, 1000), seed=args.seed)]
+    print(f"{'model':<8} {'dim':>5} {'layers':>6} {'params M':>9} {'p50 ms':>8} {'p99 ms':>8} {'batch/s':>9}")
+    run("base", prompts, args.base_dim, args.base_layers, max(1, args.base_dim // 64), args)
+    run("student", prompts, settings.student_dim, settings.student_layers, settings.student_heads, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+CPU thread topologiyasi sweep'i
+
+Har bir konfiguratsiya uchun (inference workerlar soni x intra-op threadlar x
+affinity) shuncha alohida process ishga tushiriladi. Har bir process kichik
+tasodifiy DistilBERT (`BERTNLPModel.tiny_random`) bilan ketma-ket so'rovlarni
+bajaradi, xuddi bitta uvicorn worker kabi. Sozlamalar `NLP_*` env orqali
+beriladi, ya'ni `runtime.configure()` production'dagi kabi ishlaydi.
+
+Natijada umumiy throughput va p50/p99 latency chiqadi. `*` bilan belgilangan
+qatorlar frontier'da yotadi: hech bir boshqa konfiguratsiya ulardan ham
+tezroq, ham past p99 bilan ishlamaydi.
+
+    python -m benchmarks.bench_threads --workers 1 2 4 --threads 1 2 4 --affinity none auto
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+from benchmarks.env import apply_defaults
+from benchmarks.harness import percentile
+
+CHILD = r"""
+import json, sys, time
+from app.nlp_parser import runtime
+from app.nlp_parser.bert_model import BERTNLPModel
+from app.nlp_parser.corpus import generate_corpus
+
+dim, layers, batch, duration = int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4])
+prompts = [sample.prompt for sample in generate_corpus(512)]
+model = BERTNLPModel.tiny_random(prompts, dim=dim, layers=layers, heads=max(1, dim // 64))
+batches = [prompts[i:i + batch] for i in range(0, len(prompts), batch)]
+for texts in batches[:5]:
+    model.predict_intent_batch(texts)
+    model.extract_slots_batch(texts)
+print(json.dumps({"ready": True, "topology": runtime.current().__dict__}), flush=True)
+sys.stdin.readline()
+
+latencies = []
+deadline = time.perf_counter() + duration
+i = 0
+while time.perf_counter() < deadline:
+    texts = batches[i % len(batches)]
+    start = time.perf_counter()
+    model.predict_intent_batch(texts)
+    model.extract_slots_batch(texts)
+    latencies.append(time.perf_counter() - start)
+    i += 1
+print(json.dumps({"latencies": latencies}), flush=True)
+"""
+
+
+def run_config(workers: int, threads: int, affinity: str, args) -> Dict:
+    with tempfile.TemporaryDirectory() as runtime_dir:
+        env = apply_defaults(dict(os.environ))
+        env.update({
+            "NLP_INFERENCE_WORKERS": str(workers),
+            "NLP_INTRA_OP_THREADS": str(threads),
+            "NLP_CPU_AFFINITY": affinity,
+            "NLP_RUNTIME_DIR": runtime_dir,
+            "NLP_SPAN_HOOKS": "[]",
+        })
+        for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            env.pop(name, None)
+        argv = [sys.executable, "-c", CHILD, str(args.dim), str(args.layers), str(args.batch), str(args.duration)]
+        procs = [subprocess.Popen(argv, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                 for _ in range(workers)]
+        topologies = []
+        for proc in procs:
+            line = proc.stdout.readline()
+            if not line:
+                sys.exit(f"worker {proc.pid} failed (exit code {proc.wait()})")
+            topologies.append(json.loads(line)["topology"])
+        # Barcha workerlar bir vaqtda boshlaydi
+        for proc in procs:
+            proc.stdin.write("go\n")
+            proc.stdin.flush()
+        latencies: List[float] = []
+        for proc in procs:
+            latencies.extend(json.loads(proc.stdout.readline())["latencies"])
+            proc.wait()
+
+    values = sorted(latencies)
+    return {
+        "workers": workers,
+        "threads": threads,
+        "affinity": affinity,
+        "cpus": [t["cpu_affinity"] for t in topologies],
+        "prompts_per_sec": len(values) * args.batch / args.duration,
+        "p50_ms": percentile(values, 0.5) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+    }
+
+
+def frontier(results: List[Dict]) -> List[Dict]:
+    """Throughput va p99 bo'yicha Pareto frontier"""
+    return [
+        row for row in results
+        if not any(
+            other["prompts_per_sec"] >= row["prompts_per_sec"] and other["p99_ms"] <= row["p99_ms"]
+            and (other["prompts_per_sec"] > row["prompts_per_sec"] or other["p99_ms"] < row["p99_ms"])
+            for other in results
+        )
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4],
+                        help="intra-op threadlar; 0 - runtime avtomatik hisoblaydi")
+    parser.add_argument("--affinity", nargs="+", default=["none", "auto"])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--layers", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=1, help="bitta so'rovdagi promptlar")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--output", default=None, help="natijalarni JSON faylga yozish")
+    args = parser.parse_args()
+
+    try:
+        import torch  # noqa: F401
+    except ImportError as e:
+        sys.exit(f"skipped ({e})")
+
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    print(f"cpus: {cpus}, model: dim={args.dim} layers={args.layers}, batch={args.batch}\n")
+    print(f"{'workers':>7} {'threads':>7} {'affinity':>8} {'prompts/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    results = []
+    for workers in args.workers:
+        for threads in args.threads:
+            for affinity in args.affinity:
+                row = run_config(workers, threads, affinity, args)
+                results.append(row)
+                print(f"{workers:>7} {threads:>7} {affinity:>8} {row['prompts_per_sec']:>10.1f} "
+                      f"{row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f}", flush=True)
+
+    print("\nfrontier (throughput / p99):")
+    for row in sorted(frontier(results), key=lambda r: r["prompts_per_sec"]):
+        print(f"  * workers={row['workers']} threads={row['threads']} affinity={row['affinity']}: "
+              f"{row['prompts_per_sec']:.1f} prompts/s, p99 {row['p99_ms']:.2f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+WebSocket serializatsiya benchmarki
+
+Eski yo'l (json.dumps -> json.loads -> str(...) -> json.dumps) bilan yangi
+Envelope + orjson/msgpack yo'lini solishtiradi.
+
+    python -m benchmarks.bench_ws_serialization --iterations 20000
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+
+from app.utils.fake_nlp import FakeEventParser, FakeParseRequest
+from app.websocket.protocol import (
+    Envelope, MessageCodec, MessageType, WireFormat,
+    decode_body, encode_body, parsed_event_payload,
+)
+
+CLIENT_ID = "cd9040b3-041b-4e27-8b60-439703a99259"
+PROMPT = "Ertaga 15:00 da 'Design sync' yig'ilishi, 1 soat, 30 daqiqa oldin eslat"
+
+
+def legacy_roundtrip(data) -> str:
+    """Eski service.py + broker.py dagi serializatsiya zanjiri"""
+    body = json.dumps({
+        "text": PROMPT,
+        "timestamp": datetime.now().isoformat(),
+        "client_id": CLIENT_ID,
+    })
+    original_text = json.loads(body).get("text")
+    result_dict = {
+        "original_text": str(original_text),
+        "success": True,
+        "client_id": CLIENT_ID,
+        "timestamp": str(datetime.now().isoformat()),
+        "type": "parsed_result",
+        "requires_confirmation": True,
+        "message_id": "msg_0_00000000",
+        "intent": str(data.intent.value),
+        "language": str(data.language.value),
+        "confidence": str(round(data.confidence, 2)),
+        "title": str(data.title),
+        "time_start": str(data.time_start),
+        "time_end": str(data.time_end),
+        "all_day": str(data.all_day),
+        "repeat": str(data.repeat),
+        "invites": str(data.invites),
+        "alerts": str(data.alerts),
+        "url": str(data.url),
+        "note": str(data.note),
+        "warnings": str(data.warnings),
+    }
+    return json.dumps(result_dict, ensure_ascii=False)
+
+
+def envelope_roundtrip(data, codec: MessageCodec):
+    """Yangi yo'l: body bir marta orjson, natija bir marta codec orqali"""
+    body = encode_body({
+        "type": MessageType.PROMPT.value,
+        "text": PROMPT,
+        "timestamp": datetime.now(),
+        "client_id": CLIENT_ID,
+    })
+    payload = decode_body(body)
+    envelope = Envelope(
+        type=MessageType.PARSED_RESULT,
+        client_id=CLIENT_ID,
+        original_text=payload["text"],
+        success=True,
+        requires_confirmation=True,
+        message_id="msg_0_00000000",
+        data=parsed_event_payload(data),
+    )
+    return codec.encode(envelope)
+
+
+def run(name: str, fn, iterations: int):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        frame = fn()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<16} {iterations / elapsed:>12,.0f} msg/s "
+        f"{elapsed / iterations * 1e6:>8.2f} us/msg {len(frame):>6} bytes"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    response = FakeEventParser().parse(FakeParseRequest(prompt=PROMPT))
+    data = response.data
+
+    run("legacy json", lambda: legacy_roundtrip(data), args.iterations)
+    for wire_format in WireFormat:
+        codec = MessageCodec(wire_format)
+        if codec.wire_format != wire_format:
+            print(f"{wire_format.value:<16} skipped (msgpack o'rnatilmagan)")
+            continue
+        run(wire_format.value, lambda: envelope_roundtrip(data, codec), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmarklar uchun umumiy yordamchilar
+
+- `measure` har bir chaqiruvni alohida o'lchab throughput va p50/p95/p99 beradi
+- `save_results` / `load_results` natijalarni JSON'da saqlaydi
+- `compare` natijani baseline bilan solishtirib regressiyalarni qaytaradi
+"""
+
+import json
+import platform
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Chiziqli interpolyatsiyali percentile (qiymatlar saralangan bo'lishi kerak)"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(latencies: List[float], wall_time: float) -> Dict[str, float]:
+    """Sekunddagi latencylardan hisobot (mikrosekundda)"""
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "ops_per_sec": len(values) / wall_time if wall_time > 0 else 0.0,
+        "mean_us": sum(values) / len(values) * 1e6 if values else 0.0,
+        "p50_us": percentile(values, 0.50) * 1e6,
+        "p95_us": percentile(values, 0.95) * 1e6,
+        "p99_us": percentile(values, 0.99) * 1e6,
+    }
+
+
+def measure(fn: Callable[[Any], Any], inputs: Sequence[Any], repeat: int = 3, warmup: int = 50) -> Dict[str, float]:
+    """
+    `fn` ni har bir input bilan `repeat` marta chaqirish
+
+    Args:
+        fn: o'lchanadigan funksiya (bitta argument)
+        inputs: argumentlar ro'yxati
+        repeat: korpus necha marta aylanadi
+        warmup: o'lchovdan oldingi chaqiruvlar soni
+    """
+    for item in inputs[:warmup]:
+        fn(item)
+
+    latencies: List[float] = []
+    clock = time.perf_counter
+    wall_start = clock()
+    for _ in range(repeat):
+        for item in inputs:
+            start = clock()
+            fn(item)
+            latencies.append(clock() - start)
+    return summarize(latencies, clock() - wall_start)
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def save_results(path: Path, results: Dict[str, Any]):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n")
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text())
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+            metric: str = "p95_us") -> List[Dict[str, Any]]:
+    """
+    Baseline'dan `threshold` (masalan 0.15 = 15%) dan ko'proq sekinlashgan
+    benchmarklar ro'yxati. Faqat ikkala natijada ham bor benchmarklar solishtiriladi.
+    """
+    regressions = []
+    base_cases = baseline.get("benchmarks", {})
+    for name, stats in current.get("benchmarks", {}).items():
+        base = base_cases.get(name)
+        if not base or metric not in base or metric not in stats or base[metric] <= 0:
+            continue
+        change = stats[metric] / base[metric] - 1.0
+        if change > threshold:
+            regressions.append({
+                "benchmark": name,
+                "metric": metric,
+                "baseline": base[metric],
+                "current": stats[metric],
+                "change": change,
+            })
+    return regressions
+
+
+def print_table(results: Dict[str, Any]):
+    print(f"{'benchmark':<24} {'ops/s':>12} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10}")
+    for name, stats in results.get("benchmarks", {}).items():
+        print(
+            f"{name:<24} {stats['ops_per_sec']:>12,.0f} {stats['p50_us']:>10.1f} "
+            f"{stats['p95_us']:>10.1f} {stats['p99_us']:>10.1f}"
+        )
+    for name, reason in results.get("skipped", {}).items():
+        print(f"{name:<24} skipped: {reason}")
@@ -0,0 +1,97 @@
+"""
+Import vaqti auditi
+
+`python -X importtime` natijasini yangi process'da yig'adi va eng qimmat
+modullarni (cumulative bo'yicha) hamda top-level paketlar yig'indisini
+ko'rsatadi. `--budget-ms` berilsa, umumiy vaqt undan oshganda exit code 1.
+
+    python -m benchmarks.import_audit
+    python -m benchmarks.import_audit --module app.main --top 30 --budget-ms 800
+    python -m benchmarks.import_audit --forbid torch transformers aio_pika yaml
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List
+
+from benchmarks.env import apply_defaults
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportRecord]:
+    """`import time: self | cumulative | name` qatorlarini o'qish"""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        records.append(ImportRecord(name.strip(), int(self_us), int(cumulative_us), depth))
+    return records
+
+
+def run_importtime(module: str) -> List[ImportRecord]:
+    env = apply_defaults(dict(os.environ))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env,
+    )
+    if result.returncode != 0:
+        sys.exit(f"`import {module}` muvaffaqiyatsiz:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def by_package(records: List[ImportRecord]) -> Dict[str, int]:
+    """Top-level paket bo'yicha self vaqtlar yig'indisi (us)"""
+    totals: Dict[str, int] = defaultdict(int)
+    for record in records:
+        totals[record.module.split(".")[0]] += record.self_us
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--forbid", nargs="*", default=[],
+                        help="import vaqtida yuklanmasligi kerak bo'lgan paketlar")
+    args = parser.parse_args()
+
+    records = run_importtime(args.module)
+    total_ms = max(record.cumulative_us for record in records) / 1000
+
+    print(f"`import {args.module}`: {total_ms:.1f} ms, {len(records)} modul\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for record in sorted(records, key=lambda r: -r.cumulative_us)[:args.top]:
+        print(f"{record.cumulative_us / 1000:>14.1f} {record.self_us / 1000:>9.1f}  {record.module}")
+
+    print(f"\n{'self ms':>9}  package")
+    for package, self_us in list(by_package(records).items())[:args.top]:
+        print(f"{self_us / 1000:>9.1f}  {package}")
+
+    failed = False
+    loaded = {record.module.split(".")[0] for record in records}
+    for package in args.forbid:
+        if package in loaded:
+            print(f"\nXATO: {package} import vaqtida yuklandi")
+            failed = True
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"\nXATO: {total_ms:.1f} ms > budget {args.budget_ms:.1f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
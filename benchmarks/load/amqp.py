@@ -0,0 +1,135 @@
+"""
+In-process AMQP stand-in
+
+RabbitMQBroker ishlatadigan aio_pika qismi (connect_robust -> channel ->
+direct exchange -> durable queue -> consume/ack/nack) uchun minimal
+implementatsiya. Load test'da RabbitMQ o'rniga ishlatiladi; prefetch
+(ack qilinmagan xabarlar chegarasi) ham hisobga olinadi.
+"""
+
+import asyncio
+import itertools
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+class IncomingMessage:
+    def __init__(self, queue: "Queue", body: bytes, release: Callable[[], None]):
+        self.queue = queue
+        self.body = body
+        self._release = release
+        self._settled = False
+
+    async def ack(self):
+        self._settle()
+
+    async def nack(self, requeue: bool = True):
+        self._settle()
+        if requeue:
+            self.queue.put(self.body)
+
+    def _settle(self):
+        if not self._settled:
+            self._settled = True
+            self._release()
+
+
+class Queue:
+    def __init__(self, channel: "Channel", name: str):
+        self.channel = channel
+        self.name = name
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.consumers: Dict[str, asyncio.Task] = {}
+
+    @property
+    def consumer_count(self) -> int:
+        return len(self.consumers)
+
+    def put(self, body: bytes):
+        self.messages.put_nowait(body)
+
+    async def bind(self, exchange: "Exchange", routing_key: str):
+        exchange.bindings.setdefault(routing_key, []).append(self)
+
+    async def consume(self, callback: Callable[[IncomingMessage], Awaitable[None]]) -> str:
+        tag = f"ctag.{next(self.channel.tags)}"
+        self.consumers[tag] = asyncio.create_task(self._deliver(callback))
+        return tag
+
+    async def _deliver(self, callback):
+        # basic.qos(global=False) kabi: prefetch har bir consumer uchun
+        prefetch = self.channel.prefetch_count
+        slots = asyncio.Semaphore(prefetch) if prefetch else None
+        release = slots.release if slots else (lambda: None)
+        tasks = set()
+        while True:
+            body = await self.messages.get()
+            if slots:
+                await slots.acquire()
+            task = asyncio.create_task(self._invoke(callback, IncomingMessage(self, body, release)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    async def _invoke(self, callback, message: IncomingMessage):
+        try:
+            await callback(message)
+        finally:
+            # Handler ack/nack qilmasdan tugasa ham slot bo'shatiladi
+            message._settle()
+
+    async def cancel(self, consumer_tag: str):
+        task = self.consumers.pop(consumer_tag, None)
+        if task:
+            task.cancel()
+
+    async def delete(self):
+        for exchange in self.channel.exchanges.values():
+            for queues in exchange.bindings.values():
+                if self in queues:
+                    queues.remove(self)
+        self.channel.queues.pop(self.name, None)
+
+
+class Exchange:
+    def __init__(self, name: str):
+        self.name = name
+        self.bindings: Dict[str, List[Queue]] = {}
+
+    async def publish(self, message, routing_key: str):
+        for queue in self.bindings.get(routing_key, []):
+            queue.put(message.body)
+
+
+class Channel:
+    def __init__(self):
+        self.exchanges: Dict[str, Exchange] = {}
+        self.queues: Dict[str, Queue] = {}
+        self.tags = itertools.count(1)
+        self.prefetch_count = 0
+        self.is_closed = False
+
+    async def set_qos(self, prefetch_count: int = 0):
+        self.prefetch_count = prefetch_count
+
+    async def declare_exchange(self, name: str, type: str = "direct", durable: bool = True) -> Exchange:
+        return self.exchanges.setdefault(name, Exchange(name))
+
+    async def declare_queue(self, name: str, durable: bool = True, exclusive: bool = False,
+                            auto_delete: bool = False) -> Queue:
+        return self.queues.setdefault(name, Queue(self, name))
+
+
+class Connection:
+    def __init__(self):
+        self._channel = Channel()
+        self.is_closed = False
+
+    async def channel(self) -> Channel:
+        return self._channel
+
+    async def close(self):
+        pass
+
+
+async def connect(url: Optional[str] = None) -> Connection:
+    """aio_pika.connect_robust o'rnini bosadi (har bir process uchun alohida "broker")"""
+    return Connection()
@@ -0,0 +1,53 @@
+"""
+Load test uchun app
+
+    uvicorn benchmarks.load.server:app --workers 2
+
+- Kerakli env qiymatlari berilmagan bo'lsa test default'lari qo'yiladi
+  (default DB - SQLite fayl, LOADTEST_DATABASE_URL bilan local Postgres)
+- SQLite uchun JSONB -> JSON kompilyatsiya qilinadi va jadvallar yaratiladi
+- RabbitMQ o'rniga in-process AMQP stand-in ulanadi
+- /readyz NLP modelini kutmaydi (`HEALTH_REQUIRE_NLP=false`)
+"""
+
+import os
+
+from benchmarks.env import apply_defaults
+
+apply_defaults()
+# Barcha simulyatsiya qilingan clientlar bitta IP'dan keladi (--env RATE_LIMIT_ENABLED=true bilan yoqiladi)
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+# Chat yo'li FakeEventParser'dan foydalanadi, NLP modeli (torch) kerak emas
+os.environ.setdefault("HEALTH_REQUIRE_NLP", "false")
+os.environ["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
+    "LOADTEST_DATABASE_URL", "sqlite:///loadtest.db?check_same_thread=false"
+)
+
+from sqlalchemy.dialects.postgresql import JSONB  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(element, compiler, **kw):
+    return "JSON"
+
+
+from app.core.base import Base  # noqa: E402
+from app.database import get_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.websocket import routers  # noqa: E402
+
+from . import amqp  # noqa: E402
+
+routers.broker.connection_factory = amqp.connect
+
+engine = get_engine()
+
+if engine.dialect.name == "sqlite":
+    # Bir nechta worker bir vaqtda ishga tushganda jadval yaratish poygasi
+    try:
+        Base.metadata.create_all(engine)
+    except Exception:
+        pass
+
+__all__ = ["app"]